@@ -0,0 +1,152 @@
+"""
+Model request context: system prompt, tool declarations and generation config.
+
+The static part (SYSTEM_PROMPT plus every tool declaration) is built once at
+import time. Only the CURRENT USER INFO block varies per user. With
+GEMINI_CONTEXT_CACHE on, the static part is registered with Gemini as cached
+content and the user block moves into the conversation contents. Repeated
+turns then pay only for new tokens.
+"""
+
+import time
+import asyncio
+from functools import lru_cache
+from google.genai import types
+from app.config import settings
+from app.agent.prompts import SYSTEM_PROMPT
+from app.agent.tools import ALL_DECLARATIONS
+
+TEMPERATURE = 0.7
+
+TOOLS = types.Tool(function_declarations=ALL_DECLARATIONS)
+STATIC_CONFIG = types.GenerateContentConfig(
+    tools=[TOOLS],
+    system_instruction=SYSTEM_PROMPT,
+    temperature=TEMPERATURE,
+)
+
+
+def user_info_block(user_info: dict | None) -> str:
+    if not user_info:
+        return ""
+    name = user_info.get("name", "")
+    phone = user_info.get("phone", "")
+    email = user_info.get("email", "")
+    return (
+        f"\n\nCURRENT USER INFO (already collected, do NOT ask again):"
+        f"\n- Name: {name}"
+        f"\n- Phone: {phone}"
+        f"\n- Email: {email}"
+        f"\nUse this info directly when booking visits or saving contacts. "
+        f"Address the user by their first name."
+    )
+
+
+@lru_cache(maxsize=1024)
+def _config_with_user_block(block: str) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        tools=[TOOLS],
+        system_instruction=SYSTEM_PROMPT + block,
+        temperature=TEMPERATURE,
+    )
+
+
+@lru_cache(maxsize=8)
+def _cached_config(cache_name: str) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(cached_content=cache_name, temperature=TEMPERATURE)
+
+
+class UsageStats:
+    """Running token counters across all model calls in this process."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, usage: types.GenerateContentResponseUsageMetadata | None):
+        self.calls += 1
+        if not usage:
+            return
+        self.prompt_tokens += usage.prompt_token_count or 0
+        self.cached_tokens += usage.cached_content_token_count or 0
+        self.output_tokens += usage.candidates_token_count or 0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_hit_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+        }
+
+
+class ContextCache:
+    """Holds the Gemini cached-content handle for the static prompt prefix."""
+
+    RETRY_AFTER_SECONDS = 300
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl = ttl_seconds
+        self.name: str | None = None
+        self.expires_at = 0.0
+        self.retry_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_name(self, client, model: str) -> str | None:
+        """Return a live cache name, creating or refreshing it if needed; None if unavailable."""
+        now = time.time()
+        if self.name and now < self.expires_at - 60:
+            return self.name
+        if now < self.retry_at:
+            return None
+
+        async with self._lock:
+            if self.name and time.time() < self.expires_at - 60:
+                return self.name
+            try:
+                cache = await client.aio.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=SYSTEM_PROMPT,
+                        tools=[TOOLS],
+                        ttl=f"{self.ttl}s",
+                    ),
+                )
+            except Exception as e:
+                # e.g. prefix below the model's minimum cacheable size; serve uncached
+                print(f"[AGENT] Context cache unavailable, sending full prompt: {e}")
+                self.name = None
+                self.retry_at = time.time() + self.RETRY_AFTER_SECONDS
+                return None
+            self.name = cache.name
+            self.expires_at = time.time() + self.ttl
+            print(f"[AGENT] Created context cache {cache.name}")
+            return self.name
+
+
+class ModelContext:
+    def __init__(self):
+        self.usage = UsageStats()
+        self.cache = ContextCache(settings.GEMINI_CACHE_TTL_SECONDS) if settings.GEMINI_CONTEXT_CACHE else None
+
+    async def prepare(self, client, model: str, contents: list[dict],
+                      user_info: dict | None) -> tuple[list[dict], types.GenerateContentConfig]:
+        """Return the contents and config for one generate call."""
+        block = user_info_block(user_info)
+
+        cache_name = await self.cache.get_name(client, model) if self.cache else None
+        if cache_name:
+            if block and contents:
+                first = contents[0]
+                contents = [{"role": first["role"], "parts": [{"text": block.strip()}, *first["parts"]]}, *contents[1:]]
+            return contents, _cached_config(cache_name)
+
+        if not block:
+            return contents, STATIC_CONFIG
+        return contents, _config_with_user_block(block)
+
+
+model_context = ModelContext()
@@ -1,19 +1,25 @@
+import time
+import asyncio
+from collections.abc import AsyncIterator
 from google import genai
-from google.genai import types
-from sqlalchemy.orm import Session as DBSession
-from langfuse import Langfuse
 
 from app.config import settings
+from app.database import SessionLocal
 from app.models import Lead
-from app.agent.prompts import SYSTEM_PROMPT
-from app.agent.tools import ALL_DECLARATIONS, TOOL_REGISTRY
-from app.agent.session import session_store
+from app.agent.tools import TOOL_REGISTRY, SEARCH_TOOLS
+from app.agent.context import model_context
+from app.agent.session import ConversationSession
+from app.agent.session_backends import load_session, save_turn
+from app.agent.session_locks import session_gate
+from app.agent.history import history_manager
+from app.agent.tracing import tracer
+from app.agent.fastpath import match_intent, render_reply
+from app.metrics import MODEL_CALL_SECONDS, ITERATIONS_PER_TURN, TURN_SECONDS
+from app.agent.runner import run_blocking, run_tool, run_tool_calls
 
-langfuse = Langfuse(
-    public_key=settings.LANGFUSE_PUBLIC_KEY,
-    secret_key=settings.LANGFUSE_SECRET_KEY,
-    host=settings.LANGFUSE_BASE_URL or settings.LANGFUSE_HOST,
-)
+FALLBACK_TEXT = "I'm here to help! What are you looking for?"
+CONNECTION_ERROR_TEXT = "I'm sorry, I'm having trouble connecting right now. Please try again in a moment."
+MAX_ITERATIONS_TEXT = "I apologize, I'm having trouble processing. Could you rephrase?"
 
 
 class AgentResponse:
@@ -23,100 +29,179 @@ class AgentResponse:
         self.booking = booking
 
 
+def _ensure_lead(session_id: str):
+    # Its own short session on the worker thread: no connection is held across model calls
+    db = SessionLocal()
+    try:
+        if not db.query(Lead.id).filter(Lead.session_id == session_id).first():
+            db.add(Lead(session_id=session_id))
+            db.commit()
+    finally:
+        db.close()
+
+
+def _done_event(message: str, properties: list[dict] | None = None, booking: dict | None = None) -> dict:
+    return {"type": "done", "message": message, "properties": properties, "booking": booking}
+
+
 class RealEstateAgent:
     def __init__(self):
         self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
         self.model = "gemini-2.0-flash"
 
-    async def handle_message(self, session_id: str, user_message: str, db: DBSession, user_info: dict | None = None) -> AgentResponse:
-        session = session_store.get_or_create(session_id)
-        session.add_user_message(user_message)
+    async def handle_message(self, session_id: str, user_message: str, user_info: dict | None = None) -> AgentResponse:
+        """Run a full turn and return the assembled response (non-streaming clients)."""
+        done = _done_event(MAX_ITERATIONS_TEXT)
+        async for event in self.stream_message(session_id, user_message, user_info):
+            if event["type"] == "done":
+                done = event
+        return AgentResponse(message=done["message"], properties=done["properties"], booking=done["booking"])
+
+    async def stream_message(self, session_id: str, user_message: str,
+                             user_info: dict | None = None) -> AsyncIterator[dict]:
+        """
+        Run a turn and yield events as they happen.
+
+        Event types: "text" (partial model output), "tool_start", "tool_end",
+        "properties" (search results), "booking" (confirmed visit) and a final
+        "done" carrying the same fields as ChatResponse.
+        """
+        start = time.perf_counter()
+
+        # A duplicate of a message still in flight reuses the original turn's result
+        original = session_gate.in_flight(session_id, user_message)
+        if original is not None:
+            done = await asyncio.shield(original)
+            if done is not None:
+                yield {"type": "text", "text": done["message"]}
+                yield done
+                return
+
+        # One turn at a time per session, in arrival order
+        async with session_gate.turn(session_id, user_message) as turn_result:
+            session = await load_session(session_id)
+            session.add_user_message(user_message)
+            turn_start = session.history[-1]
+
+            intent = match_intent(user_message) if settings.FAST_PATH_ENABLED else None
+            if intent:
+                path, events = "fast", self._fast_path(session, *intent)
+            else:
+                path, events = "agent", self._agent_loop(session, user_message, user_info)
+
+            async for event in events:
+                if event["type"] == "done":
+                    await save_turn(session, turn_start)
+                    TURN_SECONDS.observe(time.perf_counter() - start, path)
+                    turn_result.set_result(event)
+                yield event
+
+    async def _fast_path(self, session: ConversationSession,
+                         tool_name: str, tool_args: dict) -> AsyncIterator[dict]:
+        """Answer a recognised intent with one direct tool call and a templated reply."""
+        session_id = session.session_id
+        await run_blocking(_ensure_lead, session_id)
+
+        yield {"type": "tool_start", "tool": tool_name, "args": tool_args}
+        result = await run_blocking(run_tool, tool_name, tool_args, session_id)
+        yield {"type": "tool_end", "tool": tool_name, "success": "error" not in result}
+
+        text = render_reply(tool_name, tool_args, result)
+        session.add_model_response([{"function_call": {"name": tool_name, "args": tool_args}}])
+        session.add_function_response(tool_name, result)
+        session.add_model_response([{"text": text}])
+
+        yield {"type": "text", "text": text}
+        yield _done_event(
+            text,
+            properties=session.last_search_results if session.last_search_results else None,
+        )
 
-        # Start Langfuse root span for this conversation turn
-        root_span = langfuse.start_span(
+    async def _agent_loop(self, session: ConversationSession, user_message: str,
+                          user_info: dict | None) -> AsyncIterator[dict]:
+        session_id = session.session_id
+
+        # Start the trace for this conversation turn
+        trace = tracer.start_trace(
             name="chat-message",
             input={"session_id": session_id, "message": user_message},
             metadata={"model": self.model, "session_id": session_id},
+            session_id=session_id,
         )
 
         # Ensure lead exists
-        lead = db.query(Lead).filter(Lead.session_id == session_id).first()
-        if not lead:
-            lead = Lead(session_id=session_id)
-            db.add(lead)
-            db.commit()
-
-        # Build system prompt with user context if authenticated
-        prompt = SYSTEM_PROMPT
-        if user_info:
-            name = user_info.get("name", "")
-            phone = user_info.get("phone", "")
-            email = user_info.get("email", "")
-            prompt += (
-                f"\n\nCURRENT USER INFO (already collected, do NOT ask again):"
-                f"\n- Name: {name}"
-                f"\n- Phone: {phone}"
-                f"\n- Email: {email}"
-                f"\nUse this info directly when booking visits or saving contacts. "
-                f"Address the user by their first name."
-            )
-
-        tools = types.Tool(function_declarations=ALL_DECLARATIONS)
-        config = types.GenerateContentConfig(
-            tools=[tools],
-            system_instruction=prompt,
-            temperature=0.7,
-        )
+        await run_blocking(_ensure_lead, session_id)
 
         booking_result = None
         max_iterations = 5
 
         for iteration in range(max_iterations):
+            # Recent turns verbatim, older ones folded into the rolling summary
+            contents = history_manager.build_contents(session)
+            contents, config = await model_context.prepare(self.client, self.model, contents, user_info)
+
             # Track each LLM call as a generation
-            generation = langfuse.start_generation(
+            generation = trace.start_generation(
                 name=f"gemini-call-{iteration}",
                 model=self.model,
-                input=session.get_contents(),
+                input=contents,
                 metadata={"iteration": iteration, "session_id": session_id},
             )
 
+            # Stream the response, forwarding text as it arrives and collecting
+            # every part so function calls can be executed once the stream ends
+            parts = []
+            usage = None
+            call_start = time.perf_counter()
             try:
-                response = self.client.models.generate_content(
+                stream = await self.client.aio.models.generate_content_stream(
                     model=self.model,
-                    contents=session.get_contents(),
+                    contents=contents,
                     config=config,
                 )
+                async for chunk in stream:
+                    if chunk.usage_metadata:
+                        usage = chunk.usage_metadata
+                    if not chunk.candidates or not chunk.candidates[0].content:
+                        continue
+                    for p in chunk.candidates[0].content.parts or []:
+                        parts.append(p)
+                        if p.text and not p.function_call:
+                            yield {"type": "text", "text": p.text}
             except Exception as e:
                 generation.update(output=str(e), level="ERROR")
                 generation.end()
-                root_span.update(output={"error": str(e)}, level="ERROR")
-                root_span.end()
-                langfuse.flush()
-                return AgentResponse(message="I'm sorry, I'm having trouble connecting right now. Please try again in a moment.")
-
-            candidate = response.candidates[0]
-            parts = candidate.content.parts
+                trace.update(output={"error": str(e)}, level="ERROR")
+                trace.end()
+                yield _done_event(CONNECTION_ERROR_TEXT)
+                return
+            MODEL_CALL_SECONDS.observe(time.perf_counter() - call_start, iteration)
+            model_context.usage.record(usage)
 
             # Separate function calls from text
             function_calls = [p for p in parts if p.function_call]
 
             if not function_calls:
                 # Pure text response
-                text = parts[0].text if parts and parts[0].text else "I'm here to help! What are you looking for?"
+                text = "".join(p.text for p in parts if p.text)
+                if not text:
+                    text = FALLBACK_TEXT
+                    yield {"type": "text", "text": text}
                 generation.update(output=text)
                 generation.end()
 
                 session.add_model_response([{"text": text}])
 
-                root_span.update(output={"response": text})
-                root_span.end()
-                langfuse.flush()
+                trace.update(output={"response": text})
+                trace.end()
+                ITERATIONS_PER_TURN.observe(iteration + 1)
 
-                return AgentResponse(
-                    message=text,
+                yield _done_event(
+                    text,
                     properties=session.last_search_results if session.last_search_results else None,
                     booking=booking_result,
                 )
+                return
 
             # Log the function calls Gemini wants to make
             fc_summary = [{"tool": p.function_call.name, "args": dict(p.function_call.args)} for p in function_calls]
@@ -134,41 +219,47 @@ class RealEstateAgent:
                     model_parts.append({"text": p.text})
             session.add_model_response(model_parts)
 
-            # Execute each function call
-            for fc_part in function_calls:
-                tool_name = fc_part.function_call.name
-                tool_args = dict(fc_part.function_call.args)
+            # Execute the function calls, independent ones concurrently
+            calls = [(p.function_call.name, dict(p.function_call.args)) for p in function_calls]
+            for tool_name, tool_args in calls:
+                yield {"type": "tool_start", "tool": tool_name, "args": tool_args}
 
+            async def traced_tool(tool_name: str, tool_args: dict, iteration: int = iteration) -> dict:
                 # Track each tool call as a span
-                span = langfuse.start_span(
+                span = trace.start_span(
                     name=f"tool-{tool_name}",
                     input=tool_args,
                     metadata={"iteration": iteration, "session_id": session_id},
                 )
-
-                executor = TOOL_REGISTRY.get(tool_name)
-                if not executor:
-                    result = {"error": f"Unknown tool: {tool_name}"}
-                    span.update(output=result, level="ERROR")
-                    span.end()
-                else:
-                    result = executor(db=db, session_id=session_id, **tool_args)
+                result = await run_blocking(run_tool, tool_name, tool_args, session_id)
+                if tool_name in TOOL_REGISTRY:
                     span.update(output=result)
-                    span.end()
+                else:
+                    span.update(output=result, level="ERROR")
+                span.end()
+                return result
+
+            results = await run_tool_calls(calls, session_id, run=traced_tool)
+
+            # Apply results in the order the model asked for them
+            for (tool_name, _), result in zip(calls, results):
+                yield {"type": "tool_end", "tool": tool_name, "success": "error" not in result}
 
-                if tool_name == "search_properties":
+                if tool_name in SEARCH_TOOLS:
                     session.last_search_results = result.get("properties", [])
+                    yield {"type": "properties", "properties": session.last_search_results}
                 elif tool_name == "book_visit" and result.get("success"):
                     booking_result = result
+                    yield {"type": "booking", "booking": booking_result}
 
                 session.add_function_response(tool_name, result)
 
             # Loop continues — Gemini sees tool results next
 
-        root_span.update(output={"warning": "Max iterations reached"}, level="WARNING")
-        root_span.end()
-        langfuse.flush()
-        return AgentResponse(message="I apologize, I'm having trouble processing. Could you rephrase?")
+        trace.update(output={"warning": "Max iterations reached"}, level="WARNING")
+        trace.end()
+        ITERATIONS_PER_TURN.observe(max_iterations)
+        yield _done_event(MAX_ITERATIONS_TEXT)
 
 
 agent = RealEstateAgent()
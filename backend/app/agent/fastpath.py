@@ -0,0 +1,81 @@
+"""
+Deterministic fast path for unambiguous requests.
+
+Messages like "show me property 12", "details of listing #7" or "cancel
+booking #3" map to exactly one tool call, so they skip the model: the tool
+runs directly from TOOL_REGISTRY and the reply comes from a template. The
+exchange is still written to the session as a normal function call/response
+pair, so the model has full context on the next turn.
+
+Only messages that name what they act on qualify: a bare "#3" could be a
+listing, a booking or an answer to a question, and "cancel my booking" needs
+the model to confirm which one. Cancellation needs an explicit booking id,
+and cancel_booking only touches the lead's own bookings.
+"""
+
+import re
+
+_END = r"\s*(?:please)?\s*[.!?]*\s*$"
+
+PROPERTY_DETAILS_PATTERN = re.compile(
+    r"^(?:please\s+)?(?:(?:can you\s+|could you\s+)?show(?: me)?|details?(?: of| for| on| about)?|"
+    r"tell me (?:more )?about|view|open|get)?\s*(?:the\s+)?(?:property|listing)\s*(?:#|no\.?|number)?\s*(\d+)"
+    + _END,
+    re.IGNORECASE,
+)
+
+CANCEL_BOOKING_PATTERN = re.compile(
+    r"^(?:please\s+)?cancel\s+(?:my\s+)?(?:site\s+)?(?:booking|visit|appointment)\s*(?:#|no\.?|number)?\s*(\d+)"
+    + _END,
+    re.IGNORECASE,
+)
+
+
+def match_intent(message: str) -> tuple[str, dict] | None:
+    """Return (tool_name, args) when the message is one of the recognised patterns."""
+    text = message.strip()
+    match = PROPERTY_DETAILS_PATTERN.match(text)
+    if match:
+        return "get_property_details", {"property_id": int(match.group(1))}
+
+    match = CANCEL_BOOKING_PATTERN.match(text)
+    if match:
+        return "cancel_booking", {"booking_id": int(match.group(1))}
+    return None
+
+
+def format_price(price: float | None) -> str:
+    if not price:
+        return "price on request"
+    if price >= 10_000_000:
+        return f"₹{price / 10_000_000:.2f}".rstrip("0").rstrip(".") + " crore"
+    if price >= 100_000:
+        return f"₹{price / 100_000:.2f}".rstrip("0").rstrip(".") + " lakh"
+    return f"₹{price:,.0f}"
+
+
+def render_reply(tool_name: str, args: dict, result: dict) -> str:
+    if tool_name == "get_property_details":
+        if "error" in result:
+            return (f"I couldn't find property #{args['property_id']}. "
+                    f"Would you like me to search for something similar?")
+        p = result["property"]
+        kind = (p.get("property_type") or "property").replace("_", " ")
+        headline = f"{p['bhk']}BHK {kind}" if p.get("bhk") else kind.capitalize()
+        lines = [f"**{p['title']}** (#{p['id']})",
+                 f"{headline} in {p['location']}, {p['city']} — {format_price(p.get('price'))}."]
+        if p.get("area_sqft"):
+            lines.append(f"Area: {p['area_sqft']:,.0f} sq ft.")
+        if p.get("description"):
+            lines.append(p["description"])
+        lines.append("Would you like to book a visit?")
+        return "\n".join(lines)
+
+    if tool_name == "cancel_booking":
+        if "error" in result:
+            return result["error"]
+        return (f"Done — I've cancelled your visit to {result['property_title']} on {result['visit_date']} "
+                f"at {result['visit_time']} (booking #{result['booking_id']}). "
+                f"Would you like to pick another slot?")
+
+    return "Done."
@@ -0,0 +1,131 @@
+"""
+Bounded conversation history.
+
+Keeps the last few turns verbatim and folds everything older into a short
+rolling summary on the session, so the contents sent to Gemini stay roughly
+the same size however long the conversation runs. Tool results from earlier
+turns are also trimmed down to the fields the model needs to refer back to
+them (ids, titles, prices).
+"""
+
+import json
+from app.config import settings
+from app.agent.session import Content, TextPart, FunctionCallPart, FunctionResponsePart
+
+SUMMARY_HEADER = "Summary of the earlier conversation (for context only):"
+SNIPPET_CHARS = 160
+
+
+def estimate_tokens(contents: list[dict]) -> int:
+    """Rough token count (~4 characters per token) without a round trip to the API."""
+    return len(json.dumps(contents, default=str)) // 4
+
+
+def split_turns(history: list[Content]) -> list[list[Content]]:
+    """Group history into turns, each starting at a user text message."""
+    turns: list[list[Content]] = []
+    for content in history:
+        if content.is_user_text or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _snippet(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS - 3] + "..."
+
+
+def summarize_turn(session, turn: list[Content]) -> list[str]:
+    """Describe a turn as a few one-line facts."""
+    lines = []
+    for content in turn:
+        for part in content.parts:
+            if isinstance(part, TextPart):
+                speaker = "User" if content.role == "user" else "Assistant"
+                lines.append(f"{speaker}: {_snippet(part.text)}")
+            elif isinstance(part, FunctionCallPart):
+                args = ", ".join(f"{k}={v}" for k, v in part.args.items())
+                lines.append(f"Called {part.name}({args})")
+            elif isinstance(part, FunctionResponsePart):
+                response = part.response
+                props = [session.properties[i] for i in part.property_ids or () if i in session.properties]
+                if "error" in response:
+                    lines.append(f"{part.name} failed: {response['error']}")
+                elif part.name in ("search_properties", "search_by_description"):
+                    found = ", ".join(f"#{p.get('id')} {p.get('title')}" for p in props)
+                    lines.append(f"{part.name} returned {response.get('count', 0)}: {found or 'none'}")
+                elif part.name == "book_visit":
+                    lines.append(
+                        f"Booked visit #{response.get('booking_id')} to {response.get('property_title')} "
+                        f"on {response.get('visit_date')} at {response.get('visit_time')}"
+                    )
+                elif part.name == "get_available_slots":
+                    free = "; ".join(f"{day['date']} {', '.join(day['times'])}" for day in response.get("days", ()))
+                    lines.append(f"Free slots for #{response.get('property_id')}: {free or 'none'}")
+                elif part.name == "get_property_details" and props:
+                    lines.append(f"Looked up #{props[0].get('id')} {props[0].get('title')}")
+                else:
+                    lines.append(f"{part.name} succeeded")
+    return lines
+
+
+class HistoryManager:
+    def __init__(self, max_turns: int, token_budget: int, summary_max_chars: int):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_max_chars = summary_max_chars
+
+    def fold(self, session, count: int):
+        """Move the oldest ``count`` turns out of the history and into the rolling summary."""
+        turns = split_turns(session.history)
+        count = min(count, len(turns) - 1)
+        if count <= 0:
+            return
+
+        lines = [line for turn in turns[:count] for line in summarize_turn(session, turn)]
+        summary = "\n".join(filter(None, [session.summary, *lines]))
+        # Keep the most recent facts when the summary outgrows its budget
+        if len(summary) > self.summary_max_chars:
+            summary = summary[-self.summary_max_chars:]
+            summary = summary[summary.find("\n") + 1:]
+        session.summary = summary
+        session.history = [content for turn in turns[count:] for content in turn]
+        session.prune_properties()
+        session.recompute_size()
+
+    def render(self, session) -> list[dict]:
+        """Build Gemini contents: summary, older turns with trimmed tool results, current turn in full."""
+        turns = split_turns(session.history)
+        contents = [
+            session.render(content, full=(i == len(turns) - 1))
+            for i, turn in enumerate(turns)
+            for content in turn
+        ]
+
+        if session.summary and contents:
+            first = contents[0]
+            contents[0] = {
+                "role": first["role"],
+                "parts": [{"text": f"{SUMMARY_HEADER}\n{session.summary}"}, *first["parts"]],
+            }
+        return contents
+
+    def build_contents(self, session) -> list[dict]:
+        """Fold old turns as needed so the contents fit the turn limit and token budget."""
+        excess = len(split_turns(session.history)) - self.max_turns
+        if excess > 0:
+            self.fold(session, excess)
+
+        contents = self.render(session)
+        while estimate_tokens(contents) > self.token_budget and len(split_turns(session.history)) > 1:
+            self.fold(session, 1)
+            contents = self.render(session)
+        return contents
+
+
+history_manager = HistoryManager(
+    max_turns=settings.HISTORY_MAX_TURNS,
+    token_budget=settings.HISTORY_TOKEN_BUDGET,
+    summary_max_chars=settings.HISTORY_SUMMARY_MAX_CHARS,
+)
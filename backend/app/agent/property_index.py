@@ -0,0 +1,308 @@
+"""
+In-process index of the property catalogue for the agent's read-only tools.
+
+Every property is held as a compact row tuple keyed by id (for
+get_property_details). Available properties are also bucketed by
+(city, property_type, bhk), and each bucket is a list of (price, id) sorted
+by price. A search picks the buckets matching the structured filters,
+bisects each to the budget range, and merges them cheapest-first. The
+location substring filter and the amenity bitmask (app.amenities) apply to
+those candidates, so a search touches only listings that are already in range.
+
+Refreshing:
+- catalogue.notify_changed(ids) marks those ids dirty. They are re-read in
+  one query on the next lookup, so the listener stays cheap for writers.
+- notify_changed(None) (seed, bulk import) schedules a full rebuild.
+- Every PROPERTY_INDEX_RECHECK_SECONDS a lookup also compares count(*) and
+  max(updated_at) with what was loaded. This picks up writes from other
+  processes: new updated_at values are applied incrementally, and a count
+  mismatch (deletions) triggers a rebuild.
+
+Callers check sync(db) before a lookup. It returns False while another
+thread is rebuilding the index, or when PROPERTY_INDEX_ENABLED is off, and
+the tools then fall back to SQL.
+"""
+
+import heapq
+from itertools import islice
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Property
+from app import catalogue
+from app.amenities import amenity_mask, normalize_amenities
+from app.agent.ranking import Ranker, sort_key
+from app.agent.text_search import TextIndex
+
+FIELDS = ("id", "title", "description", "property_type", "bhk", "price", "location", "city",
+          "area_sqft", "amenities", "status", "image_url")
+# created_at rides along after the to_dict() fields for recency ranking
+_COLUMNS = [getattr(Property, name) for name in FIELDS] + [Property.created_at]
+_CREATED = len(FIELDS)
+_ID, _TITLE, _DESCRIPTION, _TYPE, _BHK, _PRICE, _LOCATION, _CITY, _AMENITIES, _STATUS = (
+    FIELDS.index(name) for name in (
+        "id", "title", "description", "property_type", "bhk", "price", "location", "city", "amenities", "status"))
+_INF = float("inf")
+
+
+def _load_row(row) -> tuple:
+    """A result row as stored: a plain tuple with created_at as epoch seconds."""
+    row = tuple(row)
+    created = row[_CREATED]
+    return row[:_CREATED] + (created.timestamp() if created else None,)
+
+
+def row_to_dict(row: tuple) -> dict:
+    """Same shape as Property.to_dict()."""
+    return dict(zip(FIELDS, row))
+
+
+class PropertyIndex:
+    def __init__(self, enabled: bool, recheck_seconds: float, text_search: bool = True):
+        self.enabled = enabled
+        self.recheck_seconds = recheck_seconds
+        self._text_enabled = text_search
+        self._rows: dict[int, tuple] = {}
+        # (lowercased city, property_type, bhk) -> [(price, id)] sorted by price
+        self._buckets: dict[tuple, list[tuple[float, int]]] = {}
+        # Lowercased locations and amenity bitmasks by id, for the per-candidate filters
+        self._locations: dict[int, str] = {}
+        self._amenities: dict[int, int] = {}
+        # BM25 over title and description of available properties, for search_by_description
+        self.text = TextIndex() if text_search else None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._loaded = False
+        self._needs_rebuild = True
+        self._dirty: set[int] = set()
+        self._watermark = None
+        self._next_check = 0.0
+        self.rebuilds = 0
+        self.refreshed_rows = 0
+
+    # --- Maintenance ---
+
+    def invalidate(self, property_ids: list[int] | None = None):
+        """catalogue listener: only records what changed; the work happens on the next lookup."""
+        with self._lock:
+            if property_ids is None:
+                self._needs_rebuild = True
+            else:
+                self._dirty.update(property_ids)
+
+    def _bucket_key(self, row: tuple) -> tuple:
+        return (row[_CITY].lower(), row[_TYPE], row[_BHK])
+
+    def _remove(self, property_id: int):
+        row = self._rows.pop(property_id, None)
+        self._locations.pop(property_id, None)
+        self._amenities.pop(property_id, None)
+        if row is None or row[_STATUS] != "available":
+            return
+        if self.text is not None:
+            self.text.remove(property_id, row[_TITLE], row[_DESCRIPTION])
+        key = self._bucket_key(row)
+        entries = self._buckets.get(key)
+        if entries is None:
+            return
+        i = bisect_left(entries, (row[_PRICE], property_id))
+        if i < len(entries) and entries[i] == (row[_PRICE], property_id):
+            del entries[i]
+        if not entries:
+            del self._buckets[key]
+
+    def _add(self, row: tuple):
+        property_id = row[_ID]
+        self._rows[property_id] = row
+        self._locations[property_id] = row[_LOCATION].lower()
+        self._amenities[property_id] = amenity_mask(normalize_amenities(row[_AMENITIES]))
+        if row[_STATUS] == "available":
+            insort(self._buckets.setdefault(self._bucket_key(row), []), (row[_PRICE], property_id))
+            if self.text is not None:
+                self.text.add(property_id, row[_TITLE], row[_DESCRIPTION])
+
+    def _rebuild(self, db: Session):
+        start = time.perf_counter()
+        rows: dict[int, tuple] = {}
+        buckets: dict[tuple, list[tuple[float, int]]] = {}
+        locations: dict[int, str] = {}
+        amenities: dict[int, int] = {}
+        text = TextIndex() if self._text_enabled else None
+        watermark = db.execute(select(func.max(Property.updated_at))).scalar()
+        # Id order keeps the text index's postings append-only while loading
+        result = db.execute(select(*_COLUMNS).order_by(Property.id).execution_options(yield_per=10_000))
+        for row in result:
+            row = _load_row(row)
+            rows[row[_ID]] = row
+            locations[row[_ID]] = row[_LOCATION].lower()
+            amenities[row[_ID]] = amenity_mask(normalize_amenities(row[_AMENITIES]))
+            if row[_STATUS] == "available":
+                buckets.setdefault(self._bucket_key(row), []).append((row[_PRICE], row[_ID]))
+                if text is not None:
+                    text.add(row[_ID], row[_TITLE], row[_DESCRIPTION])
+        for entries in buckets.values():
+            entries.sort()
+
+        with self._lock:
+            self._rows, self._buckets = rows, buckets
+            self._locations, self._amenities = locations, amenities
+            self.text = text
+            self._watermark = watermark
+            self._loaded = True
+            self._needs_rebuild = False
+            self._dirty.clear()
+            self._next_check = time.monotonic() + self.recheck_seconds
+        self.rebuilds += 1
+        print(f"[PROPERTY INDEX] Loaded {len(rows)} properties in {time.perf_counter() - start:.2f}s")
+
+    def _refresh(self, db: Session, property_ids: set[int]):
+        fetched = db.execute(select(*_COLUMNS).where(Property.id.in_(property_ids))).all()
+        with self._lock:
+            for property_id in property_ids:
+                self._remove(property_id)
+            for row in fetched:
+                self._add(_load_row(row))
+        self.refreshed_rows += len(property_ids)
+
+    def _recheck(self, db: Session):
+        total, watermark = db.execute(select(func.count(Property.id), func.max(Property.updated_at))).one()
+        if watermark is not None and self._watermark is not None and watermark > self._watermark:
+            changed = db.execute(select(Property.id).where(Property.updated_at >= self._watermark)).scalars().all()
+            self._refresh(db, set(changed))
+            self._watermark = watermark
+        if total != len(self._rows):
+            with self._lock:
+                self._needs_rebuild = True
+
+    def sync(self, db: Session) -> bool:
+        """Bring the index up to date. False if it can't answer lookups right now."""
+        if not self.enabled:
+            return False
+        if self._needs_rebuild:
+            if not self._rebuild_lock.acquire(blocking=False):
+                return False
+            try:
+                if self._needs_rebuild:
+                    self._rebuild(db)
+            finally:
+                self._rebuild_lock.release()
+
+        if time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.recheck_seconds
+            self._recheck(db)
+            if self._needs_rebuild:
+                return self.sync(db)
+
+        if self._dirty:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            self._refresh(db, dirty)
+        return self._loaded
+
+    # --- Lookups ---
+
+    def get(self, property_id: int) -> dict | None:
+        row = self._rows.get(property_id)
+        return row_to_dict(row) if row else None
+
+    def _candidates(self, filters: dict):
+        """
+        Ids of available properties matching the search_properties filters, cheapest first.
+
+        Filters behave like the SQL query: cities and locations are exact
+        values, city and location case-insensitive substrings, amenities
+        must all match (or any, with amenities_match="any"), and empty values
+        are ignored. Callers hold self._lock while consuming it.
+        """
+        city = (filters.get("city") or "").lower()
+        location = (filters.get("location") or "").lower()
+        # Exact values resolved by app.localities take precedence over the raw substrings
+        cities = {c.lower() for c in filters["cities"]} if filters.get("cities") is not None else None
+        locations = {loc.lower() for loc in filters["locations"]} if filters.get("locations") is not None else None
+        property_type = filters.get("property_type")
+        bhk_min = int(filters["bhk_min"]) if filters.get("bhk_min") else None
+        bhk_max = int(filters["bhk_max"]) if filters.get("bhk_max") else None
+        wanted = amenity_mask(normalize_amenities(filters.get("amenities")))
+        match_any = filters.get("amenities_match") == "any"
+        low = (float(filters["budget_min"]),) if filters.get("budget_min") else (-_INF,)
+        high = (float(filters["budget_max"]), _INF) if filters.get("budget_max") else (_INF, _INF)
+
+        ranges = []
+        for (bucket_city, bucket_type, bhk), entries in self._buckets.items():
+            if cities is not None:
+                if bucket_city not in cities:
+                    continue
+            elif city and city not in bucket_city:
+                continue
+            if property_type and bucket_type != property_type:
+                continue
+            if bhk_min and (bhk is None or bhk < bhk_min):
+                continue
+            if bhk_max and (bhk is None or bhk > bhk_max):
+                continue
+            start, end = bisect_left(entries, low), bisect_right(entries, high)
+            if start < end:
+                ranges.append(map(entries.__getitem__, range(start, end)))
+
+        for _, property_id in heapq.merge(*ranges):
+            if locations is not None:
+                if self._locations[property_id] not in locations:
+                    continue
+            elif location and location not in self._locations[property_id]:
+                continue
+            if wanted:
+                mask = self._amenities[property_id]
+                if not (mask & wanted if match_any else (mask & wanted) == wanted):
+                    continue
+            yield property_id
+
+    def search(self, limit: int = 5, **filters) -> list[dict]:
+        """The first `limit` matches, cheapest first."""
+        with self._lock:
+            return [row_to_dict(self._rows[property_id])
+                    for property_id in islice(self._candidates(filters), limit)]
+
+    def ranked_search(self, ranker: Ranker, limit: int = 5, after: tuple | None = None,
+                      **filters) -> list[tuple[tuple, dict]]:
+        """
+        Up to limit + 1 matches as (sort key, property dict), best first.
+
+        after is the sort key of the last result on the previous page. The
+        extra result tells the caller whether there is a next page.
+        """
+        with self._lock:
+            keys = []
+            for property_id in self._candidates(filters):
+                row = self._rows[property_id]
+                key = sort_key(ranker.score(row[_PRICE], row[_BHK], row[_LOCATION],
+                                            self._amenities[property_id], row[_CREATED]), property_id)
+                if after is None or key > after:
+                    keys.append(key)
+            best = heapq.nsmallest(limit + 1, keys)
+            return [(key, row_to_dict(self._rows[key[1]])) for key in best]
+
+    def text_search(self, query: str, limit: int = 5, **filters) -> list[tuple[float, dict]]:
+        """
+        (BM25 score, property dict) for the best description matches, best first.
+
+        Any structured filter narrows the matches to what _candidates yields for it.
+        """
+        with self._lock:
+            if self.text is None:
+                return []
+            allowed = None
+            if any(value not in (None, "") for value in filters.values()):
+                allowed = set(self._candidates(filters))
+            return [(score, row_to_dict(self._rows[property_id]))
+                    for score, property_id in self.text.search(query, limit, allowed)]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+property_index = PropertyIndex(settings.PROPERTY_INDEX_ENABLED, settings.PROPERTY_INDEX_RECHECK_SECONDS,
+                               settings.TEXT_SEARCH_ENABLED)
+catalogue.subscribe(property_index.invalidate)
@@ -0,0 +1,96 @@
+"""
+Relevance ranking and cursors for search_properties.
+
+Each matching property gets a score in [0, 1], a weighted sum of:
+- budget fit: prices close to the budget cap score highest
+- BHK fit: closeness to the requested BHK
+- locality match: trigram similarity between the user's locality term and
+  the property's location
+- amenity overlap: the share of requested amenities present (this matters
+  with amenities_match="any")
+- recency: listings decay with age, halving in RECENCY_HALF_LIFE_DAYS
+
+Dimensions the user didn't ask about add nothing, so they don't reorder
+results. Pages are ordered by (score desc, id asc) and paginated by keyset.
+The opaque cursor carries the search arguments, the last (score, id) and
+the as_of time used for recency. That way a follow-up page scores
+identically and only needs the cursor. Cursors come back from clients, so
+decode_cursor only accepts the search_properties filter arguments.
+"""
+
+import base64
+import json
+import time
+from datetime import datetime
+from app.amenities import amenity_mask, normalize_amenities
+from app.localities import normalize_place, similarity, trigrams
+
+WEIGHTS = {"budget": 0.35, "bhk": 0.15, "locality": 0.2, "amenities": 0.2, "recency": 0.1}
+RECENCY_HALF_LIFE_DAYS = 30
+# The search_properties arguments a cursor may carry (everything but the cursor itself)
+SEARCH_ARGS = frozenset({"city", "location", "property_type", "bhk_min", "bhk_max", "budget_min", "budget_max",
+                         "amenities", "amenities_match"})
+
+
+class CursorError(ValueError):
+    pass
+
+
+class Ranker:
+    def __init__(self, args: dict, as_of: float | None = None):
+        self.as_of = as_of if as_of is not None else time.time()
+        self.budget_min = float(args["budget_min"]) if args.get("budget_min") else None
+        self.budget_max = float(args["budget_max"]) if args.get("budget_max") else None
+        self.bhk_target = int(args.get("bhk_min") or args.get("bhk_max") or 0) or None
+        self.location_grams = trigrams(normalize_place(args.get("location") or ""))
+        self.wanted = amenity_mask(normalize_amenities(args.get("amenities")))
+        self.wanted_count = self.wanted.bit_count()
+        self._locality_scores: dict[str, float] = {}
+
+    def _locality(self, location: str) -> float:
+        score = self._locality_scores.get(location)
+        if score is None:
+            score = self._locality_scores[location] = similarity(
+                self.location_grams, trigrams(normalize_place(location)))
+        return score
+
+    def score(self, price: float, bhk: int | None, location: str, amenities: int, created_at) -> float:
+        total = 0.0
+        if self.budget_max:
+            total += WEIGHTS["budget"] * max(0.0, 1 - abs(self.budget_max - price) / self.budget_max)
+        elif self.budget_min:
+            total += WEIGHTS["budget"] / (1 + max(0.0, price - self.budget_min) / self.budget_min)
+        if self.bhk_target and bhk is not None:
+            total += WEIGHTS["bhk"] / (1 + abs(bhk - self.bhk_target))
+        if self.location_grams:
+            total += WEIGHTS["locality"] * self._locality(location)
+        if self.wanted_count:
+            total += WEIGHTS["amenities"] * (amenities & self.wanted).bit_count() / self.wanted_count
+        if created_at is not None:
+            if isinstance(created_at, datetime):
+                created_at = created_at.timestamp()
+            age_days = max(0.0, self.as_of - created_at) / 86400
+            total += WEIGHTS["recency"] * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+        return round(total, 6)
+
+
+def sort_key(score: float, property_id: int) -> tuple:
+    return (-score, property_id)
+
+
+def encode_cursor(args: dict, as_of: float, score: float, property_id: int) -> str:
+    payload = json.dumps({"a": args, "t": as_of, "s": score, "i": property_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dict, float, tuple]:
+    """(search args, as_of, keyset position) from a cursor made by encode_cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        args = payload["a"]
+        position = float(payload["t"]), sort_key(float(payload["s"]), int(payload["i"]))
+    except (ValueError, KeyError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+    if not isinstance(args, dict) or not args.keys() <= SEARCH_ARGS:
+        raise CursorError("Invalid cursor")
+    return args, *position
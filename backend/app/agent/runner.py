@@ -0,0 +1,78 @@
+"""
+Bounded executor for blocking agent work.
+
+Tool executors and lead bookkeeping use the synchronous SQLAlchemy session,
+so the agent hands them to a fixed-size thread pool instead of running them
+on the event loop.
+"""
+
+import asyncio
+import contextvars
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import TOOL_SECONDS
+from app.agent.tools import TOOL_REGISTRY, READ_ONLY_TOOLS
+
+tool_executor = ThreadPoolExecutor(
+    max_workers=settings.AGENT_TOOL_WORKERS,
+    thread_name_prefix="agent-tool",
+)
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking callable on the tool pool and await its result."""
+    loop = asyncio.get_running_loop()
+    # Carry context variables into the worker thread, as asyncio.to_thread does
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(tool_executor, partial(ctx.run, fn, *args, **kwargs))
+
+
+def run_tool(name: str, args: dict, session_id: str) -> dict:
+    """Execute one registered tool in its own DB session."""
+    executor = TOOL_REGISTRY.get(name)
+    if not executor:
+        return {"error": f"Unknown tool: {name}"}
+
+    db = SessionLocal()
+    try:
+        with TOOL_SECONDS.time(name):
+            return executor(db=db, session_id=session_id, **args)
+    except Exception as e:
+        print(f"[AGENT ERROR] Tool {name} failed: {e}")
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
+async def run_tool_calls(calls: list[tuple[str, dict]], session_id: str,
+                         run: Callable[[str, dict], Awaitable[dict]] | None = None) -> list[dict]:
+    """
+    Execute the function calls from one model response concurrently.
+
+    Read-only tools each get their own task; the remaining tools run one after
+    another in the order given, alongside the reads. Results come back in the
+    same order as ``calls``. ``run`` overrides how a single call is executed
+    (the engine wraps it with tracing).
+    """
+    if run is None:
+        def run(name, args):
+            return run_blocking(run_tool, name, args, session_id)
+
+    results: list[dict | None] = [None] * len(calls)
+
+    async def run_one(i: int):
+        name, args = calls[i]
+        results[i] = await run(name, args)
+
+    async def run_in_order(indices: list[int]):
+        for i in indices:
+            await run_one(i)
+
+    reads = [i for i, (name, _) in enumerate(calls) if name in READ_ONLY_TOOLS]
+    writes = [i for i, (name, _) in enumerate(calls) if name not in READ_ONLY_TOOLS]
+    await asyncio.gather(*(run_one(i) for i in reads), run_in_order(writes))
+    return results
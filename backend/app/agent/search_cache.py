@@ -0,0 +1,87 @@
+"""
+Result cache for search_properties.
+
+Voice and chat users repeat the same few city/BHK/budget combinations, so
+results are cached by their normalized arguments with a TTL and LRU eviction.
+Any catalogue write clears the cache through app.catalogue. The TTL bounds
+staleness from writers in other processes, such as the import script.
+
+ranked_cache holds the top of each ranked search under (normalized args,
+as_of), so cursor pages of the same search read it instead of re-ranking.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from app.config import settings
+from app import catalogue
+
+_INT_ARGS = {"bhk_min", "bhk_max"}
+_FLOAT_ARGS = {"budget_min", "budget_max"}
+
+
+def normalize_search_args(args: dict) -> tuple:
+    """Canonical, hashable form of search arguments; empty values are dropped like the query does."""
+    items = []
+    for name, value in args.items():
+        if not value:
+            continue
+        if name in _INT_ARGS:
+            value = int(value)
+        elif name in _FLOAT_ARGS:
+            value = float(value)
+        elif isinstance(value, str):
+            value = " ".join(value.lower().split())
+        elif isinstance(value, (list, tuple)):
+            value = tuple(sorted({" ".join(str(v).lower().split()) for v in value}))
+        items.append((name, value))
+    return tuple(sorted(items))
+
+
+class SearchCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on invalidation so results computed before a write are not stored after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, value, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, property_ids: list[int] | None = None):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+search_cache = SearchCache(settings.SEARCH_CACHE_MAX_ENTRIES, settings.SEARCH_CACHE_TTL_SECONDS)
+catalogue.subscribe(search_cache.invalidate)
+ranked_cache = SearchCache(settings.SEARCH_RANKED_CACHE_MAX_ENTRIES, settings.SEARCH_CACHE_TTL_SECONDS)
+catalogue.subscribe(ranked_cache.invalidate)
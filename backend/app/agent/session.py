@@ -1,45 +1,283 @@
+import json
 import time
+from collections import OrderedDict
+from app.config import settings
+
+
+def _approx_size(value) -> int:
+    return len(json.dumps(value, default=str))
+
+
+def property_ref(prop: dict) -> dict:
+    """The fields the model needs to refer back to a property it has already seen."""
+    return {k: prop.get(k) for k in ("id", "title", "price", "location", "bhk")}
+
+
+class TextPart:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def to_dict(self, properties: dict, full: bool = True) -> dict:
+        return {"text": self.text}
+
+    def to_record(self) -> list:
+        return ["t", self.text]
+
+    def approx_size(self) -> int:
+        return len(self.text)
+
+
+class FunctionCallPart:
+    __slots__ = ("name", "args")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def to_dict(self, properties: dict, full: bool = True) -> dict:
+        return {"function_call": {"name": self.name, "args": self.args}}
+
+    def to_record(self) -> list:
+        return ["c", self.name, self.args]
+
+    def approx_size(self) -> int:
+        return len(self.name) + _approx_size(self.args)
+
+
+class FunctionResponsePart:
+    """
+    A tool result with any property dicts swapped for ids.
+
+    The dicts themselves live once per session in ConversationSession.properties;
+    ``key`` records whether they came back as a "properties" list or a single
+    "property".
+    """
+
+    __slots__ = ("name", "response", "key", "property_ids")
+
+    def __init__(self, name: str, response: dict, key: str | None = None, property_ids: list[int] | None = None):
+        self.name = name
+        self.response = response
+        self.key = key
+        self.property_ids = property_ids
+
+    def to_dict(self, properties: dict, full: bool = True) -> dict:
+        response = self.response
+        if self.key:
+            render = (lambda p: p) if full else property_ref
+            props = [render(properties[i]) for i in self.property_ids if i in properties]
+            response = {**response, self.key: props if self.key == "properties" else (props[0] if props else None)}
+        return {"function_response": {"name": self.name, "response": response}}
+
+    def to_record(self) -> list:
+        return ["r", self.name, self.response, self.key, self.property_ids]
+
+    def approx_size(self) -> int:
+        return len(self.name) + _approx_size(self.response) + 8 * len(self.property_ids or ())
+
+
+def part_from_record(record: list):
+    kind = record[0]
+    if kind == "t":
+        return TextPart(record[1])
+    if kind == "c":
+        return FunctionCallPart(record[1], record[2])
+    return FunctionResponsePart(record[1], record[2], record[3], record[4])
+
+
+def part_from_dict(part: dict):
+    if "text" in part:
+        return TextPart(part["text"])
+    if "function_call" in part:
+        return FunctionCallPart(part["function_call"]["name"], part["function_call"]["args"])
+    raise ValueError(f"Unsupported part: {part}")
+
+
+class Content:
+    __slots__ = ("role", "parts")
+
+    def __init__(self, role: str, parts: list):
+        self.role = role
+        self.parts = parts
+
+    @property
+    def is_user_text(self) -> bool:
+        return self.role == "user" and any(isinstance(p, TextPart) for p in self.parts)
+
+    def to_dict(self, properties: dict, full: bool = True) -> dict:
+        return {"role": self.role, "parts": [p.to_dict(properties, full) for p in self.parts]}
+
+    def approx_size(self) -> int:
+        return sum(p.approx_size() for p in self.parts)
 
 
 class ConversationSession:
+    """
+    Conversation state in a compact form.
+
+    History is a list of slotted Content/part objects. Property dicts returned
+    by tools are stored once, keyed by id, and referenced from history. Gemini
+    contents are only built (get_contents / HistoryManager.render) when a
+    model call needs them.
+    """
+
     def __init__(self, session_id: str):
         self.session_id = session_id
-        self.history: list[dict] = []
-        self.last_search_results: list[dict] = []
+        self.history: list[Content] = []
+        self.properties: dict[int, dict] = {}
+        self.last_search_ids: list[int] = []
+        self.summary = ""
         self.created_at = time.time()
+        self.last_active_at = self.created_at
+        # Rough serialized size of history, kept up to date for the store's memory cap
+        self.approx_bytes = 0
+        self.on_resize = None
+        # Version of the stored copy this was loaded from (shared session backends)
+        self.version = 0
+
+    @property
+    def last_search_results(self) -> list[dict]:
+        return [self.properties[i] for i in self.last_search_ids if i in self.properties]
+
+    @last_search_results.setter
+    def last_search_results(self, results: list[dict]):
+        self.last_search_ids = self._store_properties(results)
+
+    def _store_properties(self, props: list[dict]) -> list[int]:
+        ids = []
+        for prop in props:
+            pid = prop["id"]
+            if pid not in self.properties:
+                self._account(_approx_size(prop))
+            self.properties[pid] = prop
+            ids.append(pid)
+        return ids
+
+    def _append(self, content: Content):
+        self.history.append(content)
+        self._account(content.approx_size())
+
+    def _account(self, delta: int):
+        self.approx_bytes += delta
+        if self.on_resize:
+            self.on_resize(delta)
+
+    def prune_properties(self):
+        """Forget property dicts no longer referenced by history or the last search."""
+        referenced = set(self.last_search_ids)
+        for content in self.history:
+            for part in content.parts:
+                if isinstance(part, FunctionResponsePart) and part.property_ids:
+                    referenced.update(part.property_ids)
+        for pid in [pid for pid in self.properties if pid not in referenced]:
+            del self.properties[pid]
+
+    def recompute_size(self):
+        """Re-measure after the history was rewritten (e.g. old turns folded into the summary)."""
+        size = (sum(c.approx_size() for c in self.history)
+                + sum(_approx_size(p) for p in self.properties.values())
+                + len(self.summary))
+        self._account(size - self.approx_bytes)
 
     def add_user_message(self, text: str):
-        self.history.append({"role": "user", "parts": [{"text": text}]})
+        self._append(Content("user", [TextPart(text)]))
 
-    def add_model_response(self, parts: list):
-        self.history.append({"role": "model", "parts": parts})
+    def add_model_response(self, parts: list[dict]):
+        self._append(Content("model", [part_from_dict(p) for p in parts]))
 
     def add_function_response(self, name: str, response: dict):
-        self.history.append({
-            "role": "user",
-            "parts": [{"function_response": {"name": name, "response": response}}],
-        })
+        key = ids = None
+        if isinstance(response.get("properties"), list):
+            key, ids = "properties", self._store_properties(response["properties"])
+        elif isinstance(response.get("property"), dict):
+            key, ids = "property", self._store_properties([response["property"]])
+        if key:
+            response = {k: v for k, v in response.items() if k != key}
+        self._append(Content("user", [FunctionResponsePart(name, response, key, ids)]))
+
+    def render(self, content: Content, full: bool = True) -> dict:
+        return content.to_dict(self.properties, full)
 
     def get_contents(self) -> list[dict]:
-        return self.history
+        return [self.render(c) for c in self.history]
 
 
 class SessionStore:
-    def __init__(self, ttl_seconds: int = 3600):
-        self._sessions: dict[str, ConversationSession] = {}
+    """
+    Process-local sessions with sliding expiry and LRU caps.
+
+    The dict is kept in last-activity order (touched sessions move to the
+    end), so expiry only ever looks at the oldest entries: each session is
+    examined once when it expires, making cleanup amortised O(1) per call.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, max_sessions: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self._sessions: OrderedDict[str, ConversationSession] = OrderedDict()
         self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.expired = 0
+        self.evicted = 0
 
     def get_or_create(self, session_id: str) -> ConversationSession:
-        self._cleanup_expired()
-        if session_id not in self._sessions:
-            self._sessions[session_id] = ConversationSession(session_id)
-        return self._sessions[session_id]
-
-    def _cleanup_expired(self):
         now = time.time()
-        expired = [k for k, v in self._sessions.items() if now - v.created_at > self.ttl]
-        for k in expired:
-            del self._sessions[k]
+        self._cleanup_expired(now)
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = ConversationSession(session_id)
+            session.on_resize = self._on_resize
+            self._sessions[session_id] = session
+        else:
+            self._sessions.move_to_end(session_id)
+        session.last_active_at = now
+
+        self._enforce_caps(keep=session_id)
+        return session
+
+    def _on_resize(self, delta: int):
+        self.total_bytes += delta
+
+    def _remove(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        session.on_resize = None
+        self.total_bytes -= session.approx_bytes
+
+    def _cleanup_expired(self, now: float):
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_active_at <= self.ttl:
+                break
+            self._remove(session_id)
+            self.expired += 1
+
+    def _enforce_caps(self, keep: str):
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self.total_bytes > self.max_bytes
+        ):
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                break
+            self._remove(session_id)
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        return {
+            "live_sessions": len(self._sessions),
+            "approx_bytes": self.total_bytes,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
 
 
-session_store = SessionStore()
+session_store = SessionStore(
+    ttl_seconds=settings.SESSION_TTL_SECONDS,
+    max_sessions=settings.SESSION_MAX_COUNT,
+    max_bytes=settings.SESSION_MAX_BYTES,
+)
@@ -0,0 +1,215 @@
+"""
+Pluggable storage for conversation sessions.
+
+The default "memory" backend is the process-local SessionStore. The "redis"
+and "postgres" backends keep sessions in shared storage so any uvicorn
+worker or replica can serve the next message of a conversation. Shared
+backends serialize a session to compact zlib-compressed JSON and guard writes
+with a version number. A save that lost a race raises SessionConflict, and
+save_turn() then re-applies the turn on top of the newer copy.
+"""
+
+import json
+import time
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import AgentSession
+from app.agent.session import ConversationSession, Content, part_from_record, session_store
+from app.agent.runner import run_blocking
+
+MAX_SAVE_ATTEMPTS = 3
+
+
+class SessionConflict(Exception):
+    """The stored session changed since it was loaded."""
+
+
+def serialize_session(session: ConversationSession) -> bytes:
+    data = {
+        "h": [[c.role, [p.to_record() for p in c.parts]] for c in session.history],
+        "p": list(session.properties.values()),
+        "l": session.last_search_ids,
+        "s": session.summary,
+        "c": session.created_at,
+    }
+    return zlib.compress(json.dumps(data, separators=(",", ":"), default=str).encode(), 1)
+
+
+def deserialize_session(session_id: str, blob: bytes, version: int) -> ConversationSession:
+    data = json.loads(zlib.decompress(blob))
+    session = ConversationSession(session_id)
+    session.history = [Content(role, [part_from_record(r) for r in parts]) for role, parts in data["h"]]
+    session.properties = {p["id"]: p for p in data["p"]}
+    session.last_search_ids = data["l"]
+    session.summary = data["s"]
+    session.created_at = data["c"]
+    session.version = version
+    session.recompute_size()
+    return session
+
+
+class SessionBackend:
+    # Whether load/save do I/O and should run off the event loop
+    blocking = True
+
+    def load(self, session_id: str) -> ConversationSession:
+        raise NotImplementedError
+
+    def save(self, session: ConversationSession):
+        """Persist the session, raising SessionConflict if its version is stale."""
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        return 0
+
+
+class MemoryBackend(SessionBackend):
+    """Sessions live in this process; the loaded object is the stored one, so saving is a no-op."""
+
+    blocking = False
+
+    def load(self, session_id: str) -> ConversationSession:
+        return session_store.get_or_create(session_id)
+
+    def save(self, session: ConversationSession):
+        pass
+
+
+class RedisBackend(SessionBackend):
+    """Sessions as Redis hashes {v: version, d: blob}, written with WATCH/MULTI and a sliding TTL."""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "session:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl_seconds
+        self.prefix = prefix
+
+    def load(self, session_id: str) -> ConversationSession:
+        stored = self.client.hgetall(self.prefix + session_id)
+        if not stored:
+            return ConversationSession(session_id)
+        return deserialize_session(session_id, stored[b"d"], int(stored[b"v"]))
+
+    def save(self, session: ConversationSession):
+        import redis
+
+        key = self.prefix + session.session_id
+        blob = serialize_session(session)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.hget(key, "v")
+                if int(current or 0) != session.version:
+                    raise SessionConflict(session.session_id)
+                pipe.multi()
+                pipe.hset(key, mapping={"v": session.version + 1, "d": blob})
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+            except redis.WatchError:
+                raise SessionConflict(session.session_id)
+        session.version += 1
+
+
+class PostgresBackend(SessionBackend):
+    """Sessions as rows of the agent_sessions table, updated with compare-and-set on version."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl = ttl_seconds
+        AgentSession.__table__.create(bind=engine, checkfirst=True)
+
+    def load(self, session_id: str) -> ConversationSession:
+        db = SessionLocal()
+        try:
+            row = db.get(AgentSession, session_id)
+            if not row:
+                return ConversationSession(session_id)
+            return deserialize_session(session_id, row.data, row.version)
+        finally:
+            db.close()
+
+    def save(self, session: ConversationSession):
+        blob = serialize_session(session)
+        db = SessionLocal()
+        try:
+            if session.version == 0:
+                db.add(AgentSession(session_id=session.session_id, version=1, data=blob))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    raise SessionConflict(session.session_id)
+            else:
+                result = db.execute(
+                    update(AgentSession)
+                    .where(AgentSession.session_id == session.session_id)
+                    .where(AgentSession.version == session.version)
+                    .values(data=blob, version=AgentSession.version + 1, updated_at=datetime.utcnow())
+                )
+                db.commit()
+                if result.rowcount != 1:
+                    raise SessionConflict(session.session_id)
+        finally:
+            db.close()
+        session.version += 1
+
+    def purge_expired(self) -> int:
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+            deleted = db.query(AgentSession).filter(AgentSession.updated_at < cutoff).delete()
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+
+def create_backend() -> SessionBackend:
+    if settings.SESSION_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL, settings.SESSION_TTL_SECONDS)
+    if settings.SESSION_BACKEND == "postgres":
+        return PostgresBackend(settings.SESSION_TTL_SECONDS)
+    return MemoryBackend()
+
+
+session_backend = create_backend()
+
+
+async def load_session(session_id: str) -> ConversationSession:
+    if session_backend.blocking:
+        session = await run_blocking(session_backend.load, session_id)
+    else:
+        session = session_backend.load(session_id)
+    session.last_active_at = time.time()
+    return session
+
+
+def _save_turn(session: ConversationSession, turn_start: Content):
+    for _ in range(MAX_SAVE_ATTEMPTS):
+        try:
+            session_backend.save(session)
+            return
+        except SessionConflict:
+            # Another worker saved this conversation meanwhile: replay this
+            # turn's messages on top of its copy and try again
+            index = next(i for i, c in enumerate(session.history) if c is turn_start)
+            latest = session_backend.load(session.session_id)
+            latest.history.extend(session.history[index:])
+            latest.properties.update(session.properties)
+            latest.last_search_ids = session.last_search_ids
+            session.history, session.summary, session.version = latest.history, latest.summary, latest.version
+            session.properties = latest.properties
+            session.recompute_size()
+    print(f"[AGENT ERROR] Could not save session {session.session_id} after {MAX_SAVE_ATTEMPTS} attempts")
+
+
+async def save_turn(session: ConversationSession, turn_start: Content):
+    """Persist a finished turn; ``turn_start`` is the turn's user message, used to replay it on conflict."""
+    if session_backend.blocking:
+        await run_blocking(_save_turn, session, turn_start)
+    else:
+        _save_turn(session, turn_start)
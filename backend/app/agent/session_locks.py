@@ -0,0 +1,81 @@
+"""
+Per-session ordering for overlapping messages.
+
+Turns for the same session run one at a time in arrival order (an asyncio
+lock per session), while other sessions are unaffected. A session may have
+only SESSION_MAX_PENDING turns queued or running; further messages are
+rejected with SessionBusy. A message identical to one already in flight for
+that session (a double-submit or a frontend retry) does not run again. It
+waits for the original turn and receives the same result.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from app.config import settings
+
+
+class SessionBusy(Exception):
+    """Too many messages queued for one session."""
+
+
+class _SessionSlot:
+    __slots__ = ("lock", "pending", "inflight")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+        # message text -> future resolved with the turn's "done" event
+        self.inflight: dict[str, asyncio.Future] = {}
+
+
+class SessionGate:
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._slots: dict[str, _SessionSlot] = {}
+        self.coalesced = 0
+        self.rejected = 0
+
+    def in_flight(self, session_id: str, message: str) -> asyncio.Future | None:
+        """The pending result of an identical message already queued or running, if any."""
+        slot = self._slots.get(session_id)
+        future = slot.inflight.get(message) if slot else None
+        if future is not None:
+            self.coalesced += 1
+        return future
+
+    @asynccontextmanager
+    async def turn(self, session_id: str, message: str):
+        """
+        Wait for this session's earlier turns, then hold the session for one turn.
+
+        Yields a future the caller resolves with the turn's "done" event so
+        coalesced duplicates can reuse it.
+        """
+        slot = self._slots.get(session_id)
+        if slot is None:
+            slot = self._slots[session_id] = _SessionSlot()
+        if slot.pending >= self.max_pending:
+            self.rejected += 1
+            raise SessionBusy(session_id)
+
+        slot.pending += 1
+        future = asyncio.get_running_loop().create_future()
+        slot.inflight[message] = future
+        try:
+            async with slot.lock:
+                yield future
+        finally:
+            slot.pending -= 1
+            if slot.inflight.get(message) is future:
+                del slot.inflight[message]
+            if not future.done():
+                # Turn abandoned (error or client went away); duplicates run on their own
+                future.set_result(None)
+            if slot.pending == 0:
+                del self._slots[session_id]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+session_gate = SessionGate(settings.SESSION_MAX_PENDING)
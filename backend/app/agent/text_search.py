@@ -0,0 +1,170 @@
+"""
+BM25 retrieval over property titles and descriptions.
+
+Backs the search_by_description tool, which covers wishes the structured
+filters can't express ("sea-facing flat near a metro station", "quiet lane
+with a terrace"). It is pure Python and CPU-only, so it runs offline.
+
+PropertyIndex owns the TextIndex and keeps it in step with its rows. Only
+available properties are indexed, and a property write re-indexes just
+that document. Postings are compact arrays of doc ids (sorted) and term
+frequencies per term. Queries score term-at-a-time with MaxScore pruning.
+A search can be restricted to an allowed id set produced by the structured
+filters.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "i", "in", "is", "it",
+    "its", "looking", "me", "my", "of", "on", "or", "some", "something", "that", "the", "to", "want",
+    "with", "within", "would", "like", "find", "show", "any", "please", "property", "properties",
+}
+# Query-side equivalents so users' words meet the catalogue's words
+QUERY_SYNONYMS = {
+    "flat": "apartment", "flats": "apartment", "bungalow": "villa", "seaview": "sea", "oceanfront": "sea",
+    "ocean": "sea", "beach": "sea", "subway": "metro", "train": "railway", "rail": "railway",
+    "calm": "quiet", "peaceful": "quiet", "balcony": "terrace",
+}
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    return [_stem(word) for word in _TOKEN.findall((text or "").lower()) if word not in STOPWORDS]
+
+
+def query_terms(text: str) -> list[str]:
+    terms = []
+    for word in _TOKEN.findall((text or "").lower()):
+        if word in STOPWORDS:
+            continue
+        term = _stem(QUERY_SYNONYMS.get(word, word))
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+class TextIndex:
+    def __init__(self):
+        # term -> (doc ids, term frequencies), parallel arrays
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._lengths: dict[int, int] = {}
+        self._total_length = 0
+
+    @staticmethod
+    def _document(title: str, description: str | None) -> list[str]:
+        return tokenize(title) + tokenize(description)
+
+    def add(self, doc_id: int, title: str, description: str | None):
+        tokens = self._document(title, description)
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = (array("i"), array("H"))
+            ids, tfs = posting
+            # Postings stay sorted by doc id (searches bisect them); new listings append
+            if ids and ids[-1] > doc_id:
+                i = bisect_left(ids, doc_id)
+                ids.insert(i, doc_id)
+                tfs.insert(i, min(tf, 65535))
+            else:
+                ids.append(doc_id)
+                tfs.append(min(tf, 65535))
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: int, title: str, description: str | None):
+        """Drop a document; title and description must be what it was added with."""
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in set(self._document(title, description)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            try:
+                i = posting[0].index(doc_id)
+            except ValueError:
+                continue
+            del posting[0][i]
+            del posting[1][i]
+            if not posting[0]:
+                del self._postings[term]
+
+    def search(self, query: str, limit: int = 5, allowed: set[int] | None = None) -> list[tuple[float, int]]:
+        """
+        Top (score, doc id) pairs for the query, best first, optionally only among allowed ids.
+
+        Terms are scored rarest first. Once the k-th best score beats the most
+        the remaining terms could add (MaxScore), documents not seen yet can't
+        reach the top. The remaining terms are then only looked up, by bisect,
+        for the documents still in contention. A small allowed set is looked
+        up the same way instead of scanning long postings.
+        """
+        count = len(self._lengths)
+        if not count:
+            return []
+        average = self._total_length / count or 1.0
+        lengths = self._lengths
+        base, per_length = K1 * (1 - B), K1 * B / average
+
+        terms = []
+        for term in query_terms(query):
+            posting = self._postings.get(term)
+            if posting is not None:
+                df = len(posting[0])
+                terms.append((math.log(1 + (count - df + 0.5) / (df + 0.5)), posting))
+        terms.sort(key=lambda item: -item[0])
+        # remaining[i]: the most terms i.. can add to any document's score
+        remaining = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + terms[i][0] * (K1 + 1)
+
+        scores: dict[int, float] = {}
+        contenders = None
+        for i, (idf, (ids, tfs)) in enumerate(terms):
+            if contenders is None and len(scores) >= limit:
+                kth = heapq.nlargest(limit, scores.values())[-1]
+                if kth >= remaining[i]:
+                    contenders = [doc for doc, score in scores.items() if score + remaining[i] >= kth]
+            lookup = contenders if contenders is not None else (
+                allowed if allowed is not None and len(allowed) * 8 < len(ids) else None)
+
+            if lookup is not None:
+                size = len(ids)
+                for doc_id in lookup:
+                    j = bisect_left(ids, doc_id)
+                    if j < size and ids[j] == doc_id:
+                        tf = tfs[j]
+                        scores[doc_id] = scores.get(doc_id, 0.0) + \
+                            idf * tf * (K1 + 1) / (tf + base + per_length * lengths[doc_id])
+            else:
+                for doc_id, tf in zip(ids, tfs):
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    scores[doc_id] = scores.get(doc_id, 0.0) + \
+                        idf * tf * (K1 + 1) / (tf + base + per_length * lengths[doc_id])
+        return heapq.nlargest(limit, ((score, doc_id) for doc_id, score in scores.items()),
+                              key=lambda item: (item[0], -item[1]))
+
+    def __len__(self) -> int:
+        return len(self._lengths)
@@ -1,13 +1,29 @@
 import json
+import heapq
+import time
+from bisect import bisect_right
+from operator import itemgetter
+from datetime import date, datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from app.models import Property, Lead, Requirement, Booking
-from app.notifications import send_booking_notifications
+from app.models import Property, PropertyAmenity, Lead, Requirement, Booking
+from app.notifications import dispatch_booking_notifications
+from app.config import settings
+from app.agent.search_cache import search_cache, ranked_cache, normalize_search_args
+from app.agent.property_index import property_index
+from app.amenities import amenity_mask, normalize_amenities, split_known
+from app.localities import locality_matcher
+from app.availability import (ACTIVE_STATUSES, SlotUnavailable, parse_visit, format_time, to_utc, to_local,
+                              free_slots, reserve, release)
+from app.agent.ranking import SEARCH_ARGS, Ranker, CursorError, sort_key, encode_cursor, decode_cursor
+
+SEARCH_PAGE_SIZE = 5
 
 # --- Tool Declarations for Gemini ---
 
 search_properties_declaration = {
     "name": "search_properties",
-    "description": "Search the property database for listings matching the user's requirements.",
+    "description": "Search the property database for listings matching the user's requirements. Returns up to "
+                   "5 listings, best match first, and a next_cursor when more are available.",
     "parameters": {
         "type": "object",
         "properties": {
@@ -18,12 +34,40 @@ search_properties_declaration = {
             "bhk_max": {"type": "integer", "description": "Maximum BHK count"},
             "budget_min": {"type": "number", "description": "Minimum budget"},
             "budget_max": {"type": "number", "description": "Maximum budget"},
-            "amenities": {"type": "array", "items": {"type": "string"}, "description": "Desired amenities"},
+            "amenities": {"type": "array", "items": {"type": "string"},
+                          "description": "Desired amenities, e.g. parking, gym, pool, security, garden, "
+                                         "clubhouse, playground, lift, power_backup"},
+            "amenities_match": {"type": "string", "enum": ["all", "any"],
+                                "description": "Require all of the amenities (default) or any one of them"},
+            "cursor": {"type": "string",
+                       "description": "next_cursor from a previous search_properties result, to get the next "
+                                      "page of the same search. Other arguments are ignored when it is set."},
         },
         "required": ["city"],
     },
 }
 
+search_by_description_declaration = {
+    "name": "search_by_description",
+    "description": "Find listings whose title or description matches wishes the structured filters can't express, "
+                   "e.g. 'sea-facing', 'near the metro station', 'quiet lane with a terrace'. Can be narrowed "
+                   "with the same filters as search_properties. Returns up to 5 listings, best match first.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "The user's free-text wishes"},
+            "city": {"type": "string", "description": "City to search in (optional)"},
+            "location": {"type": "string", "description": "Specific area/locality (optional)"},
+            "property_type": {"type": "string", "enum": ["apartment", "villa", "plot", "independent_house"]},
+            "bhk_min": {"type": "integer", "description": "Minimum BHK count"},
+            "bhk_max": {"type": "integer", "description": "Maximum BHK count"},
+            "budget_min": {"type": "number", "description": "Minimum budget"},
+            "budget_max": {"type": "number", "description": "Maximum budget"},
+        },
+        "required": ["query"],
+    },
+}
+
 save_requirements_declaration = {
     "name": "save_requirements",
     "description": "Save or update the user's property requirements to the database.",
@@ -46,7 +90,8 @@ save_requirements_declaration = {
 
 book_visit_declaration = {
     "name": "book_visit",
-    "description": "Book a property visit. Call after confirming property ID, date, and time with the user.",
+    "description": "Book a property visit in one of its free slots (see get_available_slots). "
+                   "Call after confirming property ID, date, and time with the user.",
     "parameters": {
         "type": "object",
         "properties": {
@@ -84,22 +129,61 @@ get_property_details_declaration = {
     },
 }
 
+cancel_booking_declaration = {
+    "name": "cancel_booking",
+    "description": "Cancel one of the user's visit bookings. Without booking_id, cancels their most recent upcoming booking.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "booking_id": {"type": "integer", "description": "ID of the booking to cancel (optional)"},
+        },
+        "required": [],
+    },
+}
+
+get_available_slots_declaration = {
+    "name": "get_available_slots",
+    "description": "Free visiting slots for a property, by day. Check before offering or booking a visit time.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "property_id": {"type": "integer"},
+            "date": {"type": "string", "description": "First day to check, YYYY-MM-DD (default today)"},
+            "days": {"type": "integer", "description": "Number of days to check (default 7, max 14)"},
+        },
+        "required": ["property_id"],
+    },
+}
+
 ALL_DECLARATIONS = [
     search_properties_declaration,
+    search_by_description_declaration,
     save_requirements_declaration,
     book_visit_declaration,
     save_contact_declaration,
     get_property_details_declaration,
+    cancel_booking_declaration,
+    get_available_slots_declaration,
 ]
 
 
 # --- Tool Execution Functions ---
 
-def execute_search_properties(db: Session, session_id: str, **kwargs) -> dict:
+def _search_query(db: Session, **kwargs):
+    """
+    Available properties matching the search_properties filters.
+
+    cities / locations are exact values resolved by app.localities and use the
+    (city, location) index; raw city / location fall back to substring matching.
+    """
     query = db.query(Property).filter(Property.status == "available")
-    if kwargs.get("city"):
+    if kwargs.get("cities") is not None:
+        query = query.filter(Property.city.in_(kwargs["cities"]))
+    elif kwargs.get("city"):
         query = query.filter(Property.city.ilike(f"%{kwargs['city']}%"))
-    if kwargs.get("location"):
+    if kwargs.get("locations") is not None:
+        query = query.filter(Property.location.in_(kwargs["locations"]))
+    elif kwargs.get("location"):
         query = query.filter(Property.location.ilike(f"%{kwargs['location']}%"))
     if kwargs.get("property_type"):
         query = query.filter(Property.property_type == kwargs["property_type"])
@@ -111,8 +195,143 @@ def execute_search_properties(db: Session, session_id: str, **kwargs) -> dict:
         query = query.filter(Property.bhk >= kwargs["bhk_min"])
     if kwargs.get("bhk_max"):
         query = query.filter(Property.bhk <= kwargs["bhk_max"])
-    results = query.limit(5).all()
-    return {"properties": [p.to_dict() for p in results], "count": len(results)}
+    amenities = normalize_amenities(kwargs.get("amenities"))
+    if amenities and kwargs.get("amenities_match") == "any":
+        query = query.filter(Property.amenity_rows.any(PropertyAmenity.amenity.in_(amenities)))
+    else:
+        for amenity in amenities:
+            query = query.filter(Property.amenity_rows.any(PropertyAmenity.amenity == amenity))
+    return query
+
+
+def search_properties_sql(db: Session, limit: int = 5, **kwargs) -> list[dict]:
+    """The first `limit` matches from the database, cheapest first (the index's search() order)."""
+    results = _search_query(db, **kwargs).order_by(Property.price, Property.id).limit(limit).all()
+    return [p.to_dict() for p in results]
+
+
+def ranked_search_sql(db: Session, ranker: Ranker, limit: int = 5, after: tuple | None = None,
+                      **kwargs) -> list[tuple[tuple, dict]]:
+    """
+    Database equivalent of PropertyIndex.ranked_search, used when the index can't answer.
+
+    Scores every match from its ranking columns only, then loads the page's rows.
+    """
+    candidates = _search_query(db, **kwargs).with_entities(
+        Property.id, Property.price, Property.bhk, Property.location, Property.amenities, Property.created_at)
+    keys = []
+    for property_id, price, bhk, location, amenities, created_at in candidates:
+        key = sort_key(ranker.score(price, bhk, location, amenity_mask(normalize_amenities(amenities)),
+                                    created_at), property_id)
+        if after is None or key > after:
+            keys.append(key)
+    best = heapq.nsmallest(limit + 1, keys)
+    rows = db.query(Property).filter(Property.id.in_([key[1] for key in best])).all()
+    by_id = {p.id: p.to_dict() for p in rows}
+    return [(key, by_id[key[1]]) for key in best if key[1] in by_id]
+
+
+def _ranked_page(db: Session, ranker: Ranker, ranked_key: tuple, after: tuple | None,
+                 filters: dict) -> list[tuple[tuple, dict]]:
+    """
+    Up to SEARCH_PAGE_SIZE + 1 ranked matches after the cursor position.
+
+    The first page ranks the best SEARCH_RANKED_DEPTH matches once and caches
+    them under the search and its as_of, so follow-up pages bisect to the
+    cursor instead of scoring every match again. Pages past the cached depth
+    rank from the cursor on.
+    """
+    use_index = property_index.sync(db)
+
+    def rank(limit: int, after: tuple | None) -> list[tuple[tuple, dict]]:
+        if use_index:
+            return property_index.ranked_search(ranker, limit, after, **filters)
+        return ranked_search_sql(db, ranker, limit, after, **filters)
+
+    ranked = ranked_cache.get(ranked_key)
+    if ranked is None:
+        generation = ranked_cache.generation
+        best = rank(settings.SEARCH_RANKED_DEPTH, None)
+        ranked = (best[:settings.SEARCH_RANKED_DEPTH], len(best) <= settings.SEARCH_RANKED_DEPTH)
+        ranked_cache.put(ranked_key, ranked, generation)
+    best, complete = ranked
+    start = bisect_right(best, after, key=itemgetter(0)) if after is not None else 0
+    page = best[start:start + SEARCH_PAGE_SIZE + 1]
+    if len(page) <= SEARCH_PAGE_SIZE and not complete:
+        page = rank(SEARCH_PAGE_SIZE, after)
+    return page
+
+
+def _interpretation(city: str | None, location: str | None, filters: dict) -> dict:
+    """The resolved cities/locations, where they differ from what the user typed."""
+    interpreted = {}
+    if city and [c.lower() for c in filters["cities"]] != [city.lower()]:
+        interpreted["cities"] = filters["cities"]
+    if location and filters["locations"] is not None and \
+            [loc.lower() for loc in filters["locations"]] != [location.lower()]:
+        interpreted["locations"] = filters["locations"]
+    return interpreted
+
+
+def execute_search_properties(db: Session, session_id: str, **kwargs) -> dict:
+    cursor = kwargs.get("cursor")
+    # Cursors are case-sensitive, so they skip normalize_search_args
+    key = ("cursor", cursor) if cursor else normalize_search_args(kwargs)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = search_cache.generation
+
+    if cursor:
+        try:
+            args, as_of, after = decode_cursor(cursor)
+        except CursorError:
+            return {"error": "That cursor is not valid. Run the search again without a cursor."}
+    else:
+        args, as_of, after = {k: v for k, v in kwargs.items() if k in SEARCH_ARGS}, time.time(), None
+    ranker = Ranker(args, as_of)
+
+    filters = dict(args)
+    if filters.get("amenities"):
+        filters["amenities"], unmatched = split_known(filters["amenities"])
+    else:
+        unmatched = []
+    city, location = filters.pop("city", None), filters.pop("location", None)
+    filters["cities"], filters["locations"] = locality_matcher.resolve(db, city, location)
+
+    page = _ranked_page(db, ranker, (normalize_search_args(args), as_of), after, filters)
+    has_more = len(page) > SEARCH_PAGE_SIZE
+    page = page[:SEARCH_PAGE_SIZE]
+
+    result = {"properties": [prop for _, prop in page], "count": len(page)}
+    if has_more:
+        (neg_score, last_id), _ = page[-1]
+        result["next_cursor"] = encode_cursor(args, as_of, -neg_score, last_id)
+    interpreted = _interpretation(city, location, filters)
+    if interpreted:
+        # Lets the model say "showing Andheri West" when the user said "Andheri W"
+        result["interpreted_as"] = interpreted
+    if unmatched:
+        # Tell the model these weren't filtered on rather than silently dropping them
+        result["unmatched_amenities"] = unmatched
+    search_cache.put(key, result, generation)
+    return result
+
+
+def execute_search_by_description(db: Session, session_id: str, **kwargs) -> dict:
+    if not property_index.sync(db) or property_index.text is None:
+        return {"error": "Description search is unavailable right now. Use search_properties instead."}
+
+    filters = {k: v for k, v in kwargs.items() if k != "query"}
+    city, location = filters.pop("city", None), filters.pop("location", None)
+    filters["cities"], filters["locations"] = locality_matcher.resolve(db, city, location)
+
+    matches = property_index.text_search(kwargs.get("query", ""), SEARCH_PAGE_SIZE, **filters)
+    result = {"properties": [prop for _, prop in matches], "count": len(matches)}
+    interpreted = _interpretation(city, location, filters)
+    if interpreted:
+        result["interpreted_as"] = interpreted
+    return result
 
 
 def execute_save_requirements(db: Session, session_id: str, **kwargs) -> dict:
@@ -138,6 +357,29 @@ def execute_save_requirements(db: Session, session_id: str, **kwargs) -> dict:
     return {"success": True, "message": "Requirements saved."}
 
 
+def _slot_days(slots, limit: int | None = None) -> list[dict]:
+    """[{"date", "times"}] for (start, places left) pairs, soonest first"""
+    days: dict[str, list[str]] = {}
+    for start, _ in slots[:limit]:
+        days.setdefault(start.date().isoformat(), []).append(format_time(start))
+    return [{"date": day, "times": times} for day, times in days.items()]
+
+
+def execute_get_available_slots(db: Session, session_id: str, **kwargs) -> dict:
+    if not db.query(Property.id).filter(Property.id == kwargs["property_id"]).first():
+        return {"error": "Property not found."}
+    try:
+        start_day = date.fromisoformat(kwargs["date"]) if kwargs.get("date") else None
+    except ValueError:
+        return {"error": "Please give the date as YYYY-MM-DD."}
+    days = min(max(int(kwargs.get("days") or 7), 1), 14)
+    slots = free_slots(db, kwargs["property_id"], start_day, days)
+    if not slots:
+        return {"property_id": kwargs["property_id"], "days": [],
+                "message": f"No free visiting slots in the next {days} days."}
+    return {"property_id": kwargs["property_id"], "days": _slot_days(slots)}
+
+
 def execute_book_visit(db: Session, session_id: str, **kwargs) -> dict:
     lead = db.query(Lead).filter(Lead.session_id == session_id).first()
     if not lead:
@@ -148,23 +390,37 @@ def execute_book_visit(db: Session, session_id: str, **kwargs) -> dict:
     prop = db.query(Property).filter(Property.id == kwargs["property_id"]).first()
     if not prop:
         return {"error": "Property not found."}
+    start = parse_visit(kwargs["visit_date"], kwargs["visit_time"])
+    if start is None:
+        return {"error": "Please give the date as YYYY-MM-DD and a time like '10:00 AM'."}
 
+    # The slot place and the booking commit together
+    try:
+        reserve(db, prop.id, start)
+    except SlotUnavailable as e:
+        db.rollback()
+        nearby = free_slots(db, prop.id, start.date() - timedelta(days=1), 7)
+        nearby.sort(key=lambda slot: abs(slot[0] - start))
+        return {"error": str(e), "alternatives": _slot_days(sorted(nearby[:4]))}
+
+    visit_date, visit_time = start.date().isoformat(), format_time(start)
     booking = Booking(
         lead_id=lead.id,
-        property_id=kwargs["property_id"],
-        visit_date=kwargs["visit_date"],
-        visit_time=kwargs["visit_time"],
+        property_id=prop.id,
+        visit_date=visit_date,
+        visit_time=visit_time,
+        visit_at=to_utc(start),
     )
     db.add(booking)
     db.commit()
 
-    # Send notifications (email + WhatsApp)
-    send_booking_notifications(
-        lead, prop.title, kwargs["visit_date"], kwargs["visit_time"], booking.id
+    # Send notifications (email + WhatsApp) without holding up the turn
+    dispatch_booking_notifications(
+        lead, prop.title, visit_date, visit_time, booking.id
     )
 
     return {"success": True, "booking_id": booking.id, "property_title": prop.title,
-            "visit_date": kwargs["visit_date"], "visit_time": kwargs["visit_time"]}
+            "visit_date": visit_date, "visit_time": visit_time}
 
 
 def execute_save_contact(db: Session, session_id: str, **kwargs) -> dict:
@@ -185,16 +441,57 @@ def execute_save_contact(db: Session, session_id: str, **kwargs) -> dict:
 
 
 def execute_get_property_details(db: Session, session_id: str, **kwargs) -> dict:
-    prop = db.query(Property).filter(Property.id == kwargs["property_id"]).first()
+    if property_index.sync(db):
+        prop = property_index.get(kwargs["property_id"])
+    else:
+        prop = db.query(Property).filter(Property.id == kwargs["property_id"]).first()
+        prop = prop.to_dict() if prop else None
     if not prop:
         return {"error": "Property not found."}
-    return {"property": prop.to_dict()}
+    return {"property": prop}
+
+
+def execute_cancel_booking(db: Session, session_id: str, **kwargs) -> dict:
+    lead = db.query(Lead).filter(Lead.session_id == session_id).first()
+    if not lead:
+        return {"error": "I couldn't find any bookings for you."}
+
+    query = db.query(Booking).filter(Booking.lead_id == lead.id)
+    if kwargs.get("booking_id"):
+        query = query.filter(Booking.id == kwargs["booking_id"])
+    else:
+        query = (query.filter(Booking.status.in_(ACTIVE_STATUSES))
+                 .filter(Booking.visit_at > datetime.now(timezone.utc))
+                 .order_by(Booking.created_at.desc()))
+    booking = query.first()
+    if not booking:
+        return {"error": "I couldn't find an upcoming booking to cancel."}
+    if booking.status == "cancelled":
+        return {"error": f"Booking #{booking.id} is already cancelled."}
+
+    if booking.status in ACTIVE_STATUSES:
+        release(db, booking.property_id, to_local(booking.visit_at))
+    booking.status = "cancelled"
+    db.commit()
+    return {"success": True, "booking_id": booking.id, "property_title": booking.property.title,
+            "visit_date": booking.visit_date, "visit_time": booking.visit_time}
 
 
 TOOL_REGISTRY = {
     "search_properties": execute_search_properties,
+    "search_by_description": execute_search_by_description,
     "save_requirements": execute_save_requirements,
     "book_visit": execute_book_visit,
     "save_contact": execute_save_contact,
     "get_property_details": execute_get_property_details,
+    "cancel_booking": execute_cancel_booking,
+    "get_available_slots": execute_get_available_slots,
 }
+
+# Tools that only read the catalogue. They can run alongside each other and
+# alongside the lead-writing tools, which must keep the order the model chose
+# (save_contact before book_visit).
+READ_ONLY_TOOLS = {"search_properties", "search_by_description", "get_property_details", "get_available_slots"}
+
+# Tools whose results are property listings shown to the user
+SEARCH_TOOLS = {"search_properties", "search_by_description"}
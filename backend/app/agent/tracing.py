@@ -0,0 +1,199 @@
+"""
+Off-request-path tracing for the agent.
+
+Observations (the turn trace, one generation per model call, one span per
+tool) are buffered in a bounded in-memory queue when they end. A background
+thread posts them in batches to Langfuse's ingestion API, so a chat turn
+never waits on the network. When the queue is full new events are dropped and
+counted rather than blocking. With LANGFUSE_PUBLIC_KEY unset the tracer is a
+no-op.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+import httpx
+from app.config import settings
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Observation:
+    """A trace, span or generation; enqueued for export when it ends."""
+
+    def __init__(self, tracer: "Tracer", kind: str, name: str, trace_id: str | None = None,
+                 parent_id: str | None = None, **fields):
+        self.tracer = tracer
+        self.kind = kind
+        self.id = str(uuid.uuid4())
+        self.trace_id = trace_id or self.id
+        self.parent_id = parent_id
+        self.fields = {"name": name, "startTime": _now(), **{k: v for k, v in fields.items() if v is not None}}
+
+    def start_span(self, name: str, input=None, metadata: dict | None = None) -> "Observation":
+        return Observation(self.tracer, "span", name, trace_id=self.trace_id, parent_id=self._child_parent(),
+                           input=input, metadata=metadata)
+
+    def start_generation(self, name: str, model: str, input=None, metadata: dict | None = None) -> "Observation":
+        return Observation(self.tracer, "generation", name, trace_id=self.trace_id, parent_id=self._child_parent(),
+                           model=model, input=input, metadata=metadata)
+
+    def update(self, output=None, level: str | None = None):
+        if output is not None:
+            self.fields["output"] = output
+        if level is not None:
+            self.fields["level"] = level
+
+    def end(self):
+        self.fields["endTime"] = _now()
+        self.tracer.enqueue(self._event())
+
+    def _child_parent(self) -> str | None:
+        # Children of the trace itself hang off the trace, not an observation
+        return None if self.kind == "trace" else self.id
+
+    def _event(self) -> dict:
+        if self.kind == "trace":
+            body = {
+                "id": self.id,
+                "name": self.fields["name"],
+                "timestamp": self.fields["startTime"],
+                "input": self.fields.get("input"),
+                "output": self.fields.get("output"),
+                "metadata": {**self.fields.get("metadata", {}), "level": self.fields.get("level", "DEFAULT")},
+                "sessionId": self.fields.get("session_id"),
+            }
+        else:
+            body = {"id": self.id, "traceId": self.trace_id, "parentObservationId": self.parent_id, **self.fields}
+        return {"id": str(uuid.uuid4()), "timestamp": _now(), "type": f"{self.kind}-create", "body": body}
+
+
+class NoopObservation:
+    def start_span(self, *args, **kwargs) -> "NoopObservation":
+        return self
+
+    def start_generation(self, *args, **kwargs) -> "NoopObservation":
+        return self
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_OBSERVATION = NoopObservation()
+
+
+class NoopTracer:
+    dropped = 0
+    exported = 0
+
+    def start_trace(self, *args, **kwargs) -> NoopObservation:
+        return NOOP_OBSERVATION
+
+    def start(self):
+        pass
+
+    def shutdown(self, timeout: float = 5.0):
+        pass
+
+    def queue_depth(self) -> int:
+        return 0
+
+
+class Tracer:
+    # How often a waiting exporter checks for shutdown
+    POLL_SECONDS = 0.1
+
+    def __init__(self, host: str, public_key: str, secret_key: str, max_queue: int,
+                 batch_size: int, flush_interval: float, transport: httpx.BaseTransport | None = None):
+        self.url = f"{host.rstrip('/')}/api/public/ingestion"
+        self.auth = (public_key, secret_key)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.transport = transport
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.dropped = 0
+        self.exported = 0
+
+    def start_trace(self, name: str, input=None, metadata: dict | None = None,
+                    session_id: str | None = None) -> Observation:
+        return Observation(self, "trace", name, input=input, metadata=metadata, session_id=session_id)
+
+    def enqueue(self, event: dict):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the exporter after sending whatever is still queued."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _next_batch(self) -> list[dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            # On shutdown, send what's queued now rather than waiting out the interval
+            if remaining <= 0 or (self._stop.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, self.POLL_SECONDS)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _run(self):
+        with httpx.Client(timeout=10, transport=self.transport) as client:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if batch:
+                    self._export(client, batch)
+
+    def _export(self, client: httpx.Client, batch: list[dict]):
+        try:
+            resp = client.post(self.url, auth=self.auth,
+                               content=json.dumps({"batch": batch}, default=str),
+                               headers={"Content-Type": "application/json"})
+            resp.raise_for_status()
+            self.exported += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            print(f"[TRACING ERROR] Dropped {len(batch)} events: {e}")
+
+
+def create_tracer() -> Tracer | NoopTracer:
+    if not settings.LANGFUSE_PUBLIC_KEY:
+        return NoopTracer()
+    return Tracer(
+        host=settings.LANGFUSE_BASE_URL or settings.LANGFUSE_HOST,
+        public_key=settings.LANGFUSE_PUBLIC_KEY,
+        secret_key=settings.LANGFUSE_SECRET_KEY,
+        max_queue=settings.TRACE_QUEUE_SIZE,
+        batch_size=settings.TRACE_BATCH_SIZE,
+        flush_interval=settings.TRACE_FLUSH_INTERVAL_SECONDS,
+    )
+
+
+tracer = create_tracer()
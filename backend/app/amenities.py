@@ -0,0 +1,175 @@
+"""
+Canonical amenity vocabulary.
+
+Scraped listings and users describe the same amenity many ways ("Swimming
+Pool", "swimming-pool", "pool"). Property.amenities keeps the listing's own
+wording (JSON text, which the frontend displays). Every write path also
+stores the canonical names from AMENITIES as one property_amenities row per
+amenity, which SQL filters through an index. In memory, a set of amenities
+is a bitmask over the vocabulary, so has-all and has-any checks are single
+AND operations.
+
+A raw amenity maps to a canonical one only through whole words or phrases,
+so "Fireplace" or "Playschool nearby" match nothing rather than the wrong
+amenity.
+
+Backfill an existing database with:
+    python -m app.amenities
+"""
+
+import json
+import re
+from sqlalchemy.orm import Session
+from app.models import Property, PropertyAmenity
+from app import catalogue
+
+# Bit positions are stable: append new amenities, never reorder.
+AMENITIES = (
+    "parking", "gym", "pool", "security", "garden", "clubhouse", "playground", "jogging_track",
+    "concierge", "spa", "theater", "terrace", "smart_home", "lift", "power_backup", "sports_court",
+    "intercom", "rainwater_harvesting", "fire_safety", "pet_friendly", "wifi", "air_conditioning",
+)
+_BITS = {name: 1 << i for i, name in enumerate(AMENITIES)}
+
+# Exact phrases (after normalization) that map to a canonical amenity
+SYNONYMS = {
+    "car parking": "parking", "covered parking": "parking", "reserved parking": "parking",
+    "visitor parking": "parking", "open parking": "parking", "stilt parking": "parking",
+    "gymnasium": "gym", "fitness centre": "gym", "fitness center": "gym",
+    "swimming pool": "pool", "swimming": "pool", "infinity pool": "pool", "kids pool": "pool",
+    "24x7 security": "security", "24 7 security": "security", "cctv": "security",
+    "security guard": "security", "gated community": "security", "gated": "security",
+    "landscaped garden": "garden", "park": "garden", "lawn": "garden", "green area": "garden",
+    "club house": "clubhouse", "club": "clubhouse", "community hall": "clubhouse",
+    "kids play area": "playground", "children play area": "playground", "play area": "playground",
+    "jogging track": "jogging_track", "walking track": "jogging_track", "jogging": "jogging_track",
+    "concierge service": "concierge", "sauna": "spa", "jacuzzi": "spa", "steam room": "spa",
+    "theatre": "theater", "home theatre": "theater", "mini theatre": "theater", "mini theater": "theater",
+    "private terrace": "terrace", "rooftop": "terrace", "sky deck": "terrace", "terrace garden": "terrace",
+    "smart home": "smart_home", "home automation": "smart_home",
+    "elevator": "lift", "lifts": "lift", "elevators": "lift",
+    "power backup": "power_backup", "power back up": "power_backup", "dg backup": "power_backup",
+    "generator": "power_backup", "inverter": "power_backup",
+    "tennis court": "sports_court", "badminton court": "sports_court", "basketball court": "sports_court",
+    "squash court": "sports_court", "indoor games": "sports_court", "sports facility": "sports_court",
+    "video door phone": "intercom", "rain water harvesting": "rainwater_harvesting",
+    "fire fighting": "fire_safety", "fire alarm": "fire_safety", "fire safety system": "fire_safety",
+    "pet friendly": "pet_friendly", "pets allowed": "pet_friendly", "pet park": "pet_friendly",
+    "wi fi": "wifi", "internet": "wifi", "ac": "air_conditioning", "air conditioned": "air_conditioning",
+}
+
+# Whole words that name an amenity inside a longer phrase ("covered car parking", "gym & spa")
+_KEYWORDS = {
+    "fitness": "gym", "swimming": "pool", "cctv": "security", "club": "clubhouse", "jogging": "jogging_track",
+    "sauna": "spa", "theatre": "theater", "elevator": "lift", "backup": "power_backup",
+    "rainwater": "rainwater_harvesting", "fire extinguisher": "fire_safety", "fire sprinkler": "fire_safety",
+    "pets": "pet_friendly", "car park": "parking",
+}
+# Every name, synonym and keyword as a whole word or phrase (optionally plural). The longest term
+# found wins, so "lawn tennis court" is a sports court and "terrace garden" a terrace
+_TERMS = {**{name.replace("_", " "): name for name in AMENITIES}, **SYNONYMS, **_KEYWORDS}
+_TERM = re.compile(r"\b(" + "|".join(re.escape(term) for term in sorted(_TERMS, key=len, reverse=True))
+                   + r")s?\b")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_amenity(raw: str) -> str | None:
+    """Canonical name for one raw amenity string, or None if it isn't in the vocabulary."""
+    phrase = _NON_WORD.sub(" ", str(raw).lower()).strip()
+    if not phrase:
+        return None
+    underscored = phrase.replace(" ", "_")
+    if underscored in _BITS:
+        return underscored
+    if phrase in SYNONYMS:
+        return SYNONYMS[phrase]
+    terms = [match.group(1) for match in _TERM.finditer(phrase)]
+    return _TERMS[max(terms, key=len)] if terms else None
+
+
+def parse_amenities(value) -> list:
+    """Raw amenities from a list or the JSON / comma-separated text stored on a property."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.split(",")
+        if isinstance(value, str):
+            value = [value]
+    return list(value)
+
+
+def display_amenities(value) -> list[str]:
+    """The raw amenities as the listing words them, trimmed and deduplicated, in their order."""
+    seen = {}
+    for raw in parse_amenities(value):
+        text = " ".join(str(raw).split())
+        if text and text.lower() not in seen:
+            seen[text.lower()] = text
+    return list(seen.values())
+
+
+def normalize_amenities(value) -> list[str]:
+    """Canonical amenities, deduplicated, in vocabulary order."""
+    names = {normalize_amenity(raw) for raw in parse_amenities(value)}
+    return [name for name in AMENITIES if name in names]
+
+
+def split_known(value) -> tuple[list[str], list[str]]:
+    """(canonical amenities, raw values that matched nothing)"""
+    known, unknown = set(), []
+    for raw in parse_amenities(value):
+        name = normalize_amenity(raw)
+        if name:
+            known.add(name)
+        else:
+            unknown.append(str(raw))
+    return [name for name in AMENITIES if name in known], unknown
+
+
+def amenity_mask(names) -> int:
+    mask = 0
+    for name in names:
+        mask |= _BITS.get(name, 0)
+    return mask
+
+
+def set_amenities(prop: Property, value):
+    """Store amenities on a property: the listing's wording in the JSON column, canonical names as rows."""
+    raw = display_amenities(value)
+    names = normalize_amenities(raw)
+    prop.amenities = json.dumps(raw)
+    prop.amenity_rows = [PropertyAmenity(amenity=name) for name in names]
+
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    """Rebuild every property's property_amenities rows from its amenities column."""
+    count = 0
+    last_id = 0
+    while True:
+        batch = (db.query(Property).filter(Property.id > last_id)
+                 .order_by(Property.id).limit(batch_size).all())
+        if not batch:
+            break
+        for prop in batch:
+            set_amenities(prop, prop.amenities)
+        db.commit()
+        count += len(batch)
+        last_id = batch[-1].id
+    catalogue.bump_version(db)
+    db.commit()
+    return count
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal, create_tables
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt amenities for {backfill(db)} properties.")
+        catalogue.notify_changed()
+    finally:
+        db.close()
@@ -0,0 +1,229 @@
+"""
+Visit slot availability.
+
+Each property has visiting windows per weekday (visit_windows rows, or the
+VISIT_* defaults when it has none). A window is cut into slots of
+slot_minutes, and each slot takes up to `capacity` concurrent visits.
+Bookings hold slots through visit_slots, one row per (property, slot start)
+with a `booked` counter.
+
+- Free slots for a property over the next days come from the windows plus
+  one indexed range query on visit_slots' primary key. Windows are cached
+  per property for VISIT_WINDOWS_REFRESH_SECONDS.
+- A reservation is a conditional UPDATE (booked < capacity). The row lock
+  serializes concurrent chat and voice bookings, and a first booking
+  creates the row with an insert that ignores conflicts, so two racing
+  writers can't both take the last place. The reservation commits with the
+  Booking row.
+
+Slot times are the property's local wall-clock time (VISIT_TIMEZONE), the
+same strings bookings show in visit_date / visit_time. Booking.visit_at
+holds the same instant in UTC; to_utc / to_local convert between the two.
+"""
+
+import re
+import threading
+import time as clock
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import VisitWindow, VisitSlot
+
+# Bookings in these states hold their slot
+ACTIVE_STATUSES = ("pending", "confirmed")
+
+_TIME = re.compile(r"^\s*(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?\s*m?\.?)?\s*$", re.IGNORECASE)
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+class Window:
+    __slots__ = ("opens", "closes", "slot_minutes", "capacity")
+
+    def __init__(self, opens: time, closes: time, slot_minutes: int, capacity: int):
+        self.opens = opens
+        self.closes = closes
+        self.slot_minutes = slot_minutes
+        self.capacity = capacity
+
+    def starts(self, day: date) -> list[datetime]:
+        start, end = datetime.combine(day, self.opens), datetime.combine(day, self.closes)
+        step = timedelta(minutes=self.slot_minutes)
+        slots = []
+        while start + step <= end:
+            slots.append(start)
+            start += step
+        return slots
+
+
+def parse_time(text: str) -> time | None:
+    """Clock time from "10:00 AM", "10am", "2.30 pm" or "14:30"; None if it isn't one."""
+    match = _TIME.match(text or "")
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def parse_visit(visit_date: str, visit_time: str) -> datetime | None:
+    """Slot start for a booking's visit_date (YYYY-MM-DD) and visit_time strings; None if unparsable."""
+    clock_time = parse_time(visit_time)
+    try:
+        day = date.fromisoformat((visit_date or "").strip())
+    except ValueError:
+        return None
+    return datetime.combine(day, clock_time) if clock_time else None
+
+
+def format_time(value: time | datetime) -> str:
+    return value.strftime("%I:%M %p").lstrip("0")
+
+
+def local_now() -> datetime:
+    return datetime.now(ZoneInfo(settings.VISIT_TIMEZONE)).replace(tzinfo=None)
+
+
+def to_utc(local: datetime) -> datetime:
+    """Aware UTC instant for a local wall-clock time (a slot start, a calendar day boundary)."""
+    return local.replace(tzinfo=ZoneInfo(settings.VISIT_TIMEZONE)).astimezone(timezone.utc)
+
+
+def to_local(instant: datetime | None) -> datetime | None:
+    """Local wall-clock time for a stored visit_at; SQLite hands it back naive, in UTC."""
+    if instant is None:
+        return None
+    if instant.tzinfo is None:
+        instant = instant.replace(tzinfo=timezone.utc)
+    return instant.astimezone(ZoneInfo(settings.VISIT_TIMEZONE)).replace(tzinfo=None)
+
+
+def _default_windows() -> dict[int, list[Window]]:
+    window = Window(time.fromisoformat(settings.VISIT_HOURS_OPEN), time.fromisoformat(settings.VISIT_HOURS_CLOSE),
+                    settings.VISIT_SLOT_MINUTES, settings.VISIT_SLOT_CAPACITY)
+    return {weekday: [window] for weekday in range(7)}
+
+
+class WindowCache:
+    """Visiting windows by property, cached for refresh_seconds; invalidate() after local writes."""
+
+    def __init__(self, refresh_seconds: float, max_entries: int = 10_000):
+        self.refresh_seconds = refresh_seconds
+        self.max_entries = max_entries
+        self._entries: dict[int, tuple[float, dict[int, list[Window]]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, property_id: int) -> dict[int, list[Window]]:
+        """weekday (0 = Monday) -> windows"""
+        entry = self._entries.get(property_id)
+        if entry and entry[0] > clock.monotonic():
+            return entry[1]
+        rows = db.execute(select(VisitWindow).where(VisitWindow.property_id == property_id)
+                          .order_by(VisitWindow.weekday, VisitWindow.opens)).scalars().all()
+        if rows:
+            windows: dict[int, list[Window]] = {}
+            for row in rows:
+                windows.setdefault(row.weekday, []).append(
+                    Window(row.opens, row.closes, row.slot_minutes, row.capacity))
+        else:
+            windows = _default_windows()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[property_id] = (clock.monotonic() + self.refresh_seconds, windows)
+        return windows
+
+    def invalidate(self, property_id: int | None = None):
+        with self._lock:
+            if property_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(property_id, None)
+
+
+window_cache = WindowCache(settings.VISIT_WINDOWS_REFRESH_SECONDS)
+
+
+def slot_capacity(db: Session, property_id: int, start: datetime) -> int | None:
+    """Capacity of the slot starting at `start`, or None if no window has a slot starting then."""
+    for window in window_cache.get(db, property_id).get(start.weekday(), ()):
+        if start in window.starts(start.date()):
+            return window.capacity
+    return None
+
+
+def free_slots(db: Session, property_id: int, start_day: date | None = None, days: int = 7,
+               now: datetime | None = None) -> list[tuple[datetime, int]]:
+    """(slot start, places left) for every slot with room from start_day over `days` days, soonest first."""
+    now = now or local_now()
+    start_day = max(start_day or now.date(), now.date())
+    earliest = now + timedelta(minutes=settings.VISIT_MIN_NOTICE_MINUTES)
+    windows = window_cache.get(db, property_id)
+
+    begin = datetime.combine(start_day, time.min)
+    end = begin + timedelta(days=days)
+    booked = dict(db.execute(
+        select(VisitSlot.slot_start, VisitSlot.booked)
+        .where(VisitSlot.property_id == property_id, VisitSlot.slot_start >= begin, VisitSlot.slot_start < end)
+    ).all())
+
+    slots = []
+    for offset in range(days):
+        day = start_day + timedelta(days=offset)
+        for window in windows.get(day.weekday(), ()):
+            for start in window.starts(day):
+                left = window.capacity - booked.get(start, 0)
+                if start >= earliest and left > 0:
+                    slots.append((start, left))
+    slots.sort()
+    return slots
+
+
+def _insert_ignore(db: Session):
+    module = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return module.insert(VisitSlot)
+
+
+def reserve(db: Session, property_id: int, start: datetime, check_notice: bool = True):
+    """
+    Take one place in a slot inside the caller's transaction; raises SlotUnavailable.
+
+    The caller commits (with its Booking) or rolls back, which releases the place.
+    check_notice=False skips the minimum-notice check, for an admin restoring a booking.
+    """
+    if check_notice and start < local_now() + timedelta(minutes=settings.VISIT_MIN_NOTICE_MINUTES):
+        raise SlotUnavailable("That time has already passed or is too soon to arrange.")
+    capacity = slot_capacity(db, property_id, start)
+    if capacity is None:
+        raise SlotUnavailable("That isn't one of the property's visiting slots.")
+
+    take = (update(VisitSlot)
+            .where(VisitSlot.property_id == property_id, VisitSlot.slot_start == start,
+                   VisitSlot.booked < capacity)
+            .values(booked=VisitSlot.booked + 1))
+    if db.execute(take).rowcount:
+        return
+    # No row yet (first booking) or full: create it if missing, then try once more
+    db.execute(_insert_ignore(db).values(property_id=property_id, slot_start=start, booked=0)
+               .on_conflict_do_nothing())
+    if not db.execute(take).rowcount:
+        raise SlotUnavailable("That slot is fully booked.")
+
+
+def release(db: Session, property_id: int, start: datetime | None):
+    """Give back a place taken by reserve(), inside the caller's transaction."""
+    if start is None:
+        return
+    db.execute(update(VisitSlot)
+               .where(VisitSlot.property_id == property_id, VisitSlot.slot_start == start, VisitSlot.booked > 0)
+               .values(booked=VisitSlot.booked - 1))
@@ -0,0 +1,49 @@
+"""
+Catalogue change notifications and version.
+
+Anything that keeps derived state about properties (result caches, in-memory
+indexes) subscribes here, and every write path calls notify_changed() after
+its commit. Listeners run synchronously in the writer's thread, so they must
+be cheap.
+
+Write paths also call bump_version() before their commit. The version lives
+in the catalogue_state row, so every process sees it, and it is the ETag of
+the catalogue GET endpoints.
+"""
+
+from collections.abc import Callable
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models import CatalogueState
+
+_listeners: list[Callable[[list[int] | None], None]] = []
+
+
+def subscribe(listener: Callable[[list[int] | None], None]):
+    _listeners.append(listener)
+
+
+def notify_changed(property_ids: list[int] | None = None):
+    """Tell listeners which properties changed; None means the whole catalogue may have."""
+    for listener in _listeners:
+        try:
+            listener(property_ids)
+        except Exception as e:
+            print(f"[CATALOGUE ERROR] Listener {listener.__name__} failed: {e}")
+
+
+def bump_version(db: Session):
+    """Advance the catalogue version inside the writer's transaction."""
+    now = datetime.utcnow()
+    result = db.execute(update(CatalogueState).where(CatalogueState.id == 1)
+                        .values(version=CatalogueState.version + 1, changed_at=now))
+    if not result.rowcount:
+        db.add(CatalogueState(id=1, version=1, changed_at=now))
+
+
+def current_version(db: Session) -> tuple[int, datetime | None]:
+    """(version, changed_at); (0, None) before the first write."""
+    row = db.execute(select(CatalogueState.version, CatalogueState.changed_at)
+                     .where(CatalogueState.id == 1)).first()
+    return (row.version, row.changed_at) if row else (0, None)
@@ -9,6 +9,9 @@ class Settings(BaseSettings):
     LANGFUSE_SECRET_KEY: str = ""
     LANGFUSE_HOST: str = "https://cloud.langfuse.com"
     LANGFUSE_BASE_URL: str = ""
+    TRACE_QUEUE_SIZE: int = 10000
+    TRACE_BATCH_SIZE: int = 100
+    TRACE_FLUSH_INTERVAL_SECONDS: float = 2.0
     TWILIO_ACCOUNT_SID: str = ""
     TWILIO_AUTH_TOKEN: str = ""
     TWILIO_PHONE_NUMBER: str = ""
@@ -20,6 +23,46 @@ class Settings(BaseSettings):
     VAPI_API_KEY: str = ""
     VAPI_PUBLIC_KEY: str = ""
     PUBLIC_URL: str = ""
+    AGENT_TOOL_WORKERS: int = 16
+    DB_MAX_OVERFLOW: int = 40  # connections beyond AGENT_TOOL_WORKERS, for the sync endpoints' threadpool
+    SESSION_BACKEND: str = "memory"  # memory, redis or postgres
+    REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_TTL_SECONDS: int = 3600
+    SESSION_MAX_COUNT: int = 10000
+    SESSION_MAX_BYTES: int = 256 * 1024 * 1024
+    SESSION_MAX_PENDING: int = 3
+    HISTORY_MAX_TURNS: int = 6
+    HISTORY_TOKEN_BUDGET: int = 6000
+    HISTORY_SUMMARY_MAX_CHARS: int = 2000
+    GEMINI_CONTEXT_CACHE: bool = False
+    GEMINI_CACHE_TTL_SECONDS: int = 3600
+    FAST_PATH_ENABLED: bool = True
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024
+    SEARCH_CACHE_TTL_SECONDS: int = 300
+    SEARCH_RANKED_CACHE_MAX_ENTRIES: int = 256
+    SEARCH_RANKED_DEPTH: int = 100
+    PROPERTY_INDEX_ENABLED: bool = True
+    PROPERTY_INDEX_RECHECK_SECONDS: float = 30.0
+    TEXT_SEARCH_ENABLED: bool = True
+    LOCALITY_REFRESH_SECONDS: float = 300.0
+    LOCALITY_MATCH_THRESHOLD: float = 0.4
+    PROPERTY_PAGE_SIZE: int = 50
+    PROPERTY_PAGE_MAX: int = 200
+    GZIP_MIN_BYTES: int = 1024
+    LEAD_PAGE_SIZE: int = 50
+    LEAD_PAGE_MAX: int = 200
+    # Catalogue GETs: browsers always revalidate (cheap 304s); a CDN may serve a copy this long
+    CATALOGUE_CACHE_CONTROL: str = "public, max-age=0, s-maxage=30, stale-while-revalidate=60"
+    # Visiting hours for properties without their own visit_windows rows, in VISIT_TIMEZONE
+    VISIT_HOURS_OPEN: str = "10:00"
+    VISIT_HOURS_CLOSE: str = "18:00"
+    VISIT_SLOT_MINUTES: int = 60
+    VISIT_SLOT_CAPACITY: int = 2
+    VISIT_MIN_NOTICE_MINUTES: int = 60
+    VISIT_TIMEZONE: str = "Asia/Kolkata"
+    VISIT_WINDOWS_REFRESH_SECONDS: float = 60.0
+    REMINDER_LEAD_HOURS: int = 24
+    BOOKING_CALENDAR_MAX_DAYS: int = 62
 
     class Config:
         env_file = ".env"
@@ -1,8 +1,21 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
+from app.metrics import instrument_engine
 
-engine = create_engine(settings.DATABASE_URL)
+# SQLite connections are handed between the request thread and the agent's
+# tool pool, so the same-thread guard has to be off.
+connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+# Connections are checked out by the agent's tool pool (one per worker) and by
+# sync endpoints on Starlette's threadpool (up to DB_MAX_OVERFLOW more), so the
+# pool covers both rather than SQLAlchemy's default 5 + 10. An in-memory SQLite
+# database has a single shared connection and takes no sizing.
+pool_args = {} if settings.DATABASE_URL in ("sqlite://", "sqlite:///:memory:") else {
+    "pool_size": settings.AGENT_TOOL_WORKERS,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+}
+engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, **pool_args)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
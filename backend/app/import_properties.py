@@ -13,8 +13,10 @@ import json
 import argparse
 import requests
 from app.database import SessionLocal, create_tables
-from app.models import Property, Booking
+from app.models import Property, PropertyAmenity, Booking, VisitWindow, VisitSlot
 from app.config import settings
+from app import catalogue
+from app.amenities import set_amenities
 
 # ---------------------------------------------------------------------------
 # Apify-based import (99acres scraper)
@@ -161,7 +163,7 @@ def map_apify_item(item: dict, default_city: str) -> dict | None:
         "location": location[:255] or city,
         "city": city[:100],
         "area_sqft": float(area) if area else None,
-        "amenities": json.dumps(amenities_list[:10]),
+        "amenities": json.dumps(amenities_list),
         "image_url": item.get("image") or item.get("imageUrl") or None,
     }
 
@@ -228,17 +230,24 @@ def import_properties(properties: list[dict], replace: bool = False):
             bookings_deleted = db.query(Booking).delete()
             if bookings_deleted:
                 print(f"Cleared {bookings_deleted} existing bookings.")
+            db.query(PropertyAmenity).delete()
+            db.query(VisitSlot).delete()
+            db.query(VisitWindow).delete()
             deleted = db.query(Property).delete()
             print(f"Cleared {deleted} existing properties.")
 
         count = 0
         for data in properties:
-            data["status"] = "available"
+            data = dict(data, status="available")
+            amenities = data.pop("amenities", None)
             prop = Property(**data)
+            set_amenities(prop, amenities)
             db.add(prop)
             count += 1
 
+        catalogue.bump_version(db)
         db.commit()
+        catalogue.notify_changed()
         print(f"Imported {count} properties successfully.")
     finally:
         db.close()
@@ -0,0 +1,290 @@
+"""
+City and locality matching.
+
+Users (and speech-to-text) write "Bombay", "Andheri W" or "Powaii" for
+values stored as "Mumbai", "Andheri West" and "Powai". Searches resolve the
+user's term against the vocabulary of distinct city and location values
+instead of running ILIKE '%term%' over every property row. The vocabulary
+is small, so resolution is cheap and happens in memory. The resolved exact
+values then filter properties with IN on the indexed (city, location)
+columns.
+
+A term is resolved in order, after word-level normalization (WORD_ALIASES:
+"w" -> "west", "rd" -> "road"):
+1. Exact: a catalogue value with the same normalized form.
+2. Aliases: built-in CITY_ALIASES plus the location_aliases table, keeping
+   only targets the catalogue has, so an alias never hides a real listing.
+3. Whole words: every value containing the term on word boundaries
+   ("Andheri" -> West and East, but "Sector 9" not -> "Sector 99"). A term
+   made only of generic words (below) goes no further.
+4. Trigram similarity, pg_trgm style, via an inverted trigram index. Only
+   the distinctive words are scored. Generic words (GENERIC_WORDS: west,
+   road, sector, nagar, ...) must appear in the value too but add nothing to
+   the score, so "Goregaon West" can't match "Bandra West" on "west" alone.
+   The best value must score at least LOCALITY_MATCH_THRESHOLD and beat the
+   runner-up by _RUNNER_UP_MARGIN. An ambiguous term matches nothing, which
+   is better than a confident wrong neighbourhood.
+
+The vocabulary reloads in full at startup, after bulk catalogue changes
+(notify_changed(None)) and every LOCALITY_REFRESH_SECONDS. Writes to single
+properties only read those rows back. Most writes bring no new city or
+location, and then they cost one small query. Values that disappear (the
+last listing in a locality deleted) drop out at the next full reload.
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Property, LocationAlias
+from app import catalogue
+
+CITY_ALIASES = {
+    "bombay": "Mumbai", "navi mumbai": "Mumbai", "thane": "Mumbai",
+    "bengaluru": "Bangalore", "blr": "Bangalore", "bangaluru": "Bangalore",
+    "poona": "Pune",
+    "madras": "Chennai",
+    "delhi": "Delhi NCR", "new delhi": "Delhi NCR", "ncr": "Delhi NCR", "gurgaon": "Delhi NCR",
+    "gurugram": "Delhi NCR", "noida": "Delhi NCR",
+    "calcutta": "Kolkata",
+}
+
+WORD_ALIASES = {
+    "w": "west", "e": "east", "n": "north", "s": "south",
+    "rd": "road", "stn": "station", "sec": "sector", "sect": "sector", "nr": "near",
+    "ngr": "nagar", "mkt": "market", "extn": "extension", "ext": "extension",
+}
+
+# Words shared by many unrelated places; they qualify a match but never make one
+GENERIC_WORDS = {
+    "west", "east", "north", "south", "road", "station", "sector", "nagar", "near", "market", "extension",
+    "phase", "colony", "layout", "main", "cross", "block", "stage", "new", "old",
+}
+
+# A fuzzy best match must beat the next different score by this much; equal scores
+# (values differing only in generic words) are returned together
+_RUNNER_UP_MARGIN = 0.1
+_MAX_FUZZY_MATCHES = 5
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_place(text: str) -> str:
+    words = _NON_WORD.sub(" ", (text or "").lower()).split()
+    return " ".join(WORD_ALIASES.get(word, word) for word in words)
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading spaces and one trailing."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def split_generic(norm: str) -> tuple[list[str], set[str]]:
+    """(distinctive words, generic words) of a normalized place"""
+    words = norm.split()
+    return [word for word in words if word not in GENERIC_WORDS], {word for word in words if word in GENERIC_WORDS}
+
+
+class _Vocabulary:
+    """Normalized values with an inverted trigram index for one kind of place (cities or locations)."""
+
+    def __init__(self, values: list[str], aliases: dict[str, list[str]]):
+        self.values = values
+        self.normalized = [normalize_place(value) for value in values]
+        self.exact: dict[str, list[str]] = defaultdict(list)
+        # Alias targets the catalogue doesn't have are dropped
+        live = set(values)
+        self.aliases = {alias: [v for v in targets if v in live] for alias, targets in aliases.items()}
+        self.grams: list[set[str]] = []
+        self.word_grams: list[list[set[str]]] = []
+        self.generic: list[set[str]] = []
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        for i, norm in enumerate(self.normalized):
+            self.exact[norm].append(values[i])
+            words, generic = split_generic(norm)
+            grams = trigrams(" ".join(words))
+            self.grams.append(grams)
+            self.word_grams.append([trigrams(word) for word in words])
+            self.generic.append(generic)
+            for gram in grams:
+                self.postings[gram].append(i)
+
+    def match(self, term: str, allowed=None, threshold: float = 0.4) -> list[str]:
+        norm = normalize_place(term)
+        if not norm:
+            return []
+        for found in (self.exact.get(norm), self.aliases.get(norm)):
+            found = [v for v in found or () if allowed is None or v in allowed]
+            if found:
+                return found
+
+        query_words, query_generic = split_generic(norm)
+        if not query_words:
+            return []  # only generic words ("west", "main road"): too vague to guess
+        padded = f" {norm} "
+        words = [self.values[i] for i, value in enumerate(self.normalized)
+                 if padded in f" {value} " and (allowed is None or self.values[i] in allowed)]
+        if words:
+            return words
+
+        query = trigrams(" ".join(query_words))
+        query_word_grams = [trigrams(word) for word in query_words]
+        hits = set()
+        for gram in query:
+            hits.update(self.postings.get(gram, ()))
+        scored = []
+        for i in hits:
+            if allowed is not None and self.values[i] not in allowed:
+                continue
+            if not query_generic <= self.generic[i]:
+                continue  # "Andheri W" is not "Andheri East"
+            # Whole distinctive part, or every query word against its best value word,
+            # so "Andheree" still finds "Andheri West"
+            per_word = sum(max((similarity(q, v) for v in self.word_grams[i]), default=0.0)
+                           for q in query_word_grams) / len(query_word_grams)
+            score = max(similarity(query, self.grams[i]), per_word)
+            if score >= threshold:
+                scored.append((score, self.values[i]))
+        if not scored:
+            return []
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        best = scored[0][0]
+        runner_up = next((score for score, _ in scored if score < best - 1e-9), None)
+        if runner_up is not None and best - runner_up < _RUNNER_UP_MARGIN:
+            return []
+        return [value for score, value in scored[:_MAX_FUZZY_MATCHES] if score >= best - 1e-9]
+
+
+class LocalityMatcher:
+    def __init__(self, refresh_seconds: float, threshold: float):
+        self.refresh_seconds = refresh_seconds
+        self.threshold = threshold
+        self._cities = _Vocabulary([], {})
+        self._locations = _Vocabulary([], {})
+        self._city_of: dict[str, set[str]] = {}
+        self._city_aliases: dict[str, list[str]] = {}
+        self._location_aliases: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+        self._stale = True
+        self._dirty: set[int] = set()
+        self._next_refresh = 0.0
+
+    def invalidate(self, property_ids: list[int] | None = None):
+        """catalogue listener: a full reload for bulk changes, otherwise just the changed ids."""
+        with self._lock:
+            if property_ids is None:
+                self._stale = True
+            else:
+                self._dirty.update(property_ids)
+
+    def sync(self, db: Session):
+        if not self._stale and not self._dirty and time.monotonic() < self._next_refresh:
+            return
+        with self._lock:
+            if self._stale or time.monotonic() >= self._next_refresh:
+                # Cleared up front so an invalidate() during the reload isn't lost, restored if it fails
+                self._stale, self._dirty = False, set()
+                try:
+                    self._reload(db)
+                except Exception:
+                    self._stale = True
+                    raise
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                try:
+                    self._add(db, dirty)
+                except Exception:
+                    self._dirty |= dirty
+                    raise
+
+    def _reload(self, db: Session):
+        pairs = db.execute(select(Property.city, Property.location).distinct()).all()
+        aliases = db.execute(select(LocationAlias.alias, LocationAlias.city, LocationAlias.location)).all()
+
+        city_of: dict[str, set[str]] = defaultdict(set)
+        for city, location in pairs:
+            city_of[location].add(city)
+        city_aliases: dict[str, list[str]] = defaultdict(list)
+        for alias, city in CITY_ALIASES.items():
+            city_aliases[normalize_place(alias)].append(city)
+        location_aliases: dict[str, list[str]] = defaultdict(list)
+        for alias, city, location in aliases:
+            target = location_aliases if location else city_aliases
+            target[normalize_place(alias)].append(location or city)
+
+        self._city_aliases, self._location_aliases = city_aliases, location_aliases
+        self._build(city_of)
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def _add(self, db: Session, property_ids: set[int]):
+        """Add the cities and locations of changed properties; rebuilds only when one is new."""
+        pairs = db.execute(select(Property.city, Property.location).distinct()
+                           .where(Property.id.in_(property_ids))).all()
+        new = [(city, location) for city, location in pairs if city not in self._city_of.get(location, ())]
+        if not new:
+            return
+        city_of = {location: set(cities) for location, cities in self._city_of.items()}
+        for city, location in new:
+            city_of.setdefault(location, set()).add(city)
+        self._build(city_of)
+
+    def _build(self, city_of: dict[str, set[str]]):
+        self._cities = _Vocabulary(sorted({city for cities in city_of.values() for city in cities}),
+                                   self._city_aliases)
+        self._locations = _Vocabulary(sorted(city_of), self._location_aliases)
+        self._city_of = city_of
+
+    def cities(self, term: str) -> list[str]:
+        """Catalogue city values matching a user's city term, best first."""
+        return self._cities.match(term, threshold=self.threshold)
+
+    def city_spellings(self, cities: list[str]) -> set[str]:
+        """Normalized aliases that resolve to these catalogue cities (an alias naming a real city doesn't)."""
+        wanted = set(cities)
+        return {alias for alias, targets in self._cities.aliases.items()
+                if alias not in self._cities.exact and wanted.intersection(targets)}
+
+    def locations(self, term: str, cities: list[str] | None = None) -> list[str]:
+        """Catalogue location values matching a user's locality term, optionally within some cities."""
+        allowed = None
+        if cities is not None:
+            wanted = set(cities)
+            allowed = {location for location, of in self._city_of.items() if of & wanted}
+        return self._locations.match(term, allowed, threshold=self.threshold)
+
+    def resolve(self, db: Session, city: str | None, location: str | None) -> tuple[list[str] | None, list[str] | None]:
+        """
+        Exact city and location values for a search, or None for a filter that wasn't given.
+
+        An empty list means the term matched nothing. A city term that names a
+        locality instead ("Gurgaon", "Whitefield") resolves to that locality's
+        city and location.
+        """
+        self.sync(db)
+        cities = locations = None
+        if city:
+            cities = self.cities(city)
+            if not cities:
+                locations = self.locations(city)
+                cities = sorted({c for loc in locations for c in self._city_of[loc]})
+        if location:
+            matched = self.locations(location, cities)
+            locations = matched if locations is None else [loc for loc in matched if loc in locations]
+        return cities, locations
+
+
+locality_matcher = LocalityMatcher(settings.LOCALITY_REFRESH_SECONDS, settings.LOCALITY_MATCH_THRESHOLD)
+catalogue.subscribe(locality_matcher.invalidate)
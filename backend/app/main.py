@@ -2,16 +2,19 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import create_tables
-from app.routers import auth, chat, properties, bookings, leads, vapi_webhook, vapi_config
+from app.routers import auth, chat, properties, availability, bookings, leads, vapi_webhook, vapi_config, metrics
 from app.scheduler import start_scheduler, stop_scheduler
+from app.agent.tracing import tracer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # create_tables()
     start_scheduler()
+    tracer.start()
     yield
     stop_scheduler()
+    tracer.shutdown()
 
 
 app = FastAPI(title="Real Estate AI Agent", lifespan=lifespan)
@@ -22,15 +25,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(auth.router)
 app.include_router(chat.router)
 app.include_router(properties.router)
+app.include_router(availability.router)
 app.include_router(bookings.router)
 app.include_router(leads.router)
 app.include_router(vapi_webhook.router)
 app.include_router(vapi_config.router)
+app.include_router(metrics.router)
 
 
 @app.get("/api/health")
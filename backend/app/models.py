@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Time, Boolean, ForeignKey, LargeBinary, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -36,6 +36,18 @@ class Property(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     bookings = relationship("Booking", back_populates="property")
+    amenity_rows = relationship("PropertyAmenity", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Hot paths are checked with `python -m app.query_plans`; migrations/ creates the same indexes
+    __table_args__ = (
+        # Searches filter on exact city/location values resolved by app.localities
+        Index("ix_properties_city_location", "city", "location"),
+        # Search fallback over available listings: city, then type and the price range
+        Index("ix_properties_available_city_type_price", "city", "property_type", "price",
+              postgresql_where=status == "available", sqlite_where=status == "available"),
+        # Property index change detection (max(updated_at), updated_at >= watermark)
+        Index("ix_properties_updated_at", "updated_at"),
+    )
 
     def to_dict(self):
         return {
@@ -54,6 +66,32 @@ class Property(Base):
         }
 
 
+class PropertyAmenity(Base):
+    """One canonical amenity of a property (see app.amenities); indexed for has-all / has-any filters."""
+    __tablename__ = "property_amenities"
+
+    amenity = Column(String(50), primary_key=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class CatalogueState(Base):
+    """A single row (id 1) versioning the property catalogue for HTTP caching; see app.catalogue."""
+    __tablename__ = "catalogue_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    changed_at = Column(DateTime, server_default=func.now())
+
+
+class LocationAlias(Base):
+    """Extra spellings for app.localities, e.g. from speech-to-text logs. No location means a city alias."""
+    __tablename__ = "location_aliases"
+
+    alias = Column(String(255), primary_key=True)
+    city = Column(String(100), nullable=False)
+    location = Column(String(255))
+
+
 class Lead(Base):
     __tablename__ = "leads"
 
@@ -70,6 +108,17 @@ class Lead(Base):
     requirements = relationship("Requirement", back_populates="lead")
     bookings = relationship("Booking", back_populates="lead")
 
+    __table_args__ = (
+        # Admin leads list, newest first, keyset-paginated on (created_at, id)
+        Index("ix_leads_created_at", "created_at", "id"),
+        # Chat/auth linking a logged-in user to their lead
+        Index("ix_leads_user_id", "user_id"),
+        # follow_up_inactive_leads: only leads we can contact
+        Index("ix_leads_contactable_last_activity", "last_activity_at",
+              postgresql_where=name.isnot(None) & phone.isnot(None),
+              sqlite_where=name.isnot(None) & phone.isnot(None)),
+    )
+
 
 class Requirement(Base):
     __tablename__ = "requirements"
@@ -90,6 +139,8 @@ class Requirement(Base):
 
     lead = relationship("Lead", back_populates="requirements")
 
+    __table_args__ = (Index("ix_requirements_lead_id", "lead_id"),)
+
 
 class Booking(Base):
     __tablename__ = "bookings"
@@ -97,8 +148,11 @@ class Booking(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False)
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    # Local date and time as shown to users ("2026-10-19", "10:00 AM"); visit_at is the same
+    # instant in UTC for range queries, null only for legacy times that don't parse
     visit_date = Column(String(20), nullable=False)
     visit_time = Column(String(20), nullable=False)
+    visit_at = Column(DateTime(timezone=True))
     status = Column(String(20), nullable=False, default="pending")
     notes = Column(Text)
     reminder_sent = Column(Boolean, default=False)
@@ -106,3 +160,50 @@ class Booking(Base):
 
     lead = relationship("Lead", back_populates="bookings")
     property = relationship("Property", back_populates="bookings")
+
+    __table_args__ = (
+        # A lead's bookings, latest first (cancel_booking, leads view)
+        Index("ix_bookings_lead_created", "lead_id", "created_at"),
+        Index("ix_bookings_property_id", "property_id"),
+        # Admin bookings list, optionally by status, newest first
+        Index("ix_bookings_status_created", "status", "created_at"),
+        # Calendar and visit-time ranges
+        Index("ix_bookings_visit_at", "visit_at"),
+        # send_booking_reminders: pending visits without a reminder yet. Predicates are written
+        # the way the queries filter, since SQLite only uses a partial index on an exact match.
+        Index("ix_bookings_reminder_due", "visit_at",
+              postgresql_where=(status == "pending") & (reminder_sent == False),  # noqa: E712
+              sqlite_where=(status == "pending") & (reminder_sent == False)),  # noqa: E712
+    )
+
+
+class VisitWindow(Base):
+    """Visiting hours of a property on one weekday (0 = Monday); see app.availability."""
+    __tablename__ = "visit_windows"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False, index=True)
+    weekday = Column(Integer, nullable=False)
+    opens = Column(Time, nullable=False)
+    closes = Column(Time, nullable=False)
+    slot_minutes = Column(Integer, nullable=False, default=60)
+    capacity = Column(Integer, nullable=False, default=2)
+
+
+class VisitSlot(Base):
+    """Places taken in one visiting slot (local wall-clock start) by active bookings; see app.availability."""
+    __tablename__ = "visit_slots"
+
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    slot_start = Column(DateTime, primary_key=True)
+    booked = Column(Integer, nullable=False, default=0)
+
+
+class AgentSession(Base):
+    """Conversation state for the shared "postgres" session backend."""
+    __tablename__ = "agent_sessions"
+
+    session_id = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed JSON
+    updated_at = Column(DateTime, server_default=func.now(), index=True)
@@ -1,8 +1,13 @@
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.config import settings
 
+# SMTP and Twilio round trips run here so booking never waits on them
+notification_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notify")
+
 
 def send_booking_email(to_email: str, name: str, property_title: str,
                        visit_date: str, visit_time: str, booking_id: int):
@@ -102,3 +107,13 @@ def send_booking_notifications(lead, property_title: str, visit_date: str,
 
     if not lead.email and not lead.phone:
         print(f"[NOTIFY] No contact info for lead {lead.id}, skipping notifications")
+
+
+def dispatch_booking_notifications(lead, property_title: str, visit_date: str,
+                                   visit_time: str, booking_id: int):
+    """Queue booking notifications on the background pool and return immediately."""
+    # Copy contact fields now; the ORM object is detached once the caller's session closes
+    contact = SimpleNamespace(id=lead.id, name=lead.name, email=lead.email, phone=lead.phone)
+    notification_executor.submit(
+        send_booking_notifications, contact, property_title, visit_date, visit_time, booking_id
+    )
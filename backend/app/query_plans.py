@@ -0,0 +1,123 @@
+"""
+EXPLAIN report for the hot query paths.
+
+Prints the plan for each query that runs per request or per scheduler tick,
+and flags any full table scan. Run it in review after changing a query or
+an index:
+
+    python -m app.query_plans
+    python -m app.query_plans --database-url sqlite:///./check.db
+
+On PostgreSQL, sequential scans are disabled for the check (SET LOCAL
+enable_seqscan = off). Small or freshly migrated tables still report a
+scan only when no index can serve the query. On SQLite, any "SCAN <table>"
+step that doesn't use an index is flagged. Exits with status 1 when
+anything is flagged. Queries are built like their call sites, so keep them
+in step.
+"""
+
+import argparse
+import re
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, select, tuple_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Property, PropertyAmenity, Lead, Requirement, Booking, AgentSession, VisitWindow, VisitSlot
+from app.agent.tools import _search_query
+
+_PG_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?!.*USING (?:COVERING )?INDEX)(?!.*USING INTEGER PRIMARY KEY)")
+
+
+def hot_queries(db: Session) -> list[tuple[str, object]]:
+    """(name, statement) for every hot path, with representative arguments."""
+    now = datetime.utcnow()
+    return [
+        # search_properties fallback when the property index is off
+        ("search_properties", _search_query(
+            db, cities=["Mumbai"], locations=["Andheri West", "Andheri East"], property_type="apartment",
+            budget_max=20_000_000, bhk_min=2).order_by(Property.price, Property.id).limit(6)),
+        ("search_properties amenities", _search_query(
+            db, cities=["Pune"], amenities=["pool", "gym"]).order_by(Property.price, Property.id).limit(6)),
+        ("get_property_details", db.query(Property).filter(Property.id == 1)),
+        ("GET /api/properties", select(Property.id, Property.title).where(Property.city.in_(["Mumbai"]))
+         .where(Property.id < 1000).order_by(Property.id.desc()).limit(51)),
+        ("property index recheck", select(Property.id).where(Property.updated_at >= now - timedelta(seconds=30))),
+        ("amenity rows for a property", select(PropertyAmenity).where(PropertyAmenity.property_id == 1)),
+        ("lead by session", db.query(Lead).filter(Lead.session_id == "session")),
+        ("lead by user", db.query(Lead).filter(Lead.user_id == 1)),
+        ("GET /api/leads", select(Lead.id, Lead.name).where(tuple_(Lead.created_at, Lead.id) < (now, 1000))
+         .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(51)),
+        ("requirement by lead", db.query(Requirement).filter(Requirement.lead_id == 1)),
+        ("cancel_booking", db.query(Booking).filter(Booking.lead_id == 1)
+         .filter(Booking.status.in_(["pending", "confirmed"])).filter(Booking.visit_at > now)
+         .order_by(Booking.created_at.desc()).limit(1)),
+        ("GET /api/bookings", db.query(Booking).filter(Booking.status == "pending")
+         .order_by(Booking.created_at.desc())),
+        ("visit windows for a property", select(VisitWindow).where(VisitWindow.property_id == 1)),
+        ("get_available_slots", select(VisitSlot.slot_start, VisitSlot.booked)
+         .where(VisitSlot.property_id == 1, VisitSlot.slot_start >= now, VisitSlot.slot_start < now + timedelta(days=7))),
+        ("GET /api/bookings/calendar", select(Booking.id, Booking.visit_at)
+         .where(Booking.visit_at >= now, Booking.visit_at < now + timedelta(days=7))
+         .order_by(Booking.visit_at, Booking.id)),
+        ("send_booking_reminders", db.query(Booking)
+         .filter(Booking.visit_at >= now)
+         .filter(Booking.visit_at < now + timedelta(hours=settings.REMINDER_LEAD_HOURS))
+         .filter(Booking.status == "pending")
+         .filter(Booking.reminder_sent == False)),  # noqa: E712
+        ("follow_up_inactive_leads", db.query(Lead).filter(Lead.last_activity_at < now - timedelta(hours=24))
+         .filter(Lead.name.isnot(None)).filter(Lead.phone.isnot(None))),
+        ("purge_expired_sessions", select(func.count()).select_from(AgentSession)
+         .where(AgentSession.updated_at < now - timedelta(seconds=settings.SESSION_TTL_SECONDS))),
+    ]
+
+
+def explain(db: Session, statement) -> tuple[list[str], list[str]]:
+    """(plan lines, tables read by a full scan)"""
+    statement = getattr(statement, "statement", statement)
+    dialect = db.get_bind().dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    connection = db.connection()
+    if dialect.name == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        lines = [row[0] for row in connection.exec_driver_sql("EXPLAIN " + sql)]
+        return lines, [m.group(1) for line in lines for m in [_PG_SEQ_SCAN.search(line)] if m]
+    if dialect.name == "sqlite":
+        lines = [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+        return lines, [m.group(1) for line in lines for m in [_SQLITE_SCAN.match(line)] if m]
+    raise ValueError(f"No EXPLAIN support for {dialect.name}")
+
+
+def check(db: Session) -> int:
+    """Print every plan; returns the number of queries with a full table scan."""
+    flagged = 0
+    for name, statement in hot_queries(db):
+        lines, scans = explain(db, statement)
+        status = "SEQ SCAN " + ", ".join(scans) if scans else "ok"
+        print(f"== {name}: {status}")
+        for line in lines:
+            print(f"   {line}")
+        flagged += bool(scans)
+    db.rollback()
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report EXPLAIN plans for the hot queries")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    args = parser.parse_args()
+
+    db = Session(create_engine(args.database_url))
+    try:
+        flagged = check(db)
+    finally:
+        db.close()
+    if flagged:
+        print(f"[QUERY PLANS] {flagged} hot queries scan a whole table")
+        sys.exit(1)
+    print("[QUERY PLANS] every hot query uses an index")
+
+
+if __name__ == "__main__":
+    main()
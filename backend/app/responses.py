@@ -0,0 +1,76 @@
+"""
+JSON responses for the high-volume read endpoints.
+
+Without a response class, FastAPI runs jsonable_encoder over every attribute
+of every returned object before json.dumps. The listing endpoints already
+build plain dicts from projected columns, so json_response serializes them
+directly: with orjson when installed, otherwise the standard library. It also
+gzips bodies of at least GZIP_MIN_BYTES when the client accepts gzip.
+Compression is done per response rather than by middleware, so the SSE chat
+stream is never buffered.
+
+Catalogue endpoints are also conditional: cache_headers builds the ETag,
+Last-Modified and Cache-Control headers, and not_modified answers a matching
+If-None-Match / If-Modified-Since with a 304 before any work is done.
+"""
+
+import gzip
+import json
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request
+from fastapi.responses import Response
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=_default).encode()
+
+
+def json_response(request: Request, content, headers: dict | None = None, status_code: int = 200) -> Response:
+    body = dumps(content)
+    headers = dict(headers or {}, Vary="Accept-Encoding")
+    if len(body) >= settings.GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        # mtime=0 keeps the bytes identical for identical content
+        body = gzip.compress(body, compresslevel=5, mtime=0)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def cache_headers(etag: str, last_modified: datetime | None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": settings.CATALOGUE_CACHE_CONTROL}
+    if last_modified is not None:
+        # Stored timestamps are naive UTC
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(request: Request, headers: dict) -> Response | None:
+    """A 304 carrying headers when the client's copy is current, otherwise None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: gzipped and plain bodies share an ETag
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        current = "*" in tags or headers["ETag"].removeprefix("W/") in tags
+    elif "Last-Modified" in headers and "if-modified-since" in request.headers:
+        try:
+            current = parsedate_to_datetime(headers["Last-Modified"]) <= \
+                parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return None
+    else:
+        return None
+    return Response(status_code=304, headers=dict(headers, Vary="Accept-Encoding")) if current else None
@@ -0,0 +1,48 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.config import settings
+from app.models import Property, VisitWindow
+from app.schemas import VisitWindowIn
+from app.availability import free_slots, format_time, window_cache
+from app.responses import json_response
+
+router = APIRouter(prefix="/api")
+
+
+def verify_admin(authorization: str = Header(...)):
+    if authorization != f"Bearer {settings.ADMIN_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+def _require_property(db: Session, property_id: int):
+    if not db.query(Property.id).filter(Property.id == property_id).first():
+        raise HTTPException(status_code=404, detail="Property not found")
+
+
+@router.get("/properties/{property_id}/availability")
+def property_availability(request: Request, property_id: int, start: date | None = None,
+                          days: int = Query(7, ge=1, le=14), db: Session = Depends(get_db)):
+    """Free visiting slots with places left, soonest first, in the property's local time."""
+    _require_property(db, property_id)
+    slots = free_slots(db, property_id, start, days)
+    return json_response(request, [
+        {"start": slot_start.isoformat(), "date": slot_start.date().isoformat(), "time": format_time(slot_start),
+         "places_left": left}
+        for slot_start, left in slots
+    ])
+
+
+@router.put("/properties/{property_id}/visit-windows", dependencies=[Depends(verify_admin)])
+def set_visit_windows(property_id: int, windows: list[VisitWindowIn], db: Session = Depends(get_db)):
+    """Replace the property's visiting windows; an empty list restores the default hours."""
+    _require_property(db, property_id)
+    for window in windows:
+        if window.opens >= window.closes:
+            raise HTTPException(status_code=422, detail=f"Window on weekday {window.weekday} closes before it opens")
+    db.query(VisitWindow).filter(VisitWindow.property_id == property_id).delete()
+    db.add_all(VisitWindow(property_id=property_id, **window.model_dump()) for window in windows)
+    db.commit()
+    window_cache.invalidate(property_id)
+    return {"message": f"Saved {len(windows)} visiting windows for property {property_id}"}
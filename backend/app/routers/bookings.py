@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from datetime import date, datetime, time, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.config import settings
 from app.models import Booking, Lead, Property
 from app.schemas import BookingUpdate
+from app.availability import (ACTIVE_STATUSES, SlotUnavailable, to_utc, to_local, local_now, slot_capacity,
+                              reserve, release)
+from app.responses import json_response
 
 router = APIRouter(prefix="/api")
 
@@ -13,12 +18,39 @@ def verify_admin(authorization: str = Header(...)):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
+def _visit_range(start: date, end: date) -> tuple[datetime, datetime]:
+    """UTC bounds [start, end + 1 day) for local calendar days, to compare with visit_at."""
+    return to_utc(datetime.combine(start, time.min)), to_utc(datetime.combine(end + timedelta(days=1), time.min))
+
+
+def _utc_iso(value: datetime | None) -> str | None:
+    # SQLite hands visit_at back naive (it is stored in UTC)
+    if value is None:
+        return None
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+
+
+def _takes_slot(db: Session, property_id: int, start: datetime | None) -> bool:
+    """Whether a reactivated visit holds a slot place: it is upcoming and on one of the property's windows."""
+    return start is not None and start >= local_now() and slot_capacity(db, property_id, start) is not None
+
+
 @router.get("/bookings", dependencies=[Depends(verify_admin)])
-def list_bookings(status: str | None = None, db: Session = Depends(get_db)):
+def list_bookings(status: str | None = None, visit_from: date | None = None, visit_to: date | None = None,
+                  db: Session = Depends(get_db)):
+    """Bookings newest first; with visit_from / visit_to (local days, inclusive), by visit time instead."""
     query = db.query(Booking).options(joinedload(Booking.lead), joinedload(Booking.property))
     if status:
         query = query.filter(Booking.status == status)
-    bookings = query.order_by(Booking.created_at.desc()).all()
+    if visit_from or visit_to:
+        if visit_from:
+            query = query.filter(Booking.visit_at >= _visit_range(visit_from, visit_from)[0])
+        if visit_to:
+            query = query.filter(Booking.visit_at < _visit_range(visit_to, visit_to)[1])
+        query = query.order_by(Booking.visit_at, Booking.id)
+    else:
+        query = query.order_by(Booking.created_at.desc())
+    bookings = query.all()
     return [
         {
             "id": b.id,
@@ -28,6 +60,7 @@ def list_bookings(status: str | None = None, db: Session = Depends(get_db)):
             "property_id": b.property_id,
             "visit_date": b.visit_date,
             "visit_time": b.visit_time,
+            "visit_at": _utc_iso(b.visit_at),
             "status": b.status,
             "created_at": str(b.created_at),
         }
@@ -35,11 +68,52 @@ def list_bookings(status: str | None = None, db: Session = Depends(get_db)):
     ]
 
 
+@router.get("/bookings/calendar", dependencies=[Depends(verify_admin)])
+def booking_calendar(request: Request, start: date, end: date, status: str | None = None,
+                     db: Session = Depends(get_db)):
+    """Bookings visiting from start to end (local days, inclusive), in visit order, from one range scan."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="end is before start")
+    if (end - start).days >= settings.BOOKING_CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {settings.BOOKING_CALENDAR_MAX_DAYS} days per request")
+    begin, until = _visit_range(start, end)
+    query = (
+        select(Booking.id, Booking.visit_at, Booking.visit_date, Booking.visit_time, Booking.status,
+               Booking.property_id, Property.title, Lead.name, Lead.phone)
+        .join(Property, Property.id == Booking.property_id)
+        .join(Lead, Lead.id == Booking.lead_id)
+        .where(Booking.visit_at >= begin, Booking.visit_at < until)
+        .order_by(Booking.visit_at, Booking.id)
+    )
+    if status:
+        query = query.where(Booking.status == status)
+    return json_response(request, [
+        {"id": booking_id, "visit_at": _utc_iso(visit_at), "visit_date": visit_date, "visit_time": visit_time,
+         "status": booking_status, "property_id": property_id, "property_title": title,
+         "lead_name": name, "lead_phone": phone}
+        for booking_id, visit_at, visit_date, visit_time, booking_status, property_id, title, name, phone
+        in db.execute(query)
+    ])
+
+
 @router.patch("/bookings/{booking_id}", dependencies=[Depends(verify_admin)])
 def update_booking(booking_id: int, data: BookingUpdate, db: Session = Depends(get_db)):
     booking = db.query(Booking).filter(Booking.id == booking_id).first()
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
+    # Only active bookings hold a slot place
+    was_active, active = booking.status in ACTIVE_STATUSES, data.status in ACTIVE_STATUSES
+    start = to_local(booking.visit_at)
+    if was_active and not active:
+        release(db, booking.property_id, start)
+    elif active and not was_active and _takes_slot(db, booking.property_id, start):
+        try:
+            # The admin is restoring an agreed visit, so the booking notice doesn't apply
+            reserve(db, booking.property_id, start, check_notice=False)
+        except SlotUnavailable as e:
+            db.rollback()
+            raise HTTPException(status_code=409, detail=str(e))
     booking.status = data.status
     db.commit()
     return {"message": f"Booking {booking_id} updated to {data.status}"}
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Depends, Header
+import json
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import SessionLocal
 from app.schemas import ChatRequest, ChatResponse
 from app.agent.engine import agent
+from app.agent.session_locks import SessionBusy
+from app.agent.runner import run_blocking
 from app.auth_utils import verify_jwt
 from app.models import Lead, User
 
 router = APIRouter(prefix="/api")
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, authorization: str = Header(None), db: Session = Depends(get_db)):
+def resolve_user_info(db: Session, session_id: str, authorization: str | None) -> dict | None:
+    """Link the chat session to the authenticated user and return their contact info."""
     # Link session to authenticated user if token provided
     user_id = None
     if authorization and authorization.startswith("Bearer "):
@@ -19,7 +23,7 @@ async def chat(request: ChatRequest, authorization: str = Header(None), db: Sess
             user_id = payload.get("user_id")
             user = db.query(User).filter(User.id == user_id).first()
 
-            lead = db.query(Lead).filter(Lead.session_id == request.session_id).first()
+            lead = db.query(Lead).filter(Lead.session_id == session_id).first()
             if lead and not lead.user_id and user_id and user:
                 # Existing lead, link to user
                 lead.user_id = user_id
@@ -34,7 +38,7 @@ async def chat(request: ChatRequest, authorization: str = Header(None), db: Sess
                 existing_lead = db.query(Lead).filter(Lead.user_id == user_id).first()
                 if existing_lead:
                     # Update the profile-created lead with this chat session_id
-                    existing_lead.session_id = request.session_id
+                    existing_lead.session_id = session_id
                     db.commit()
 
     # Pass authenticated user info so the agent knows who it's talking to
@@ -43,15 +47,60 @@ async def chat(request: ChatRequest, authorization: str = Header(None), db: Sess
         u = db.query(User).filter(User.id == user_id).first()
         if u:
             user_info = {"name": u.name, "phone": u.phone, "email": u.email}
+    return user_info
 
-    result = await agent.handle_message(
-        session_id=request.session_id,
-        user_message=request.message,
-        db=db,
-        user_info=user_info,
-    )
+
+def load_user_info(session_id: str, authorization: str | None) -> dict | None:
+    """resolve_user_info in a short-lived session, so no connection is held while the model runs."""
+    db = SessionLocal()
+    try:
+        return resolve_user_info(db, session_id, authorization)
+    finally:
+        db.close()
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest, authorization: str = Header(None)):
+    user_info = await run_blocking(load_user_info, request.session_id, authorization)
+
+    try:
+        result = await agent.handle_message(
+            session_id=request.session_id,
+            user_message=request.message,
+            user_info=user_info,
+        )
+    except SessionBusy:
+        raise HTTPException(status_code=429, detail="Too many messages in progress for this session")
     return ChatResponse(
         message=result.message,
         properties=result.properties,
         booking=result.booking,
     )
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, authorization: str = Header(None)):
+    """
+    Server-sent events variant of /chat.
+
+    Emits partial text as the model produces it, tool and result events while
+    the agent works, and a final "done" event with the ChatResponse fields.
+    """
+    async def event_stream():
+        try:
+            user_info = await run_blocking(load_user_info, request.session_id, authorization)
+            async for event in agent.stream_message(
+                session_id=request.session_id,
+                user_message=request.message,
+                user_info=user_info,
+            ):
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        except SessionBusy:
+            error = {"type": "error", "detail": "Too many messages in progress for this session"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,50 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+import base64
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from sqlalchemy import select, func, or_, not_, exists, case, tuple_
 from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.config import settings
-from app.models import Lead
+from app.models import Lead, Requirement, Booking
+from app.localities import locality_matcher
+from app.responses import json_response
 
 router = APIRouter(prefix="/api")
 
+_REQUIREMENT_FIELDS = ("budget_min", "budget_max", "city", "location_pref", "property_type", "bhk_min", "bhk_max",
+                       "amenities", "additional_notes")
+_HAS_CONTACT = or_(Lead.phone.isnot(None), Lead.email.isnot(None))
+
 
 def verify_admin(authorization: str = Header(...)):
     if authorization != f"Bearer {settings.ADMIN_TOKEN}":
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
+def _filters(db: Session, has_contact: bool | None, city: str | None, created_from: date | None,
+             created_to: date | None, has_booking: bool | None) -> list:
+    conditions = []
+    if has_contact is not None:
+        conditions.append(_HAS_CONTACT if has_contact else not_(_HAS_CONTACT))
+    if city:
+        # Requirement.city is what the user said; match the catalogue city and its known spellings
+        cities = locality_matcher.resolve(db, city, None)[0] or []
+        names = {city.lower()} | {c.lower() for c in cities} | locality_matcher.city_spellings(cities)
+        conditions.append(exists().where(Requirement.lead_id == Lead.id, func.lower(Requirement.city).in_(names)))
+    if created_from:
+        conditions.append(Lead.created_at >= datetime.combine(created_from, time.min))
+    if created_to:
+        conditions.append(Lead.created_at < datetime.combine(created_to + timedelta(days=1), time.min))
+    if has_booking is not None:
+        booking = exists().where(Booking.lead_id == Lead.id)
+        conditions.append(booking if has_booking else not_(booking))
+    return conditions
+
+
+def _encode_cursor(created_at: datetime, lead_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{lead_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, lead_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return datetime.fromisoformat(created_at), int(lead_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/leads", dependencies=[Depends(verify_admin)])
-def list_leads(db: Session = Depends(get_db)):
-    leads = (
-        db.query(Lead)
-        .options(joinedload(Lead.requirements))
-        .order_by(Lead.created_at.desc())
-        .all()
-    )
-    return [
+def list_leads(request: Request, has_contact: bool | None = None, city: str | None = None,
+               created_from: date | None = None, created_to: date | None = None, has_booking: bool | None = None,
+               limit: int = Query(settings.LEAD_PAGE_SIZE, ge=1, le=settings.LEAD_PAGE_MAX),
+               cursor: str | None = None, db: Session = Depends(get_db)):
+    """
+    One page of leads, newest first, with their requirements.
+
+    Pages are keyed on (created_at, id), which the ix_leads_created_at index
+    serves in order. When more leads follow, X-Next-Cursor holds the
+    `cursor` for the next page.
+    """
+    query = select(Lead.id, Lead.session_id, Lead.name, Lead.phone, Lead.email, Lead.created_at)
+    query = query.where(*_filters(db, has_contact, city, created_from, created_to, has_booking))
+    if cursor:
+        query = query.where(tuple_(Lead.created_at, Lead.id) < _decode_cursor(cursor))
+    rows = db.execute(query.order_by(Lead.created_at.desc(), Lead.id.desc()).limit(limit + 1)).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    requirements = defaultdict(list)
+    if rows:
+        columns = [getattr(Requirement, name) for name in _REQUIREMENT_FIELDS]
+        for lead_id, *values in db.execute(select(Requirement.lead_id, *columns)
+                                           .where(Requirement.lead_id.in_([row.id for row in rows]))
+                                           .order_by(Requirement.id)):
+            requirements[lead_id].append(dict(zip(_REQUIREMENT_FIELDS, values)))
+    return json_response(request, [
         {
-            "id": l.id,
-            "session_id": l.session_id,
-            "name": l.name,
-            "phone": l.phone,
-            "email": l.email,
-            "created_at": str(l.created_at),
-            "requirements": [
-                {
-                    "budget_min": r.budget_min,
-                    "budget_max": r.budget_max,
-                    "city": r.city,
-                    "location_pref": r.location_pref,
-                    "property_type": r.property_type,
-                    "bhk_min": r.bhk_min,
-                    "bhk_max": r.bhk_max,
-                    "amenities": r.amenities,
-                    "additional_notes": r.additional_notes,
-                }
-                for r in l.requirements
-            ],
+            "id": row.id,
+            "session_id": row.session_id,
+            "name": row.name,
+            "phone": row.phone,
+            "email": row.email,
+            "created_at": str(row.created_at),
+            "requirements": requirements[row.id],
         }
-        for l in leads
-    ]
+        for row in rows
+    ], headers)
+
+
+@router.get("/leads/summary", dependencies=[Depends(verify_admin)])
+def leads_summary(city: str | None = None, created_from: date | None = None, created_to: date | None = None,
+                  db: Session = Depends(get_db)):
+    """
+    Lead counts and funnel totals in one aggregate query.
+
+    Funnel: leads -> with contact info -> qualified (has requirements) ->
+    booked (a booking that isn't cancelled) -> confirmed (a confirmed booking).
+    Requirements and bookings are rolled up per lead and outer-joined once.
+    """
+    qualified = select(Requirement.lead_id).group_by(Requirement.lead_id).subquery()
+    booked = (
+        select(Booking.lead_id, func.max(case((Booking.status == "confirmed", 1), else_=0)).label("confirmed"))
+        .where(Booking.status != "cancelled")
+        .group_by(Booking.lead_id)
+        .subquery()
+    )
+    row = db.execute(
+        select(
+            func.count(Lead.id).label("leads"),
+            func.count(Lead.id).filter(_HAS_CONTACT).label("with_contact"),
+            func.count(qualified.c.lead_id).label("qualified"),
+            func.count(booked.c.lead_id).label("booked"),
+            func.coalesce(func.sum(booked.c.confirmed), 0).label("confirmed"),
+        )
+        .select_from(Lead)
+        .outerjoin(qualified, qualified.c.lead_id == Lead.id)
+        .outerjoin(booked, booked.c.lead_id == Lead.id)
+        .where(*_filters(db, None, city, created_from, created_to, None))
+    ).one()
+    return {
+        "leads": row.leads,
+        "with_contact": row.with_contact,
+        "anonymous": row.leads - row.with_contact,
+        "qualified": row.qualified,
+        "booked": row.booked,
+        "confirmed": row.confirmed,
+    }
 
 
 @router.get("/leads/{lead_id}", dependencies=[Depends(verify_admin)])
@@ -0,0 +1,62 @@
+"""
+Prometheus scrape endpoint.
+
+Histograms are recorded where the work happens (engine, tool runner, DB
+engine, Vapi webhook, scheduler); this module also exposes the agent's token
+counters and the trace exporter's queue as gauges.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.metrics import registry, TURN_SECONDS
+from app.agent.context import model_context
+from app.agent.tracing import tracer
+from app.agent.search_cache import search_cache
+from app.agent.property_index import property_index
+from app.agent.session import session_store
+from app.agent.session_locks import session_gate
+
+router = APIRouter(prefix="/api")
+
+registry.gauge("agent_model_calls_total", "Gemini calls made",
+               lambda: model_context.usage.calls, kind="counter")
+registry.gauge("agent_prompt_tokens_total", "Prompt tokens sent to Gemini",
+               lambda: model_context.usage.prompt_tokens, kind="counter")
+registry.gauge("agent_cached_prompt_tokens_total", "Prompt tokens served from the context cache",
+               lambda: model_context.usage.cached_tokens, kind="counter")
+registry.gauge("agent_output_tokens_total", "Tokens generated by Gemini",
+               lambda: model_context.usage.output_tokens, kind="counter")
+registry.gauge("agent_fast_path_ratio", "Fraction of chat turns served by the fast path",
+               lambda: TURN_SECONDS.count("fast") / max(1, TURN_SECONDS.count("fast") + TURN_SECONDS.count("agent")))
+registry.gauge("search_cache_hits_total", "search_properties results served from cache",
+               lambda: search_cache.hits, kind="counter")
+registry.gauge("search_cache_misses_total", "search_properties calls that ran the query",
+               lambda: search_cache.misses, kind="counter")
+registry.gauge("search_cache_evictions_total", "Cache entries evicted by the LRU cap",
+               lambda: search_cache.evictions, kind="counter")
+registry.gauge("search_cache_entries", "Entries currently in the search cache", lambda: len(search_cache))
+registry.gauge("property_index_entries", "Properties held in the in-memory index", lambda: len(property_index))
+registry.gauge("property_index_rebuilds_total", "Full rebuilds of the property index",
+               lambda: property_index.rebuilds, kind="counter")
+registry.gauge("property_index_refreshed_rows_total", "Properties re-read after a catalogue change",
+               lambda: property_index.refreshed_rows, kind="counter")
+registry.gauge("agent_sessions_live", "Conversation sessions held in memory", lambda: len(session_store))
+registry.gauge("agent_sessions_bytes", "Approximate serialized size of live sessions",
+               lambda: session_store.total_bytes)
+registry.gauge("agent_sessions_expired_total", "Sessions dropped after SESSION_TTL_SECONDS of inactivity",
+               lambda: session_store.expired, kind="counter")
+registry.gauge("agent_sessions_evicted_total", "Sessions evicted by the count or memory cap",
+               lambda: session_store.evicted, kind="counter")
+registry.gauge("agent_sessions_busy", "Sessions with a turn queued or running", lambda: len(session_gate))
+registry.gauge("agent_messages_coalesced_total", "Duplicate in-flight messages answered from the original turn",
+               lambda: session_gate.coalesced, kind="counter")
+registry.gauge("agent_messages_rejected_total", "Messages rejected because the session had too many pending",
+               lambda: session_gate.rejected, kind="counter")
+registry.gauge("trace_queue_depth", "Trace events waiting for export", tracer.queue_depth)
+registry.gauge("trace_events_dropped_total", "Trace events dropped (queue full or export failed)",
+               lambda: tracer.dropped, kind="counter")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
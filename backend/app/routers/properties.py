@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.config import settings
 from app.models import Property
 from app.schemas import PropertyCreate, PropertyUpdate
+from app import catalogue
+from app.amenities import set_amenities
+from app.localities import locality_matcher
+from app.agent.property_index import FIELDS
+from app.responses import json_response, cache_headers, not_modified
 
 router = APIRouter(prefix="/api")
 
+# Columns per view: "card" for list tiles, "full" for the detail shape (to_dict() plus timestamps)
+VIEWS = {
+    "card": ("id", "title", "property_type", "bhk", "price", "location", "city", "area_sqft", "status",
+             "image_url"),
+    "full": FIELDS + ("created_at", "updated_at"),
+}
+_VIEW_COLUMNS = {view: [getattr(Property, name) for name in names] for view, names in VIEWS.items()}
+
 
 def verify_admin(authorization: str = Header(...)):
     if authorization != f"Bearer {settings.ADMIN_TOKEN}":
@@ -14,32 +29,87 @@ def verify_admin(authorization: str = Header(...)):
 
 
 @router.get("/properties")
-def list_properties(city: str | None = None, property_type: str | None = None,
-                    status: str | None = None, db: Session = Depends(get_db)):
-    query = db.query(Property)
-    if city:
-        query = query.filter(Property.city.ilike(f"%{city}%"))
+def list_properties(request: Request, city: str | None = None, location: str | None = None,
+                    property_type: str | None = None, status: str | None = None,
+                    view: Literal["card", "full"] = "full",
+                    limit: int = Query(settings.PROPERTY_PAGE_SIZE, ge=1, le=settings.PROPERTY_PAGE_MAX),
+                    cursor: int | None = None, db: Session = Depends(get_db)):
+    """
+    One page of properties, newest first.
+
+    Pages are keyed on id: when more rows follow, the X-Next-Cursor header
+    holds the value to pass as `cursor` for the next page. The ETag is the
+    catalogue version, so an unchanged catalogue answers 304 without running
+    the query.
+    """
+    version, changed_at = catalogue.current_version(db)
+    headers = cache_headers(f'W/"{version}"', changed_at)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    query = select(*_VIEW_COLUMNS[view])
+    cities, locations = locality_matcher.resolve(db, city, location)
+    if cities is not None:
+        query = query.where(Property.city.in_(cities))
+    if locations is not None:
+        query = query.where(Property.location.in_(locations))
     if property_type:
-        query = query.filter(Property.property_type == property_type)
+        query = query.where(Property.property_type == property_type)
     if status:
-        query = query.filter(Property.status == status)
-    return query.order_by(Property.created_at.desc()).all()
+        query = query.where(Property.status == status)
+    if cursor is not None:
+        query = query.where(Property.id < cursor)
+    rows = db.execute(query.order_by(Property.id.desc()).limit(limit + 1)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(rows[-1].id)
+    names = VIEWS[view]
+    return json_response(request, [dict(zip(names, row)) for row in rows], headers)
+
+
+@router.get("/properties/summary")
+def properties_summary(request: Request, db: Session = Depends(get_db)):
+    """Listing counts in one aggregate query, so dashboards don't page through the catalogue to count it."""
+    version, changed_at = catalogue.current_version(db)
+    headers = cache_headers(f'W/"{version}"', changed_at)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    row = db.execute(select(
+        func.count(Property.id).label("properties"),
+        func.count(Property.id).filter(Property.status == "available").label("available"),
+    )).one()
+    return json_response(request, {"properties": row.properties, "available": row.available}, headers)
 
 
 @router.get("/properties/{property_id}")
-def get_property(property_id: int, db: Session = Depends(get_db)):
-    prop = db.query(Property).filter(Property.id == property_id).first()
-    if not prop:
+def get_property(property_id: int, request: Request, db: Session = Depends(get_db)):
+    found = db.execute(select(Property.updated_at).where(Property.id == property_id)).first()
+    if not found:
         raise HTTPException(status_code=404, detail="Property not found")
-    return prop
+    # updated_at has one-second resolution on some databases, so the ETag is the catalogue version
+    version, _ = catalogue.current_version(db)
+    headers = cache_headers(f'W/"{version}"', found.updated_at)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    row = db.execute(select(*_VIEW_COLUMNS["full"]).where(Property.id == property_id)).first()
+    return json_response(request, dict(zip(VIEWS["full"], row)), headers)
 
 
 @router.post("/properties", dependencies=[Depends(verify_admin)])
 def create_property(data: PropertyCreate, db: Session = Depends(get_db)):
-    prop = Property(**data.model_dump())
+    prop = Property(**data.model_dump(exclude={"amenities"}))
+    set_amenities(prop, data.amenities)
     db.add(prop)
+    catalogue.bump_version(db)
     db.commit()
     db.refresh(prop)
+    catalogue.notify_changed([prop.id])
     return prop
 
 
@@ -49,9 +119,14 @@ def update_property(property_id: int, data: PropertyUpdate, db: Session = Depend
     if not prop:
         raise HTTPException(status_code=404, detail="Property not found")
     for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(prop, field, value)
+        if field == "amenities":
+            set_amenities(prop, value)
+        else:
+            setattr(prop, field, value)
+    catalogue.bump_version(db)
     db.commit()
     db.refresh(prop)
+    catalogue.notify_changed([prop.id])
     return prop
 
 
@@ -61,5 +136,7 @@ def delete_property(property_id: int, db: Session = Depends(get_db)):
     if not prop:
         raise HTTPException(status_code=404, detail="Property not found")
     db.delete(prop)
+    catalogue.bump_version(db)
     db.commit()
+    catalogue.notify_changed([property_id])
     return {"message": "Deleted"}
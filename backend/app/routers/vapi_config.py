@@ -26,7 +26,9 @@ def get_assistant_config(server_url: str) -> dict:
                         "Help users find properties by understanding their requirements: budget, location, BHK, property type. "
                         "Ask 1-2 questions at a time. Be conversational and natural. "
                         "Use the search_properties tool to find matching properties. "
+                        "Use search_by_description for wishes like 'sea-facing' or 'near the metro'. "
                         "Use save_requirements to store their preferences. "
+                        "Before offering visit times, use get_available_slots and suggest two or three free slots. "
                         "Use book_visit to schedule property visits (ask for date and time). "
                         "Use save_contact to save their name and phone. "
                         "Always mention property names, prices, and locations clearly since this is a voice call. "
@@ -56,6 +58,24 @@ def get_assistant_config(server_url: str) -> dict:
                         },
                     },
                 },
+                {
+                    "type": "function",
+                    "function": {
+                        "name": "search_by_description",
+                        "description": "Find properties whose description matches free-text wishes like "
+                                       "'sea-facing' or 'near the metro station'",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "query": {"type": "string", "description": "The caller's wishes in their words"},
+                                "city": {"type": "string", "description": "City to search in"},
+                                "location": {"type": "string", "description": "Specific area or locality"},
+                                "budget_max": {"type": "number", "description": "Maximum budget in INR"},
+                            },
+                            "required": ["query"],
+                        },
+                    },
+                },
                 {
                     "type": "function",
                     "function": {
@@ -75,6 +95,22 @@ def get_assistant_config(server_url: str) -> dict:
                         },
                     },
                 },
+                {
+                    "type": "function",
+                    "function": {
+                        "name": "get_available_slots",
+                        "description": "Free visiting slots for a property over the next days",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "property_id": {"type": "integer", "description": "Property ID to visit"},
+                                "date": {"type": "string", "description": "First day in YYYY-MM-DD (default today)"},
+                                "days": {"type": "integer", "description": "Days to check (default 7)"},
+                            },
+                            "required": ["property_id"],
+                        },
+                    },
+                },
                 {
                     "type": "function",
                     "function": {
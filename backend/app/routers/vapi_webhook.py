@@ -6,16 +6,15 @@ Vapi calls this endpoint when the voice assistant needs to execute tools
 """
 
 import json
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.agent.tools import TOOL_REGISTRY
+from fastapi import APIRouter, Request
+from app.agent.runner import run_blocking, run_tool, run_tool_calls
+from app.metrics import VAPI_TOOL_CALL_SECONDS
 
 router = APIRouter(prefix="/api/vapi")
 
 
 @router.post("/webhook")
-async def vapi_webhook(request: Request, db: Session = Depends(get_db)):
+async def vapi_webhook(request: Request):
     """Handle Vapi server messages (function calls, status updates)."""
     body = await request.json()
 
@@ -31,9 +30,8 @@ async def vapi_webhook(request: Request, db: Session = Depends(get_db)):
         call_id = message.get("call", {}).get("id", "voice-default")
         session_id = f"voice-{call_id}"
 
-        results = []
+        calls = []
         for tool_call in tool_call_list:
-            tc_id = tool_call.get("id", "")
             function_info = tool_call.get("function", {})
             function_name = function_info.get("name", "")
             # arguments can be a JSON string or dict
@@ -45,19 +43,20 @@ async def vapi_webhook(request: Request, db: Session = Depends(get_db)):
                     arguments = {}
 
             print(f"[VAPI] Tool call: {function_name}({arguments})")
+            calls.append((function_name, arguments))
 
-            executor = TOOL_REGISTRY.get(function_name)
-            if executor:
-                try:
-                    result = executor(db=db, session_id=session_id, **arguments)
-                    print(f"[VAPI] Tool result: {json.dumps(result, default=str)[:500]}")
-                    results.append({"toolCallId": tc_id, "result": json.dumps(result, default=str)})
-                except Exception as e:
-                    print(f"[VAPI ERROR] Tool execution failed: {e}")
-                    results.append({"toolCallId": tc_id, "result": json.dumps({"error": str(e)})})
-            else:
-                print(f"[VAPI ERROR] Unknown function: {function_name}")
-                results.append({"toolCallId": tc_id, "result": json.dumps({"error": f"Unknown function: {function_name}"})})
+        async def timed_tool(name: str, args: dict) -> dict:
+            with VAPI_TOOL_CALL_SECONDS.time(name):
+                return await run_blocking(run_tool, name, args, session_id)
+
+        # Independent tool calls run concurrently, each with its own DB session
+        tool_results = await run_tool_calls(calls, session_id, run=timed_tool)
+
+        results = []
+        for tool_call, result in zip(tool_call_list, tool_results):
+            tc_id = tool_call.get("id", "")
+            print(f"[VAPI] Tool result: {json.dumps(result, default=str)[:500]}")
+            results.append({"toolCallId": tc_id, "result": json.dumps(result, default=str)})
 
         return {"results": results}
 
@@ -2,27 +2,31 @@
 Follow-up scheduler using APScheduler.
 
 Runs periodic tasks:
-1. Booking reminders — notify users 1 day before their visit
+1. Booking reminders — notify users within a day of their visit
 2. Inactive lead follow-ups — nudge leads who haven't interacted in 24h
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from apscheduler.schedulers.background import BackgroundScheduler
+from app.config import settings
 from app.database import SessionLocal
 from app.models import Booking, Lead, Property
 from app.notifications import send_booking_email, send_booking_whatsapp
+from app.metrics import SCHEDULER_JOB_SECONDS
+from app.agent.session_backends import session_backend
 
 scheduler = BackgroundScheduler()
 
 
 def send_booking_reminders():
-    """Send reminders for visits happening tomorrow."""
+    """Send reminders for visits in the next REMINDER_LEAD_HOURS."""
     db = SessionLocal()
     try:
-        tomorrow = (datetime.utcnow() + timedelta(days=1)).strftime("%Y-%m-%d")
+        now = datetime.now(timezone.utc)
         bookings = (
             db.query(Booking)
-            .filter(Booking.visit_date == tomorrow)
+            .filter(Booking.visit_at >= now)
+            .filter(Booking.visit_at < now + timedelta(hours=settings.REMINDER_LEAD_HOURS))
             .filter(Booking.status == "pending")
             .filter(Booking.reminder_sent == False)  # noqa: E712
             .all()
@@ -82,12 +86,32 @@ def follow_up_inactive_leads():
         db.close()
 
 
+def purge_expired_sessions():
+    """Delete stored conversation sessions past SESSION_TTL_SECONDS (table-backed sessions only)."""
+    try:
+        deleted = session_backend.purge_expired()
+        if deleted:
+            print(f"[SCHEDULER] Purged {deleted} expired sessions")
+    except Exception as e:
+        print(f"[SCHEDULER ERROR] Session purge: {e}")
+
+
+def timed_job(job_id: str, func):
+    """Wrap a job so its duration is recorded in scheduler_job_seconds."""
+    def run():
+        with SCHEDULER_JOB_SECONDS.time(job_id):
+            func()
+    return run
+
+
 def start_scheduler():
     """Start the background scheduler."""
     # Run booking reminders every hour
-    scheduler.add_job(send_booking_reminders, "interval", hours=1, id="booking_reminders")
+    scheduler.add_job(timed_job("booking_reminders", send_booking_reminders), "interval", hours=1, id="booking_reminders")
     # Check inactive leads every 6 hours
-    scheduler.add_job(follow_up_inactive_leads, "interval", hours=6, id="inactive_leads")
+    scheduler.add_job(timed_job("inactive_leads", follow_up_inactive_leads), "interval", hours=6, id="inactive_leads")
+    # Drop stale sessions from the shared session table every 15 minutes
+    scheduler.add_job(timed_job("purge_sessions", purge_expired_sessions), "interval", minutes=15, id="purge_sessions")
     scheduler.start()
     print("[SCHEDULER] Started — booking reminders (1h), inactive leads (6h)")
 
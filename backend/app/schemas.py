@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from datetime import time
+from pydantic import BaseModel, Field
 
 
 class ChatRequest(BaseModel):
@@ -42,3 +43,11 @@ class PropertyUpdate(BaseModel):
 
 class BookingUpdate(BaseModel):
     status: str
+
+
+class VisitWindowIn(BaseModel):
+    weekday: int = Field(ge=0, le=6)  # 0 = Monday
+    opens: time
+    closes: time
+    slot_minutes: int = Field(60, ge=15, le=240)
+    capacity: int = Field(2, ge=1, le=50)
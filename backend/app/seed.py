@@ -1,6 +1,8 @@
 import json
 from app.database import SessionLocal, create_tables
 from app.models import Property
+from app import catalogue
+from app.amenities import set_amenities
 
 
 SAMPLE_PROPERTIES = [
@@ -37,10 +39,15 @@ def seed_database():
             return
 
         for data in SAMPLE_PROPERTIES:
+            data = dict(data)
+            amenities = data.pop("amenities", None)
             prop = Property(**data)
+            set_amenities(prop, amenities)
             db.add(prop)
 
+        catalogue.bump_version(db)
         db.commit()
+        catalogue.notify_changed()
         print(f"Seeded {len(SAMPLE_PROPERTIES)} properties successfully.")
     finally:
         db.close()
@@ -0,0 +1,93 @@
+"""
+Benchmark amenity filtering at growing catalogue sizes.
+
+For each size, seeds a throwaway SQLite database and times has-all and
+has-any amenity searches (city plus a budget cap) three ways:
+- "like": LIKE on the JSON text column, the only SQL option before
+  property_amenities existed
+- "sql": EXISTS against the indexed property_amenities table, as
+  search_properties_sql does
+- "index": the in-memory property index with amenity bitmasks
+
+Usage:
+    python -m benchmarks.amenities
+    python -m benchmarks.amenities --sizes 10000 100000 --queries 200
+"""
+
+import os
+import argparse
+import random
+import tempfile
+from sqlalchemy import create_engine, or_, and_
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import Property
+from app.agent.property_index import PropertyIndex
+from app.agent.tools import search_properties_sql
+from benchmarks.catalogue import AMENITIES, CITIES, seed_synthetic
+from benchmarks.property_index import percentiles, timed
+
+
+def random_search(rng: random.Random, match: str) -> dict:
+    return {
+        "city": rng.choice(list(CITIES)),
+        "budget_max": rng.choice([10_000_000, 30_000_000, 60_000_000]),
+        "amenities": rng.sample(AMENITIES, rng.randint(2, 3)),
+        "amenities_match": match,
+    }
+
+
+def search_like(db, args: dict) -> list:
+    clauses = [Property.amenities.like(f'%"{name}"%') for name in args["amenities"]]
+    query = (db.query(Property)
+             .filter(Property.status == "available", Property.city.ilike(f"%{args['city']}%"),
+                     Property.price <= args["budget_max"])
+             .filter(or_(*clauses) if args["amenities_match"] == "any" else and_(*clauses)))
+    return [p.to_dict() for p in query.order_by(Property.price, Property.id).limit(5)]
+
+
+def run(size: int, queries: int, seed: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "amenities.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed_synthetic(db, size, seed)
+    index = PropertyIndex(enabled=True, recheck_seconds=3600)
+    index.sync(db)
+
+    rng = random.Random(seed)
+    result = {}
+    for match in ("all", "any"):
+        searches = [random_search(rng, match) for _ in range(queries)]
+        result[match] = {
+            "like": percentiles(timed(lambda args: search_like(db, args), searches)),
+            "sql": percentiles(timed(lambda args: search_properties_sql(db, **args), searches)),
+            "index": percentiles(timed(lambda args: index.sync(db) and index.search(**args), searches)),
+            "mismatches": sum(
+                [p["id"] for p in index.search(**args)] != [p["id"] for p in search_properties_sql(db, **args)]
+                for args in searches
+            ),
+        }
+    db.close()
+    engine.dispose()
+    os.remove(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Amenity filter latency by catalogue size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=500, help="Searches per mode and size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'listings':>10}  {'match':>5}  {'like p50/p99 ms':>16}  {'sql p50/p99 ms':>16}  "
+          f"{'index p50/p99 ms':>16}  {'mismatch':>8}")
+    for size in args.sizes:
+        for match, r in run(size, args.queries, args.seed).items():
+            cells = ["{:.3f}/{:.3f}".format(*r[path]) for path in ("like", "sql", "index")]
+            print(f"{size:>10,}  {match:>5}  {cells[0]:>16}  {cells[1]:>16}  {cells[2]:>16}  {r['mismatches']:>8}")
+
+
+if __name__ == "__main__":
+    main()
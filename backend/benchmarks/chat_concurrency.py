@@ -0,0 +1,89 @@
+"""
+Concurrency benchmark for POST /api/chat against a local fake model.
+
+Runs the real FastAPI app in-process on a throwaway SQLite database with the
+Gemini client swapped for benchmarks.fake_gemini, then fires N concurrent
+sessions and reports p50/p99 turn latency.
+
+Usage:
+    python -m benchmarks.chat_concurrency
+    python -m benchmarks.chat_concurrency --levels 1 10 50 --turns 3 --latency 0.3
+"""
+
+import os
+import argparse
+import asyncio
+import tempfile
+import time
+
+_db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ["LANGFUSE_PUBLIC_KEY"] = ""
+# genai.Client refuses to start without a key; the fake client replaces it before any call
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.agent.engine import agent  # noqa: E402
+from app.seed import seed_database  # noqa: E402
+from benchmarks.fake_gemini import FakeGenaiClient  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_session(client: httpx.AsyncClient, session_id: str, turns: int, latencies: list[float]):
+    for turn in range(turns):
+        start = time.perf_counter()
+        resp = await client.post("/api/chat", json={
+            "session_id": session_id,
+            "message": f"Show me 2BHK flats in Mumbai (turn {turn})",
+        })
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_level(concurrency: int, turns: int) -> dict:
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            run_session(client, f"bench-{concurrency}-{i}", turns, latencies)
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "turns": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput": len(latencies) / elapsed,
+    }
+
+
+async def main_async(levels: list[int], turns: int, latency: float):
+    seed_database()
+    agent.client = FakeGenaiClient(latency=latency)
+
+    print(f"Fake model latency: {latency * 1000:.0f} ms per call, 2 calls per turn")
+    print(f"{'sessions':>8}  {'turns':>6}  {'p50 ms':>8}  {'p99 ms':>8}  {'turns/s':>8}")
+    for level in levels:
+        r = await run_level(level, turns)
+        print(f"{r['concurrency']:>8}  {r['turns']:>6}  {r['p50_ms']:>8.1f}  {r['p99_ms']:>8.1f}  {r['throughput']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/chat under concurrent sessions")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50], help="Concurrent session counts")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per session")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake model latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.levels, args.turns, args.latency))
+
+
+if __name__ == "__main__":
+    main()
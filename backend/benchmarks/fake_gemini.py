@@ -0,0 +1,121 @@
+"""
+Local stand-in for genai.Client used by the benchmarks and load tests.
+
+Mimics the slice of the SDK the agent touches (client.aio.models.generate_content
+and generate_content_stream) and returns real google.genai.types objects, so
+engine.py runs unmodified.
+
+Replies are driven by a script: a mapping from user message to the model
+steps for that turn, each either {"call": {"name": ..., "args": ...}},
+{"calls": [...]} for parallel calls, or {"text": ...}. The step is picked by
+counting the model responses already given for the current user message. Unscripted messages get a
+search_properties call followed by a text reply. Latency, jitter and failure
+rate are configurable.
+"""
+
+import asyncio
+import random
+from google.genai import types
+
+DEFAULT_STEPS = [
+    {"call": {"name": "search_properties", "args": {"city": "Mumbai", "bhk_min": 2}}},
+    {"text": "Here are a few homes that match what you described."},
+]
+
+
+class FakeModelError(Exception):
+    pass
+
+
+def _current_turn(contents: list) -> tuple[str, int]:
+    """Return the latest user text and how many model responses followed it."""
+    model_steps = 0
+    for content in reversed(contents):
+        parts = content.get("parts", [])
+        texts = [p["text"] for p in parts if "text" in p]
+        if content.get("role") == "user" and texts:
+            return texts[-1], model_steps
+        if content.get("role") == "model":
+            model_steps += 1
+    return "", model_steps
+
+
+def _to_parts(step: dict) -> list[types.Part]:
+    calls = step.get("calls") or ([step["call"]] if "call" in step else [])
+    if calls:
+        return [types.Part(function_call=types.FunctionCall(name=c["name"], args=c["args"])) for c in calls]
+    return [types.Part(text=step["text"])]
+
+
+def _response(parts: list[types.Part], prompt_chars: int = 0) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=parts))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_chars // 4,
+            candidates_token_count=sum(len(p.text or "") for p in parts) // 4,
+        ),
+    )
+
+
+class FakeModels:
+    def __init__(self, latency: float, jitter: float, failure_rate: float,
+                 script: dict[str, list[dict]] | None, rng: random.Random):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.script = script or {}
+        self.rng = rng
+        self.calls = 0
+        self.failures = 0
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _next_parts(self, contents: list) -> list[types.Part]:
+        self.calls += 1
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeModelError("503 UNAVAILABLE (injected)")
+        message, step = _current_turn(contents)
+        steps = self.script.get(message, DEFAULT_STEPS)
+        return _to_parts(steps[min(step, len(steps) - 1)])
+
+    async def generate_content(self, model: str, contents: list, config=None) -> types.GenerateContentResponse:
+        delay = self._delay()
+        await asyncio.sleep(delay)
+        return _response(self._next_parts(contents), len(str(contents)))
+
+    async def generate_content_stream(self, model: str, contents: list, config=None):
+        delay = self._delay()
+        parts = self._next_parts(contents)
+        prompt_chars = len(str(contents))
+
+        async def chunks():
+            # Time to first chunk is half the call; the rest is spread across words
+            await asyncio.sleep(delay / 2)
+            if parts[0].function_call:
+                yield _response(parts, prompt_chars)
+                return
+            words = parts[0].text.split(" ")
+            for i, word in enumerate(words):
+                yield _response([types.Part(text=word if i == 0 else " " + word)], prompt_chars)
+                await asyncio.sleep(delay / 2 / len(words))
+
+        return chunks()
+
+
+class FakeCaches:
+    async def create(self, model: str, config=None):
+        raise FakeModelError("context caching is not available on the fake backend")
+
+
+class FakeAio:
+    def __init__(self, models: FakeModels):
+        self.models = models
+        self.caches = FakeCaches()
+
+
+class FakeGenaiClient:
+    def __init__(self, latency: float = 0.3, jitter: float = 0.0, failure_rate: float = 0.0,
+                 script: dict[str, list[dict]] | None = None, seed: int = 0):
+        self.aio = FakeAio(FakeModels(latency, jitter, failure_rate, script, random.Random(seed)))
@@ -0,0 +1,271 @@
+"""
+Offline load-test harness for /api/chat and /api/vapi/webhook.
+
+Runs the real FastAPI app in-process against a throwaway SQLite database:
+- genai.Client is swapped for a scriptable fake (benchmarks.fake_gemini)
+- booking notifications are stubbed out
+- a synthetic catalogue is seeded
+
+Scripted multi-turn conversations then run at the configured concurrency.
+The report covers throughput, latency percentiles, error counts and SQL
+statements per turn. Optional thresholds make the process exit non-zero, so
+it can gate a deploy.
+
+Usage:
+    python -m benchmarks.loadtest --sessions 200 --concurrency 50
+    python -m benchmarks.loadtest --target vapi --properties 20000
+    python -m benchmarks.loadtest --failure-rate 0.05 --fail-p99-ms 2500 --fail-queries-per-turn 12
+    python -m benchmarks.loadtest --scenario-file my_scenarios.json --json report.json
+
+A scenario file is a JSON list of {"name", "turns": [{"user", "model": [steps]}]};
+see SCENARIOS below for the step format.
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import contextvars
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+_db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+for _key in ("LANGFUSE_PUBLIC_KEY", "SMTP_EMAIL", "SMTP_PASSWORD", "TWILIO_ACCOUNT_SID"):
+    os.environ[_key] = ""
+# genai.Client refuses to start without a key; the fake client replaces it before any call
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database import engine, SessionLocal, create_tables  # noqa: E402
+from app.agent.engine import agent  # noqa: E402
+from app.agent import tools  # noqa: E402
+from benchmarks.fake_gemini import FakeGenaiClient  # noqa: E402
+from benchmarks.catalogue import seed_synthetic  # noqa: E402
+
+VISIT_DATE = (date.today() + timedelta(days=3)).isoformat()
+
+SCENARIOS = [
+    {
+        "name": "browse",
+        "turns": [
+            {"user": "Hi, I'm looking for a flat in Mumbai", "model": [
+                {"text": "Happy to help! What's your budget and how many bedrooms do you need?"},
+            ]},
+            {"user": "2BHK under 1.5 crore in Andheri", "model": [
+                {"calls": [
+                    {"name": "save_requirements", "args": {"city": "Mumbai", "bhk_min": 2, "budget_max": 15000000}},
+                    {"name": "search_properties", "args": {"city": "Mumbai", "location": "Andheri",
+                                                           "bhk_min": 2, "budget_max": 15000000}},
+                ]},
+                {"text": "I found a few options in Andheri. Want details on any of them?"},
+            ]},
+            {"user": "show me property 3", "model": []},
+        ],
+    },
+    {
+        "name": "book",
+        "turns": [
+            {"user": "Any villas in Pune?", "model": [
+                {"call": {"name": "search_properties", "args": {"city": "Pune", "property_type": "villa"}}},
+                {"text": "Here are some villas in Pune."},
+            ]},
+            {"user": "I'm Asha, 9876543210. Book property 1", "model": [
+                {"call": {"name": "save_contact", "args": {"name": "Asha", "phone": "9876543210"}}},
+                {"call": {"name": "book_visit", "args": {"property_id": 1, "visit_date": VISIT_DATE,
+                                                         "visit_time": "11:00 AM"}}},
+                {"text": f"Your visit is booked for {VISIT_DATE} at 11:00 AM."},
+            ]},
+        ],
+    },
+]
+
+VAPI_CALLS = [
+    [{"name": "search_properties", "arguments": {"city": "Mumbai", "bhk_min": 2, "budget_max": 20000000}}],
+    [{"name": "save_contact", "arguments": {"name": "Ravi", "phone": "9000000000"}},
+     {"name": "get_property_details", "arguments": {"property_id": 2}}],
+    [{"name": "book_visit", "arguments": {"property_id": 2, "visit_date": VISIT_DATE, "visit_time": "4:00 PM"}}],
+]
+
+# Per-turn SQL statement counter, carried into worker threads by run_blocking's context copy
+_query_count: contextvars.ContextVar[list | None] = contextvars.ContextVar("query_count", default=None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Results:
+    def __init__(self, target: str):
+        self.target = target
+        self.latencies: list[float] = []
+        self.queries: list[int] = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def record(self, latency: float, queries: int, ok: bool):
+        self.latencies.append(latency)
+        self.queries.append(queries)
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        turns = len(self.latencies)
+        return {
+            "target": self.target,
+            "turns": turns,
+            "errors": self.errors,
+            "throughput": turns / self.elapsed if self.elapsed else 0.0,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p90_ms": percentile(self.latencies, 90) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "queries_per_turn": sum(self.queries) / turns if turns else 0.0,
+            "max_queries_per_turn": max(self.queries, default=0),
+        }
+
+
+async def timed(results: Results, send) -> None:
+    counter = [0]
+    token = _query_count.set(counter)
+    start = time.perf_counter()
+    try:
+        resp = await send()
+        ok = resp.status_code == 200
+    except Exception:
+        ok = False
+    finally:
+        _query_count.reset(token)
+    results.record(time.perf_counter() - start, counter[0], ok)
+
+
+async def run_chat_session(client: httpx.AsyncClient, session_id: str, scenario: dict, results: Results):
+    for turn in scenario["turns"]:
+        await timed(results, lambda: client.post("/api/chat", json={"session_id": session_id,
+                                                                     "message": turn["user"]}))
+
+
+async def run_vapi_session(client: httpx.AsyncClient, call_id: str, results: Results):
+    for batch in VAPI_CALLS:
+        payload = {"message": {
+            "type": "tool-calls",
+            "call": {"id": call_id},
+            "toolCallList": [
+                {"id": f"{call_id}-{i}", "function": {"name": c["name"], "arguments": json.dumps(c["arguments"])}}
+                for i, c in enumerate(batch)
+            ],
+        }}
+        await timed(results, lambda: client.post("/api/vapi/webhook", json=payload))
+
+
+async def run_target(target: str, sessions: int, concurrency: int, scenarios: list[dict], seed: int) -> Results:
+    results = Results(target)
+    rng = random.Random(seed)
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=300) as client:
+        async def one(i: int):
+            async with limit:
+                if target == "chat":
+                    await run_chat_session(client, f"load-{i}", rng.choice(scenarios), results)
+                else:
+                    await run_vapi_session(client, f"call-{i}", results)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(sessions)))
+        results.elapsed = time.perf_counter() - start
+    return results
+
+
+def print_report(summaries: list[dict], fake: FakeGenaiClient):
+    print(f"{'target':>6}  {'turns':>6}  {'errors':>6}  {'turns/s':>8}  {'p50 ms':>8}  {'p90 ms':>8}  "
+          f"{'p99 ms':>8}  {'q/turn':>7}  {'max q':>6}")
+    for s in summaries:
+        print(f"{s['target']:>6}  {s['turns']:>6}  {s['errors']:>6}  {s['throughput']:>8.1f}  {s['p50_ms']:>8.1f}  "
+              f"{s['p90_ms']:>8.1f}  {s['p99_ms']:>8.1f}  {s['queries_per_turn']:>7.1f}  "
+              f"{s['max_queries_per_turn']:>6}")
+    models = fake.aio.models
+    print(f"Fake model: {models.calls} calls, {models.failures} injected failures")
+
+
+async def main_async(args) -> int:
+    create_tables()
+    db = SessionLocal()
+    try:
+        seed_synthetic(db, args.properties, seed=args.seed)
+    finally:
+        db.close()
+
+    scenarios = SCENARIOS
+    if args.scenario_file:
+        with open(args.scenario_file) as f:
+            scenarios = json.load(f)
+    script = {turn["user"]: turn["model"] for s in scenarios for turn in s["turns"] if turn["model"]}
+
+    fake = FakeGenaiClient(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                           script=script, seed=args.seed)
+    agent.client = fake
+    # Keep SMTP/Twilio out of the measurement entirely
+    tools.dispatch_booking_notifications = lambda *a, **k: None
+
+    targets = ["chat", "vapi"] if args.target == "both" else [args.target]
+    summaries = []
+    for target in targets:
+        results = await run_target(target, args.sessions, args.concurrency, scenarios, args.seed)
+        summaries.append(results.summary())
+
+    print(f"Catalogue: {args.properties} properties | sessions: {args.sessions} | concurrency: {args.concurrency} "
+          f"| model latency: {args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms")
+    print_report(summaries, fake)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=2)
+
+    failed = False
+    for s in summaries:
+        if args.fail_p99_ms and s["p99_ms"] > args.fail_p99_ms:
+            print(f"[FAIL] {s['target']} p99 {s['p99_ms']:.1f} ms exceeds {args.fail_p99_ms} ms")
+            failed = True
+        if args.fail_queries_per_turn and s["queries_per_turn"] > args.fail_queries_per_turn:
+            print(f"[FAIL] {s['target']} {s['queries_per_turn']:.1f} queries/turn exceeds {args.fail_queries_per_turn}")
+            failed = True
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test with a fake Gemini backend")
+    parser.add_argument("--target", choices=["chat", "vapi", "both"], default="both")
+    parser.add_argument("--sessions", type=int, default=100, help="Conversations (or voice calls) to run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Conversations in flight at once")
+    parser.add_argument("--properties", type=int, default=5000, help="Synthetic catalogue size")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Uniform +/- jitter on model latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of model calls that fail")
+    parser.add_argument("--scenario-file", help="JSON file with scripted conversations")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write the summary to this file")
+    parser.add_argument("--fail-p99-ms", type=float, help="Exit 1 if any target's p99 exceeds this")
+    parser.add_argument("--fail-queries-per-turn", type=float, help="Exit 1 if mean SQL statements per turn exceed this")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark the in-memory property index against the search_properties SQL query.
+
+For each catalogue size, seeds a throwaway SQLite database and builds the
+index. It then runs the same randomized search_properties and
+get_property_details calls through both paths and reports build time and
+p50/p99 latency. It also checks that both paths return the same
+properties.
+
+Usage:
+    python -m benchmarks.property_index
+    python -m benchmarks.property_index --sizes 1000 100000 --queries 500
+"""
+
+import os
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import Property
+from app.agent.property_index import PropertyIndex
+from app.agent.tools import search_properties_sql
+from benchmarks.catalogue import CITIES, seed_synthetic
+
+TYPES = ["apartment", "villa", "plot", "independent_house"]
+
+
+def random_search(rng: random.Random) -> dict:
+    city = rng.choice(list(CITIES))
+    args = {"city": city}
+    if rng.random() < 0.5:
+        args["location"] = rng.choice(CITIES[city]).split()[0]
+    if rng.random() < 0.5:
+        args["property_type"] = rng.choice(TYPES)
+    if rng.random() < 0.6:
+        args["bhk_min"] = rng.randint(1, 3)
+        args["bhk_max"] = args["bhk_min"] + rng.randint(0, 2)
+    if rng.random() < 0.8:
+        args["budget_max"] = rng.choice([5_000_000, 10_000_000, 15_000_000, 30_000_000, 60_000_000])
+        if rng.random() < 0.3:
+            args["budget_min"] = args["budget_max"] / 3
+    return args
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99) - 1] * 1000
+
+
+def timed(fn, calls: list) -> list[float]:
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(size: int, queries: int, seed: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "index.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed_synthetic(db, size, seed)
+
+    index = PropertyIndex(enabled=True, recheck_seconds=3600)
+    start = time.perf_counter()
+    index.sync(db)
+    build = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    searches = [random_search(rng) for _ in range(queries)]
+    ids = [rng.randint(1, size) for _ in range(queries)]
+
+    mismatches = sum(
+        [p["id"] for p in index.search(**args)] != [p["id"] for p in search_properties_sql(db, **args)]
+        for args in searches
+    )
+    result = {
+        "build": build,
+        "sql_search": percentiles(timed(lambda args: search_properties_sql(db, **args), searches)),
+        "index_search": percentiles(timed(lambda args: index.sync(db) and index.search(**args), searches)),
+        "sql_details": percentiles(timed(
+            lambda pid: db.query(Property).filter(Property.id == pid).first().to_dict(), ids)),
+        "index_details": percentiles(timed(lambda pid: index.sync(db) and index.get(pid), ids)),
+        "mismatches": mismatches,
+    }
+    db.close()
+    engine.dispose()
+    os.remove(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory property index vs SQL")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1000, help="Lookups per path and size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'listings':>10}  {'build s':>8}  {'search p50/p99 ms (sql | index)':>34}  "
+          f"{'details p50/p99 ms (sql | index)':>34}  {'mismatch':>8}")
+    for size in args.sizes:
+        r = run(size, args.queries, args.seed)
+        search = "{:.3f}/{:.3f} | {:.3f}/{:.3f}".format(*r["sql_search"], *r["index_search"])
+        details = "{:.3f}/{:.3f} | {:.3f}/{:.3f}".format(*r["sql_details"], *r["index_details"])
+        print(f"{size:>10,}  {r['build']:>8.2f}  {search:>34}  {details:>34}  {r['mismatches']:>8}")
+
+
+if __name__ == "__main__":
+    main()
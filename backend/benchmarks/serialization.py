@@ -0,0 +1,99 @@
+"""
+Benchmark the cost of serving property listings, per 1,000 rows.
+
+Seeds a throwaway SQLite database and compares the old GET /api/properties
+path with the projected one:
+- "orm": load Property objects, then jsonable_encoder + json.dumps, which is
+  what FastAPI does when a route returns ORM objects
+- "full" / "card": select only the view's columns and serialize the dicts
+  with app.responses.dumps (orjson when installed)
+
+For each path, fetch and encode are timed separately. It also reports the
+body size, raw and gzipped (the encode timing excludes gzip).
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --listings 20000 --page 1000 --repeat 50
+"""
+
+import os
+import argparse
+import gzip
+import json
+import tempfile
+import time
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import Property
+from app.responses import dumps, orjson
+from app.routers.properties import VIEWS, _VIEW_COLUMNS
+from benchmarks.catalogue import seed_synthetic
+from benchmarks.property_index import percentiles
+
+
+def fetch_orm(db, limit: int):
+    db.expunge_all()  # load fresh objects each time, as a new request would
+    return db.query(Property).order_by(Property.id.desc()).limit(limit).all()
+
+
+def encode_orm(rows) -> bytes:
+    return json.dumps(jsonable_encoder(rows)).encode()
+
+
+def fetch_view(db, view: str, limit: int):
+    return db.execute(select(*_VIEW_COLUMNS[view]).order_by(Property.id.desc()).limit(limit)).all()
+
+
+def encode_view(view: str, rows) -> bytes:
+    names = VIEWS[view]
+    return dumps([dict(zip(names, row)) for row in rows])
+
+
+def measure(fetch, encode, repeat: int) -> tuple:
+    fetch_samples, encode_samples = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fetch()
+        fetch_samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        body = encode(rows)
+        encode_samples.append(time.perf_counter() - start)
+    return percentiles(fetch_samples), percentiles(encode_samples), len(body), len(gzip.compress(body, 5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Property listing fetch + serialization cost")
+    parser.add_argument("--listings", type=int, default=20_000)
+    parser.add_argument("--page", type=int, default=1000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "serialization.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed_synthetic(db, args.listings, args.seed)
+
+    paths = {
+        "orm": (lambda: fetch_orm(db, args.page), encode_orm),
+        "full": (lambda: fetch_view(db, "full", args.page), lambda rows: encode_view("full", rows)),
+        "card": (lambda: fetch_view(db, "card", args.page), lambda rows: encode_view("card", rows)),
+    }
+    per = 1000 / args.page
+    print(f"{args.page:,} rows per response, serializer: {'orjson' if orjson else 'json'}; times per 1k rows")
+    print(f"{'path':>5}  {'fetch p50/p99 ms':>17}  {'encode p50/p99 ms':>18}  {'bytes':>10}  {'gzip bytes':>10}")
+    for name, (fetch, encode) in paths.items():
+        fetched, encoded, size, zipped = measure(fetch, encode, args.repeat)
+        print(f"{name:>5}  {fetched[0] * per:8.2f}/{fetched[1] * per:<8.2f}  {encoded[0] * per:9.2f}/{encoded[1] * per:<8.2f}"
+              f"  {int(size * per):>10,}  {int(zipped * per):>10,}")
+
+    db.close()
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Memory benchmark for conversation sessions.
+
+Builds sessions of 10, 50 and 200 turns and reports bytes per session
+(tracemalloc) for three representations:
+- "dicts": the previous representation, nested dicts with every search
+  result stored in history and again in last_search_results
+- "compact": ConversationSession with slotted parts and properties stored
+  once by id
+- "compact+bound": the same, with HistoryManager folding old turns the way
+  the engine does before every model call
+
+Usage:
+    python -m benchmarks.session_memory
+    python -m benchmarks.session_memory --turns 10 50 200 --sessions 20
+"""
+
+import argparse
+import json
+import random
+import tracemalloc
+from app.agent.session import ConversationSession
+from app.agent.history import history_manager
+from benchmarks.catalogue import generate_properties
+
+CATALOGUE = [dict(p, id=i + 1) for i, p in enumerate(generate_properties(40, seed=7))]
+
+
+class DictSession:
+    """The dict-of-dicts session as it was before the compact representation."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.history: list[dict] = []
+        self.last_search_results: list[dict] = []
+
+    def add_user_message(self, text: str):
+        self.history.append({"role": "user", "parts": [{"text": text}]})
+
+    def add_model_response(self, parts: list):
+        self.history.append({"role": "model", "parts": parts})
+
+    def add_function_response(self, name: str, response: dict):
+        self.history.append({
+            "role": "user",
+            "parts": [{"function_response": {"name": name, "response": response}}],
+        })
+
+
+def to_dict(prop: dict) -> dict:
+    # Property.to_dict() builds fresh dicts on every query
+    return json.loads(json.dumps(prop))
+
+
+def play(session, turns: int, rng: random.Random, bound: bool = False):
+    for t in range(turns):
+        session.add_user_message(f"Turn {t}: anything with {rng.randint(1, 4)} BHK near the station under "
+                                 f"{rng.randint(50, 200)} lakh? Prefer a higher floor with good light.")
+        if bound:
+            history_manager.build_contents(session)
+
+        session.add_model_response([{"function_call": {"name": "search_properties",
+                                                       "args": {"city": "Mumbai", "bhk_min": 2}}}])
+        results = [to_dict(p) for p in rng.sample(CATALOGUE, 5)]
+        session.last_search_results = results
+        session.add_function_response("search_properties", {"properties": results, "count": len(results)})
+
+        if t % 3 == 2:
+            prop = to_dict(rng.choice(results))
+            session.add_model_response([{"function_call": {"name": "get_property_details",
+                                                           "args": {"property_id": prop["id"]}}}])
+            session.add_function_response("get_property_details", {"property": prop})
+
+        session.add_model_response([{"text": "I found a few options that match. " * 8}])
+
+
+def bytes_per_session(factory, turns: int, sessions: int, bound: bool = False) -> int:
+    rng = random.Random(turns)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = []
+    for i in range(sessions):
+        session = factory(f"s{i}")
+        play(session, turns, rng, bound)
+        kept.append(session)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return total // sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per conversation session")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions built per measurement")
+    args = parser.parse_args()
+
+    print(f"{'turns':>6}  {'dicts':>12}  {'compact':>12}  {'compact+bound':>14}  {'saving':>7}")
+    for turns in args.turns:
+        legacy = bytes_per_session(DictSession, turns, args.sessions)
+        compact = bytes_per_session(ConversationSession, turns, args.sessions)
+        bounded = bytes_per_session(ConversationSession, turns, args.sessions, bound=True)
+        print(f"{turns:>6}  {legacy:>12,}  {compact:>12,}  {bounded:>14,}  {1 - compact / legacy:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark the BM25 description index behind search_by_description.
+
+Builds a TextIndex over synthetic listings (benchmarks.catalogue) and
+reports build time, term count and query latency percentiles for typical
+free-text wishes. Queries run over the whole catalogue and again restricted
+to one city, the way structured filters narrow them. It also times
+incremental updates (remove + add of one listing).
+
+Usage:
+    python -m benchmarks.text_search
+    python -m benchmarks.text_search --listings 100000 --queries 500
+"""
+
+import argparse
+import random
+import time
+from app.agent.text_search import TextIndex
+from benchmarks.catalogue import generate_properties
+from benchmarks.property_index import percentiles
+
+QUERIES = [
+    "sea-facing flat near the metro station",
+    "quiet lane with a private terrace",
+    "corner unit with park view close to schools",
+    "newly renovated villa in a gated community",
+    "high floor apartment walking distance to the railway station",
+    "vastu compliant house with modular kitchen",
+    "peaceful flat with balcony",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 description search build and query latency")
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = [dict(p, id=i + 1) for i, p in enumerate(generate_properties(args.listings, args.seed))]
+    index = TextIndex()
+    start = time.perf_counter()
+    for row in rows:
+        index.add(row["id"], row["title"], row["description"])
+    build = time.perf_counter() - start
+    print(f"Indexed {len(index):,} listings in {build:.2f}s ({len(index._postings):,} terms)")
+
+    rng = random.Random(args.seed)
+    mumbai = {row["id"] for row in rows if row["city"] == "Mumbai"}
+    for label, allowed in (("all listings", None), (f"one city ({len(mumbai):,})", mumbai)):
+        samples = []
+        for _ in range(args.queries):
+            query = rng.choice(QUERIES)
+            start = time.perf_counter()
+            index.search(query, 5, allowed)
+            samples.append(time.perf_counter() - start)
+        p50, p99 = percentiles(samples)
+        print(f"query over {label:<22} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+    samples = []
+    for row in rng.sample(rows, min(200, len(rows))):
+        start = time.perf_counter()
+        index.remove(row["id"], row["title"], row["description"])
+        index.add(row["id"], row["title"], row["description"])
+        samples.append(time.perf_counter() - start)
+    p50, p99 = percentiles(samples)
+    print(f"incremental update             p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Baseline: the tables create_tables() used to make
+
+A database created before migrations existed already has these; mark it
+with `alembic stamp 0001` and then run `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("phone", sa.String(20), nullable=False, unique=True),
+        sa.Column("name", sa.String(255)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("otp_code", sa.String(6)),
+        sa.Column("otp_expires_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "properties",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("property_type", sa.String(50), nullable=False),
+        sa.Column("bhk", sa.Integer()),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("location", sa.String(255), nullable=False),
+        sa.Column("city", sa.String(100), nullable=False),
+        sa.Column("area_sqft", sa.Float()),
+        sa.Column("amenities", sa.Text()),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("image_url", sa.String(500)),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "leads",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("session_id", sa.String(100), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("name", sa.String(255)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("last_activity_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "requirements",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("lead_id", sa.Integer(), sa.ForeignKey("leads.id"), nullable=False),
+        sa.Column("budget_min", sa.Float()),
+        sa.Column("budget_max", sa.Float()),
+        sa.Column("location_pref", sa.String(255)),
+        sa.Column("city", sa.String(100)),
+        sa.Column("property_type", sa.String(50)),
+        sa.Column("bhk_min", sa.Integer()),
+        sa.Column("bhk_max", sa.Integer()),
+        sa.Column("amenities", sa.Text()),
+        sa.Column("additional_notes", sa.Text()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("lead_id", sa.Integer(), sa.ForeignKey("leads.id"), nullable=False),
+        sa.Column("property_id", sa.Integer(), sa.ForeignKey("properties.id"), nullable=False),
+        sa.Column("visit_date", sa.String(20), nullable=False),
+        sa.Column("visit_time", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("notes", sa.Text()),
+        sa.Column("reminder_sent", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    for table in ("bookings", "requirements", "leads", "properties", "users"):
+        op.drop_table(table)
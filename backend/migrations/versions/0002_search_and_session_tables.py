@@ -0,0 +1,57 @@
+"""Amenity rows, location aliases and stored agent sessions
+
+These tables were first created by create_tables(), so each is only
+created when missing (offline --sql output creates them all).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(op.get_bind())
+    tables = set() if offline else set(inspector.get_table_names())
+
+    if "property_amenities" not in tables:
+        op.create_table(
+            "property_amenities",
+            sa.Column("amenity", sa.String(50), primary_key=True),
+            sa.Column("property_id", sa.Integer(), sa.ForeignKey("properties.id", ondelete="CASCADE"),
+                      primary_key=True),
+        )
+        op.create_index("ix_property_amenities_property_id", "property_amenities", ["property_id"])
+    if "location_aliases" not in tables:
+        op.create_table(
+            "location_aliases",
+            sa.Column("alias", sa.String(255), primary_key=True),
+            sa.Column("city", sa.String(100), nullable=False),
+            sa.Column("location", sa.String(255)),
+        )
+    if "agent_sessions" not in tables:
+        op.create_table(
+            "agent_sessions",
+            sa.Column("session_id", sa.String(100), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+        op.create_index("ix_agent_sessions_updated_at", "agent_sessions", ["updated_at"])
+    if offline or "ix_properties_city_location" not in {ix["name"] for ix in inspector.get_indexes("properties")}:
+        op.create_index("ix_properties_city_location", "properties", ["city", "location"])
+
+
+def downgrade():
+    op.drop_index("ix_properties_city_location", table_name="properties")
+    op.drop_table("agent_sessions")
+    op.drop_table("location_aliases")
+    op.drop_table("property_amenities")
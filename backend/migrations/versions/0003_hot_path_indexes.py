@@ -0,0 +1,55 @@
+"""Indexes for the hot query paths
+
+Each index matches one in app/models.py; `python -m app.query_plans` checks
+that the queries use them. On PostgreSQL they are built CONCURRENTLY so
+writes to the tables aren't blocked. Indexes create_tables() already made
+are skipped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Partial index predicates, built like the queries' filters so each dialect renders them the same way
+AVAILABLE = sa.column("status", sa.String) == "available"
+CONTACTABLE = sa.column("name", sa.String).isnot(None) & sa.column("phone", sa.String).isnot(None)
+REMINDER_DUE = (sa.column("status", sa.String) == "pending") & (sa.column("reminder_sent", sa.Boolean) == False)  # noqa: E712
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ("ix_properties_available_city_type_price", "properties", ["city", "property_type", "price"], AVAILABLE),
+    ("ix_properties_created_at", "properties", ["created_at"], None),
+    ("ix_properties_updated_at", "properties", ["updated_at"], None),
+    ("ix_leads_created_at", "leads", ["created_at"], None),
+    ("ix_leads_user_id", "leads", ["user_id"], None),
+    ("ix_leads_contactable_last_activity", "leads", ["last_activity_at"], CONTACTABLE),
+    ("ix_requirements_lead_id", "requirements", ["lead_id"], None),
+    ("ix_bookings_lead_created", "bookings", ["lead_id", "created_at"], None),
+    ("ix_bookings_property_id", "bookings", ["property_id"], None),
+    ("ix_bookings_status_created", "bookings", ["status", "created_at"], None),
+    ("ix_bookings_reminder_due", "bookings", ["visit_date"], REMINDER_DUE),
+]
+
+
+def upgrade():
+    inspector = None if op.get_context().as_sql else sa.inspect(op.get_bind())
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            if inspector and name in {ix["name"] for ix in inspector.get_indexes(table)}:
+                continue
+            op.create_index(name, table, columns, postgresql_concurrently=True,
+                            postgresql_where=where, sqlite_where=where)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,25 @@
+"""Leads listing index covers the (created_at, id) keyset
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_leads_created_at", table_name="leads", postgresql_concurrently=True)
+        op.create_index("ix_leads_created_at", "leads", ["created_at", "id"], postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_leads_created_at", table_name="leads", postgresql_concurrently=True)
+        op.create_index("ix_leads_created_at", "leads", ["created_at"], postgresql_concurrently=True)
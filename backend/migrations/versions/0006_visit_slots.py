@@ -0,0 +1,85 @@
+"""Visiting windows and slot occupancy for bookings
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+import re
+from collections import Counter
+from datetime import date, datetime, time
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Bookings in these states hold their slot
+ACTIVE_STATUSES = ("pending", "confirmed")
+
+# Frozen copy of app.availability's parsing as of this revision, so later
+# changes there can't change what this migration does
+_TIME = re.compile(r"^\s*(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?\s*m?\.?)?\s*$", re.IGNORECASE)
+
+
+def parse_visit(visit_date: str, visit_time: str) -> datetime | None:
+    """Local slot start for visit_date (YYYY-MM-DD) and visit_time ("10:00 AM", "14:30"); None if unparsable."""
+    match = _TIME.match(visit_time or "")
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    try:
+        day = date.fromisoformat((visit_date or "").strip())
+    except ValueError:
+        return None
+    return datetime.combine(day, time(hour, minute))
+
+
+def upgrade():
+    op.create_table(
+        "visit_windows",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("property_id", sa.Integer(), sa.ForeignKey("properties.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("weekday", sa.Integer(), nullable=False),
+        sa.Column("opens", sa.Time(), nullable=False),
+        sa.Column("closes", sa.Time(), nullable=False),
+        sa.Column("slot_minutes", sa.Integer(), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_visit_windows_property_id", "visit_windows", ["property_id"])
+    slots = op.create_table(
+        "visit_slots",
+        sa.Column("property_id", sa.Integer(), sa.ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("slot_start", sa.DateTime(), primary_key=True),
+        sa.Column("booked", sa.Integer(), nullable=False),
+    )
+
+    # Existing active bookings hold their slots; times that don't parse are left out
+    if op.get_context().as_sql:
+        return
+    bookings = sa.table("bookings", sa.column("property_id", sa.Integer), sa.column("visit_date", sa.String),
+                        sa.column("visit_time", sa.String), sa.column("status", sa.String))
+    rows = op.get_bind().execute(sa.select(bookings.c.property_id, bookings.c.visit_date, bookings.c.visit_time)
+                                 .where(bookings.c.status.in_(ACTIVE_STATUSES)))
+    held = Counter()
+    for property_id, visit_date, visit_time in rows:
+        start = parse_visit(visit_date, visit_time)
+        if start is not None:
+            held[property_id, start] += 1
+    if held:
+        op.bulk_insert(slots, [{"property_id": property_id, "slot_start": start, "booked": count}
+                               for (property_id, start), count in held.items()])
+
+
+def downgrade():
+    op.drop_table("visit_slots")
+    op.drop_index("ix_visit_windows_property_id", table_name="visit_windows")
+    op.drop_table("visit_windows")
@@ -0,0 +1,85 @@
+"""Typed visit time on bookings
+
+Adds bookings.visit_at (UTC), filled from the visit_date / visit_time
+strings as local VISIT_TIMEZONE times. Rows whose strings don't parse keep
+a null visit_at. The reminder index moves from visit_date to visit_at.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+import re
+from datetime import date, datetime, time, timezone
+from zoneinfo import ZoneInfo
+from alembic import op
+import sqlalchemy as sa
+from app.config import settings
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+REMINDER_DUE = (sa.column("status", sa.String) == "pending") & (sa.column("reminder_sent", sa.Boolean) == False)  # noqa: E712
+
+# The visit parsing 0006 froze, copied rather than imported from app.availability
+_TIME = re.compile(r"^\s*(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?\s*m?\.?)?\s*$", re.IGNORECASE)
+
+
+def parse_visit(visit_date: str, visit_time: str) -> datetime | None:
+    """Local slot start for visit_date (YYYY-MM-DD) and visit_time ("10:00 AM", "14:30"); None if unparsable."""
+    match = _TIME.match(visit_time or "")
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    try:
+        day = date.fromisoformat((visit_date or "").strip())
+    except ValueError:
+        return None
+    return datetime.combine(day, time(hour, minute))
+
+
+def to_utc(local: datetime) -> datetime:
+    # VISIT_TIMEZONE is deployment config, read from settings like env.py's DATABASE_URL
+    return local.replace(tzinfo=ZoneInfo(settings.VISIT_TIMEZONE)).astimezone(timezone.utc)
+
+
+def upgrade():
+    op.add_column("bookings", sa.Column("visit_at", sa.DateTime(timezone=True)))
+
+    if not op.get_context().as_sql:
+        bookings = sa.table("bookings", sa.column("id", sa.Integer), sa.column("visit_date", sa.String),
+                            sa.column("visit_time", sa.String), sa.column("visit_at", sa.DateTime(timezone=True)))
+        connection = op.get_bind()
+        rows = connection.execute(sa.select(bookings.c.id, bookings.c.visit_date, bookings.c.visit_time)).all()
+        parsed = [{"booking_id": booking_id, "visit_at": to_utc(start)}
+                  for booking_id, visit_date, visit_time in rows
+                  for start in [parse_visit(visit_date, visit_time)] if start is not None]
+        if parsed:
+            connection.execute(bookings.update().where(bookings.c.id == sa.bindparam("booking_id"))
+                               .values(visit_at=sa.bindparam("visit_at")), parsed)
+        if len(parsed) < len(rows):
+            print(f"[MIGRATION] {len(rows) - len(parsed)} bookings have a visit time that doesn't parse")
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_bookings_visit_at", "bookings", ["visit_at"], postgresql_concurrently=True)
+        op.drop_index("ix_bookings_reminder_due", table_name="bookings", postgresql_concurrently=True)
+        op.create_index("ix_bookings_reminder_due", "bookings", ["visit_at"], postgresql_concurrently=True,
+                        postgresql_where=REMINDER_DUE, sqlite_where=REMINDER_DUE)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_bookings_reminder_due", table_name="bookings", postgresql_concurrently=True)
+        op.create_index("ix_bookings_reminder_due", "bookings", ["visit_date"], postgresql_concurrently=True,
+                        postgresql_where=REMINDER_DUE, sqlite_where=REMINDER_DUE)
+        op.drop_index("ix_bookings_visit_at", table_name="bookings", postgresql_concurrently=True)
+    with op.batch_alter_table("bookings") as batch:
+        batch.drop_column("visit_at")
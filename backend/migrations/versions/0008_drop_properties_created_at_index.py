@@ -0,0 +1,26 @@
+"""Drop the properties created_at index
+
+GET /api/properties pages by id (the primary key) since the keyset
+listing, so nothing reads ix_properties_created_at any more.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_properties_created_at", table_name="properties", postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index("ix_properties_created_at", "properties", ["created_at"], postgresql_concurrently=True)
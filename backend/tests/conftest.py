@@ -0,0 +1,15 @@
+"""
+Test settings: a throwaway SQLite database and no external services.
+
+They are set before anything imports app.config, so module-level singletons
+(engine, session backend, agent) pick them up.
+"""
+
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["SESSION_BACKEND"] = "memory"
+os.environ["GEMINI_API_KEY"] = "test-placeholder"
+for _key in ("LANGFUSE_PUBLIC_KEY", "LANGFUSE_SECRET_KEY", "SMTP_EMAIL", "TWILIO_ACCOUNT_SID", "REDIS_URL"):
+    os.environ[_key] = ""
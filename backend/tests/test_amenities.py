@@ -0,0 +1,68 @@
+"""
+Amenity vocabulary: raw listing text maps to canonical names by whole words only,
+and properties keep the listing's own wording for display.
+"""
+
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.amenities import amenity_mask, normalize_amenities, normalize_amenity, set_amenities
+from app.database import Base
+from app.import_properties import map_apify_item
+from app.models import Property, PropertyAmenity
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Swimming Pool", "pool"),
+    ("swimming-pool", "pool"),
+    ("Covered car parking", "parking"),
+    ("24x7 Security with CCTV", "security"),
+    ("Kids play area", "playground"),
+    ("Lifts", "lift"),
+    ("Power Back-up", "power_backup"),
+    ("Lawn tennis court", "sports_court"),
+    ("Terrace garden", "terrace"),
+    ("Smart Home Automation", "smart_home"),
+    ("Fire fighting system", "fire_safety"),
+])
+def test_synonyms_and_phrases_map_to_the_vocabulary(raw, expected):
+    assert normalize_amenity(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [
+    "Fireplace",
+    "Walking distance to station",
+    "Playschool nearby",
+    "Smart card access",
+    "Carpet flooring",
+])
+def test_words_that_only_start_like_an_amenity_match_nothing(raw):
+    assert normalize_amenity(raw) is None
+
+
+def test_amenity_filters_ignore_lookalike_text():
+    listing = amenity_mask(normalize_amenities(["Fireplace", "Playschool nearby", "Gymnasium"]))
+    assert listing == amenity_mask(["gym"])
+    assert not listing & amenity_mask(["fire_safety", "playground"])
+
+
+def test_set_amenities_keeps_the_listing_wording():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    prop = Property(title="Flat", property_type="apartment", price=1, location="Powai", city="Mumbai")
+    set_amenities(prop, ["Swimming Pool", "Fireplace", "swimming pool", " Covered  Parking "])
+    db.add(prop)
+    db.commit()
+
+    assert json.loads(prop.amenities) == ["Swimming Pool", "Fireplace", "Covered Parking"]
+    rows = db.query(PropertyAmenity.amenity).filter(PropertyAmenity.property_id == prop.id).all()
+    assert sorted(amenity for amenity, in rows) == ["parking", "pool"]
+
+
+def test_imported_listings_keep_amenities_outside_the_vocabulary():
+    item = {"title": "2BHK in Powai", "price": "1.2 Cr", "bhk": 2, "locality": "Powai",
+            "amenities": "Swimming Pool, Fireplace, Vastu compliant"}
+    mapped = map_apify_item(item, "Mumbai")
+    assert json.loads(mapped["amenities"]) == ["Swimming Pool", "Fireplace", "Vastu compliant"]
@@ -0,0 +1,105 @@
+"""
+Locality resolution: generic words and aliases must not produce a confident wrong match.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.localities import LocalityMatcher
+from app.models import Property, LocationAlias
+
+CATALOGUE = {
+    "Mumbai": ["Andheri East", "Bandra West", "Powai", "Thane West"],
+    "Pune": ["Baner", "Koregaon Park"],
+    "Bangalore": ["Sarjapur Road", "Whitefield"],
+    "Delhi NCR": ["Gurgaon Sector 42", "Noida Sector 75"],
+    "Thane": ["Ghodbunder Road"],
+}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    db.add_all(Property(title=f"{location} flat", property_type="apartment", price=1, location=location, city=city)
+               for city, locations in CATALOGUE.items() for location in locations)
+    db.add(LocationAlias(alias="Hiranandani", city="Mumbai", location="Powai"))
+    db.add(LocationAlias(alias="Lokhandwala", city="Mumbai", location="Andheri West"))  # not in the catalogue
+    db.commit()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def matcher():
+    return LocalityMatcher(refresh_seconds=60, threshold=0.4)
+
+
+@pytest.fixture
+def resolve(db, matcher):
+    return lambda city, location=None: matcher.resolve(db, city, location)
+
+
+@pytest.mark.parametrize("city, location, expected", [
+    # Generic words qualify a match but never make one
+    ("Mumbai", "Andheri W", []),
+    ("Mumbai", "Goregaon West", []),
+    ("Mumbai", "Malad West", []),
+    ("Bangalore", "MG Road", []),
+    ("Delhi NCR", "Sector 99", []),
+    ("Mumbai", "west", []),
+    # Real matches still resolve
+    ("Mumbai", "Andheri", ["Andheri East"]),
+    ("Mumbai", "Andheri E", ["Andheri East"]),
+    ("Mumbai", "Andheree East", ["Andheri East"]),
+    ("Mumbai", "Powaii", ["Powai"]),
+    ("Mumbai", "Bandra", ["Bandra West"]),
+    ("Bangalore", "Whitefeild", ["Whitefield"]),
+    ("Bangalore", "Sarjapur", ["Sarjapur Road"]),
+    ("Delhi NCR", "Noida sec 75", ["Noida Sector 75"]),
+    ("Pune", "Bandra", []),
+])
+def test_locations(resolve, city, location, expected):
+    assert resolve(city, location)[1] == expected
+
+
+def test_aliases_only_resolve_to_catalogue_values(resolve):
+    assert resolve("Mumbai", "Hiranandani")[1] == ["Powai"]
+    # The alias points at a location with no listings, and nothing else is close
+    assert resolve("Mumbai", "Lokhandwala")[1] == []
+
+
+def test_real_city_wins_over_city_alias(resolve):
+    assert resolve("thane")[0] == ["Thane"]
+    assert resolve("Bombay")[0] == ["Mumbai"]
+    assert resolve("Bengaluru")[0] == ["Bangalore"]
+
+
+def test_single_property_writes_update_without_a_full_reload(db, matcher, resolve, monkeypatch):
+    assert resolve("Mumbai", "Lokhandwala")[1] == []
+    reloads = []
+    monkeypatch.setattr(matcher, "_reload", lambda db: reloads.append(db))
+
+    prop = Property(title="Lokhandwala flat", property_type="apartment", price=1, location="Andheri West",
+                    city="Mumbai")
+    db.add(prop)
+    db.commit()
+    matcher.invalidate([prop.id])
+    # The new location is live, and with it the alias that points there
+    assert resolve("Mumbai", "Andheri West")[1] == ["Andheri West"]
+    assert resolve("Mumbai", "Lokhandwala")[1] == ["Andheri West"]
+    assert reloads == []
+
+
+def test_failed_reload_is_retried(db, matcher, resolve, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise OperationalError("SELECT", {}, Exception("database is unavailable"))
+
+    monkeypatch.setattr(db, "execute", unavailable)
+    with pytest.raises(OperationalError):
+        resolve("Mumbai", "Powai")
+    monkeypatch.undo()
+    assert resolve("Mumbai", "Powai")[1] == ["Powai"]
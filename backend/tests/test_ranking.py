@@ -0,0 +1,48 @@
+"""
+Ranked search takes the model's arguments as they come: numbers may arrive as strings.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.agent.property_index import PropertyIndex
+from app.agent.ranking import Ranker
+from app.agent.tools import ranked_search_sql
+from app.database import Base
+from app.models import Property
+
+LISTINGS = [(1, 3_000_000), (2, 6_000_000), (2, 8_500_000), (3, 9_000_000), (4, 20_000_000), (None, 2_000_000)]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    db.add_all(Property(title=f"Listing {i}", property_type="plot" if bhk is None else "apartment", bhk=bhk,
+                        price=price, location="Powai", city="Mumbai", status="available")
+               for i, (bhk, price) in enumerate(LISTINGS))
+    db.commit()
+    return db
+
+
+def ranked_ids(page) -> list[int]:
+    return [prop["id"] for _, prop in page]
+
+
+def test_string_arguments_rank_like_numbers(db):
+    index = PropertyIndex(True, 3600, text_search=False)
+    assert index.sync(db)
+    as_of = 1_700_000_000.0
+    numbers = {"bhk_min": 2, "bhk_max": 3, "budget_max": 10_000_000}
+    strings = {"bhk_min": "2", "bhk_max": "3", "budget_max": "10000000"}
+
+    expected = ranked_ids(index.ranked_search(Ranker(numbers, as_of), 10, **numbers))
+    assert len(expected) == 3
+    assert ranked_ids(index.ranked_search(Ranker(strings, as_of), 10, **strings)) == expected
+    assert ranked_ids(ranked_search_sql(db, Ranker(strings, as_of), 10, **strings)) == expected
+
+
+def test_ranker_scores_bhk_given_as_a_string():
+    ranker = Ranker({"bhk_min": "2"}, as_of=0)
+    assert ranker.score(5_000_000, 2, "Powai", 0, None) > ranker.score(5_000_000, 4, "Powai", 0, None)
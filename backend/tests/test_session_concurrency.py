@@ -0,0 +1,199 @@
+"""
+Concurrent turns on one conversation keep its history intact.
+
+Turns run through RealEstateAgent.stream_message with the benchmarks' fake
+Gemini client, whose replies take a random time. Each backend must end with
+every turn in arrival order, each user message directly followed by its
+reply, and the rolling summary holding the folded turns in order.
+"""
+
+import asyncio
+import contextvars
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import database
+from app.agent import engine as agent_engine, session_backends
+from app.agent.engine import RealEstateAgent
+from app.agent.history import HistoryManager, split_turns
+from app.agent.session import TextPart
+from app.agent.session_backends import MemoryBackend, PostgresBackend
+from app.agent.session_locks import SessionBusy, SessionGate
+from benchmarks.fake_gemini import FakeGenaiClient
+
+
+def use_table_backend(monkeypatch, tmp_path) -> PostgresBackend:
+    # The table-backed backend on SQLite: same compare-and-set on version
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(session_backends, "engine", engine)
+    monkeypatch.setattr(session_backends, "SessionLocal", sessionmaker(bind=engine))
+    return PostgresBackend(ttl_seconds=3600)
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    # Leads are written by the agent on the app database
+    database.Base.metadata.create_all(database.engine)
+
+
+@pytest.fixture(autouse=True)
+def history(monkeypatch) -> HistoryManager:
+    # Room for every turn a test runs, so the history holds them all verbatim
+    history = HistoryManager(max_turns=100, token_budget=1_000_000, summary_max_chars=10_000)
+    monkeypatch.setattr(agent_engine, "history_manager", history)
+    return history
+
+
+@pytest.fixture(params=["memory", "postgres"])
+def backend(request, monkeypatch, tmp_path):
+    backend = MemoryBackend() if request.param == "memory" else use_table_backend(monkeypatch, tmp_path)
+    monkeypatch.setattr(session_backends, "session_backend", backend)
+    return backend
+
+
+def make_agent(messages: list[str], latency: float = 0.02) -> RealEstateAgent:
+    agent = RealEstateAgent()
+    # Replies take 0..2x latency, so later messages often finish their model call first
+    agent.client = FakeGenaiClient(latency=latency, jitter=latency, seed=7,
+                                   script={m: [{"text": f"reply to {m}"}] for m in messages})
+    return agent
+
+
+def use_gate(monkeypatch, gate) -> SessionGate:
+    monkeypatch.setattr(agent_engine, "session_gate", gate)
+    return gate
+
+
+async def chat(agent: RealEstateAgent, session_id: str, message: str) -> dict:
+    done = None
+    async for event in agent.stream_message(session_id, message):
+        if event["type"] == "done":
+            done = event
+    return done
+
+
+def texts(session) -> list[tuple[str, str]]:
+    return [(c.role, p.text) for c in session.history for p in c.parts if isinstance(p, TextPart)]
+
+
+def expected(messages: list[str]) -> list[tuple[str, str]]:
+    return [pair for m in messages for pair in (("user", m), ("model", f"reply to {m}"))]
+
+
+def test_concurrent_turns_run_in_arrival_order(backend, monkeypatch):
+    session_id = f"order-{type(backend).__name__}"
+    messages = [f"message {i}" for i in range(8)]
+    gate = use_gate(monkeypatch, SessionGate(max_pending=len(messages)))
+    agent = make_agent(messages)
+
+    async def main():
+        return await asyncio.gather(*(chat(agent, session_id, m) for m in messages))
+
+    results = asyncio.run(main())
+    session = backend.load(session_id)
+    assert [r["message"] for r in results] == [f"reply to {m}" for m in messages]
+    assert texts(session) == expected(messages)
+    assert len(split_turns(session.history)) == len(messages)
+    assert len(gate) == 0
+
+
+def test_duplicate_in_flight_message_runs_once(backend, monkeypatch):
+    session_id = f"dup-{type(backend).__name__}"
+    gate = use_gate(monkeypatch, SessionGate(max_pending=3))
+    agent = make_agent(["book it"])
+
+    async def main():
+        return await asyncio.gather(*(chat(agent, session_id, "book it") for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert [r["message"] for r in results] == ["reply to book it"] * 3
+    assert texts(backend.load(session_id)) == expected(["book it"])
+    assert gate.coalesced == 2
+    assert agent.client.aio.models.calls == 1
+
+
+def test_waiters_beyond_the_bound_are_rejected(backend, monkeypatch):
+    session_id = f"busy-{type(backend).__name__}"
+    gate = use_gate(monkeypatch, SessionGate(max_pending=2))
+    messages = [f"message {i}" for i in range(5)]
+    agent = make_agent(messages)
+
+    async def main():
+        return await asyncio.gather(*(chat(agent, session_id, m) for m in messages), return_exceptions=True)
+
+    results = asyncio.run(main())
+    accepted = [m for m, r in zip(messages, results) if not isinstance(r, SessionBusy)]
+    assert accepted == messages[:2]
+    assert gate.rejected == 3
+    assert texts(backend.load(session_id)) == expected(accepted)
+
+
+def test_rolling_summary_keeps_folded_turns_in_order(backend, monkeypatch):
+    session_id = f"summary-{type(backend).__name__}"
+    messages = [f"message {i}" for i in range(7)]
+    use_gate(monkeypatch, SessionGate(max_pending=len(messages)))
+    history = HistoryManager(max_turns=3, token_budget=1_000_000, summary_max_chars=10_000)
+    monkeypatch.setattr(agent_engine, "history_manager", history)
+    agent = make_agent(messages)
+
+    async def main():
+        await asyncio.gather(*(chat(agent, session_id, m) for m in messages))
+
+    asyncio.run(main())
+    session = backend.load(session_id)
+    # Each turn folds before its model call, so the last turn sees max_turns - 1 earlier ones
+    kept = messages[-history.max_turns:]
+    folded = messages[:-history.max_turns]
+    assert texts(session) == expected(kept)
+    assert session.summary.splitlines() == [line for m in folded
+                                            for line in (f"User: {m}", f"Assistant: reply to {m}")]
+
+
+_worker = contextvars.ContextVar("worker")
+
+
+class PerWorkerGate:
+    """Stands in for session_gate so each task sees its own worker's gate, as separate processes would."""
+
+    def __getattr__(self, name):
+        return getattr(_worker.get(), name)
+
+
+def test_conflicting_workers_replay_their_turns(monkeypatch, tmp_path):
+    """Workers with separate gates load the same version; the losers replay their turns on the winner's copy."""
+    backend = use_table_backend(monkeypatch, tmp_path)
+    monkeypatch.setattr(session_backends, "session_backend", backend)
+    use_gate(monkeypatch, PerWorkerGate())
+    conflicts = []
+    save = backend.save
+
+    def counting_save(session):
+        try:
+            save(session)
+        except session_backends.SessionConflict:
+            conflicts.append(session.session_id)
+            raise
+
+    monkeypatch.setattr(backend, "save", counting_save)
+    session_id = "two-workers"
+    messages = [f"worker {i}" for i in range(4)]
+    agent = make_agent(["hello"] + messages)
+
+    async def on_worker(message: str) -> dict:
+        _worker.set(SessionGate(1))
+        return await chat(agent, session_id, message)
+
+    asyncio.run(on_worker("hello"))
+
+    async def main():
+        await asyncio.gather(*(on_worker(m) for m in messages))
+
+    asyncio.run(main())
+    session = backend.load(session_id)
+    pairs = texts(session)
+    assert pairs[:2] == expected(["hello"])
+    # Every turn is kept exactly once and stays whole (user message, then its reply)
+    turns = [pairs[i:i + 2] for i in range(2, len(pairs), 2)]
+    assert sorted(turns) == sorted(expected([m]) for m in messages)
+    assert session.version == 1 + len(messages)
+    assert conflicts  # the replay path ran
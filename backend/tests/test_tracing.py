@@ -0,0 +1,81 @@
+"""
+The trace exporter batches events off the request path, flushes on shutdown
+and stays bounded when the collector is down.
+"""
+
+import json
+import time
+import httpx
+from app.agent.tracing import Tracer
+
+
+class Collector:
+    """Stub Langfuse ingestion endpoint that records each batch it receives."""
+
+    def __init__(self, status: int = 207):
+        self.status = status
+        self.batches: list[list[dict]] = []
+        self.auth: set[str] = set()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.auth.add(request.headers["Authorization"])
+        self.batches.append(json.loads(request.content)["batch"])
+        return httpx.Response(self.status)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+
+def make_tracer(collector: Collector, max_queue: int = 100, batch_size: int = 3,
+                flush_interval: float = 0.05) -> Tracer:
+    return Tracer("http://collector/", "pk", "sk", max_queue=max_queue, batch_size=batch_size,
+                  flush_interval=flush_interval, transport=collector.transport())
+
+
+def end_traces(tracer: Tracer, count: int):
+    for i in range(count):
+        tracer.start_trace(f"turn-{i}", input={"message": f"message {i}"}, session_id="s").end()
+
+
+def test_events_are_sent_in_batches():
+    collector = Collector()
+    tracer = make_tracer(collector)
+    end_traces(tracer, 7)
+    tracer.start()
+    tracer.shutdown()
+
+    assert [len(batch) for batch in collector.batches] == [3, 3, 1]
+    sent = [event["body"]["name"] for batch in collector.batches for event in batch]
+    assert sent == [f"turn-{i}" for i in range(7)]
+    assert {event["type"] for batch in collector.batches for event in batch} == {"trace-create"}
+    assert len(collector.auth) == 1 and collector.auth.pop().startswith("Basic ")
+    assert (tracer.exported, tracer.dropped, tracer.queue_depth()) == (7, 0, 0)
+
+
+def test_shutdown_flushes_without_waiting_out_the_interval():
+    collector = Collector()
+    tracer = make_tracer(collector, batch_size=100, flush_interval=30)
+    tracer.start()
+    trace = tracer.start_trace("turn")
+    trace.start_span("tool-search_properties").end()
+    trace.end()
+
+    start = time.monotonic()
+    tracer.shutdown(timeout=5)
+    assert time.monotonic() - start < 2
+    assert [[event["type"] for event in batch] for batch in collector.batches] == [["span-create", "trace-create"]]
+    assert tracer.exported == 2
+
+
+def test_queue_is_bounded_when_the_collector_is_down():
+    collector = Collector(status=503)
+    tracer = make_tracer(collector, max_queue=5)
+    # Nothing is exporting yet: the queue fills, then new events are dropped instead of blocking
+    end_traces(tracer, 8)
+    assert (tracer.queue_depth(), tracer.dropped) == (5, 3)
+
+    tracer.start()
+    tracer.shutdown()
+    # Failed batches are dropped and counted, not retried forever or kept in memory
+    assert [len(batch) for batch in collector.batches] == [3, 2]
+    assert (tracer.exported, tracer.dropped, tracer.queue_depth()) == (0, 8, 0)
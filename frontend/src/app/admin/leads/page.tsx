@@ -8,10 +8,17 @@ const ADMIN_TOKEN = "admin-secret-change-me";
 
 export default function LeadsPage() {
   const [leads, setLeads] = useState<Lead[]>([]);
+  const [cursor, setCursor] = useState<string | null>(null);
 
-  useEffect(() => {
-    fetchLeads(ADMIN_TOKEN).then(setLeads).catch(() => {});
-  }, []);
+  const loadMore = (after: string | null) =>
+    fetchLeads(ADMIN_TOKEN, after ? { cursor: after } : undefined)
+      .then(({ leads: page, nextCursor }) => {
+        setLeads((prev) => (after ? [...prev, ...page] : page));
+        setCursor(nextCursor);
+      })
+      .catch(() => {});
+
+  useEffect(() => { loadMore(null); }, []);
 
   return (
     <div>
@@ -69,6 +76,14 @@ export default function LeadsPage() {
               )}
             </div>
           ))}
+          {cursor && (
+            <button
+              onClick={() => loadMore(cursor)}
+              className="w-full py-3 border border-[#2e2a24] rounded-sm text-sm font-sans text-[#c8a97e] hover:border-[#c8a97e]/30 transition-colors duration-300"
+            >
+              Load more
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import { fetchProperties, fetchBookings, fetchLeads } from "@/lib/api";
+import { fetchPropertySummary, fetchBookings, fetchLeads, fetchLeadSummary } from "@/lib/api";
 import { Booking, Lead } from "@/types";
 
 const ADMIN_TOKEN = "admin-secret-change-me";
@@ -13,16 +13,14 @@ export default function AdminDashboard() {
 
   useEffect(() => {
     Promise.all([
-      fetchProperties().then((d) => d.length),
+      fetchPropertySummary().then((s) => s.available).catch(() => 0),
       fetchBookings(ADMIN_TOKEN).then((d: Booking[]) => {
         setRecentBookings(d.slice(0, 5));
         return d.length;
       }).catch(() => 0),
-      fetchLeads(ADMIN_TOKEN).then((d: Lead[]) => {
-        setRecentLeads(d.slice(0, 5));
-        return d.length;
-      }).catch(() => 0),
-    ]).then(([properties, bookings, leads]) => {
+      fetchLeads(ADMIN_TOKEN, { limit: "5" }).then(({ leads }) => setRecentLeads(leads)).catch(() => {}),
+      fetchLeadSummary(ADMIN_TOKEN).then((s) => s.leads).catch(() => 0),
+    ]).then(([properties, bookings, , leads]) => {
       setStats({ properties, bookings, leads });
     });
   }, []);
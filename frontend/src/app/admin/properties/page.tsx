@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import { fetchProperties, createProperty, deleteProperty } from "@/lib/api";
+import { fetchProperties, fetchPropertySummary, createProperty, deleteProperty } from "@/lib/api";
 import { Property } from "@/types";
 
 const ADMIN_TOKEN = "admin-secret-change-me";
@@ -19,10 +19,24 @@ const emptyForm = {
 
 export default function PropertiesPage() {
   const [properties, setProperties] = useState<Property[]>([]);
+  const [cursor, setCursor] = useState<string | null>(null);
+  const [total, setTotal] = useState(0);
   const [showForm, setShowForm] = useState(false);
   const [form, setForm] = useState(emptyForm);
 
-  const load = () => fetchProperties().then(setProperties);
+  const loadMore = (after: string | null) =>
+    fetchProperties(after ? { cursor: after } : undefined)
+      .then(({ properties: page, nextCursor }) => {
+        setProperties((prev) => (after ? [...prev, ...page] : page));
+        setCursor(nextCursor);
+      })
+      .catch(() => {});
+
+  // Back to the first page after a write, with the count from the summary
+  const load = () => {
+    fetchPropertySummary().then((s) => setTotal(s.properties)).catch(() => {});
+    return loadMore(null);
+  };
   useEffect(() => { load(); }, []);
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -53,7 +67,7 @@ export default function PropertiesPage() {
       <div className="flex justify-between items-center mb-8">
         <div>
           <h1 className="text-2xl font-serif text-[#f0ebe4] tracking-tight">Properties</h1>
-          <p className="text-[#5a4a3a] text-sm mt-1 font-sans">{properties.length} listings</p>
+          <p className="text-[#5a4a3a] text-sm mt-1 font-sans">{total} listings</p>
         </div>
         <button
           onClick={() => setShowForm(!showForm)}
@@ -127,6 +141,14 @@ export default function PropertiesPage() {
           </tbody>
         </table>
       </div>
+      {cursor && (
+        <button
+          onClick={() => loadMore(cursor)}
+          className="w-full mt-4 py-3 border border-[#2e2a24] rounded-sm text-sm font-sans text-[#c8a97e] hover:border-[#c8a97e]/30 transition-colors duration-300"
+        >
+          Load more
+        </button>
+      )}
     </div>
   );
 }
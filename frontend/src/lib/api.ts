@@ -1,3 +1,5 @@
+import { Lead, LeadSummary, Property, PropertySummary } from "@/types";
+
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
 export async function sendMessage(sessionId: string, message: string, token?: string | null) {
@@ -13,9 +15,17 @@ export async function sendMessage(sessionId: string, message: string, token?: st
 }
 
 export async function fetchProperties(params?: Record<string, string>) {
+  // One page, newest first; nextCursor is passed back as params.cursor for the next one
   const query = params ? "?" + new URLSearchParams(params).toString() : "";
   const res = await fetch(`${API_BASE}/api/properties${query}`);
   if (!res.ok) throw new Error("Failed to fetch properties");
+  const properties: Property[] = await res.json();
+  return { properties, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+export async function fetchPropertySummary(): Promise<PropertySummary> {
+  const res = await fetch(`${API_BASE}/api/properties/summary`);
+  if (!res.ok) throw new Error("Failed to fetch property summary");
   return res.json();
 }
 
@@ -37,11 +47,22 @@ export async function updateBooking(token: string, id: number, status: string) {
   return res.json();
 }
 
-export async function fetchLeads(token: string) {
-  const res = await fetch(`${API_BASE}/api/leads`, {
+export async function fetchLeads(token: string, params?: Record<string, string>) {
+  // One page, newest first; nextCursor is passed back as params.cursor for the next one
+  const query = params ? "?" + new URLSearchParams(params).toString() : "";
+  const res = await fetch(`${API_BASE}/api/leads${query}`, {
     headers: { Authorization: `Bearer ${token}` },
   });
   if (!res.ok) throw new Error("Failed to fetch leads");
+  const leads: Lead[] = await res.json();
+  return { leads, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+export async function fetchLeadSummary(token: string): Promise<LeadSummary> {
+  const res = await fetch(`${API_BASE}/api/leads/summary`, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!res.ok) throw new Error("Failed to fetch lead summary");
   return res.json();
 }
 
@@ -36,6 +36,7 @@ export interface Booking {
   property_id: number;
   visit_date: string;
   visit_time: string;
+  visit_at: string | null;
   status: string;
   created_at: string;
 }
@@ -50,6 +51,20 @@ export interface Lead {
   requirements: Requirement[];
 }
 
+export interface PropertySummary {
+  properties: number;
+  available: number;
+}
+
+export interface LeadSummary {
+  leads: number;
+  with_contact: number;
+  anonymous: number;
+  qualified: number;
+  booked: number;
+  confirmed: number;
+}
+
 export interface Requirement {
   budget_min: number | null;
   budget_max: number | null;